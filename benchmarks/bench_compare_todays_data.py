@@ -0,0 +1,109 @@
+"""
+Micro-benchmark for compare_todays_data.
+
+Times the array-based implementation against the original sort-based one on synthetic histories of
+80, 1,000 and 100,000 rows and checks that both produce the same report. Run from the repository root:
+
+    python benchmarks/bench_compare_todays_data.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+os.chdir(SRC_DIR)  # api.py loads translations relative to the src directory
+
+import api  # noqa: E402
+
+HISTORY_SIZES = [80, 1_000, 100_000]
+
+
+def make_history(rows, seed=0):
+    """Builds a synthetic daily history with values rounded like API data."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1800-01-01", periods=rows, freq="D", tz="UTC")
+    precipitation = np.where(rng.random(rows) < 0.6, 0, rng.gamma(1.5, 3, rows))
+    return pd.DataFrame({
+        "date": dates,
+        "temperature_2m_max": np.round(rng.normal(25, 4, rows), 1).astype(np.float32),
+        "temperature_2m_min": np.round(rng.normal(14, 4, rows), 1).astype(np.float32),
+        "precipitation_sum": np.round(precipitation, 1).astype(np.float32),
+        "wind_speed_10m_max": np.round(rng.gamma(4, 2, rows), 1).astype(np.float32),
+    })
+
+
+def make_today(precipitation):
+    return pd.DataFrame({
+        "date": [pd.Timestamp.now(tz="UTC")],
+        "temperature_2m_max": [np.float32(26.3)],
+        "temperature_2m_min": [np.float32(13.1)],
+        "precipitation_sum": [np.float32(precipitation)],
+        "wind_speed_10m_max": [np.float32(7.4)],
+    })
+
+
+def compare_todays_data_sorted(today_df, historical_df):
+    """The original implementation, kept as the baseline."""
+    today_max_temp = today_df['temperature_2m_max'].values[0]
+    today_min_temp = today_df['temperature_2m_min'].values[0]
+    historical_sorted_by_max_temp = historical_df.sort_values(by='temperature_2m_max', ascending=False)
+    historical_sorted_by_min_temp = historical_df.sort_values(by='temperature_2m_min', ascending=True)
+
+    hottest_year = historical_sorted_by_max_temp.iloc[0]['date'].year
+    hottest_temp = historical_sorted_by_max_temp.iloc[0]['temperature_2m_max']
+    coldest_year = historical_sorted_by_min_temp.iloc[0]['date'].year
+    coldest_temp = historical_sorted_by_min_temp.iloc[0]['temperature_2m_min']
+
+    max_temp_rank = (historical_sorted_by_max_temp['temperature_2m_max'] >= today_max_temp).sum()
+    min_temp_rank = (historical_sorted_by_min_temp['temperature_2m_min'] <= today_min_temp).sum()
+
+    today_precipitation = today_df['precipitation_sum'].values[0]
+    last_rain = None
+    wettest = None
+    if today_precipitation == 0:
+        last_rain_year = historical_df[historical_df['precipitation_sum'] > 0].iloc[-1]['date'].year
+        last_rain_amount = historical_df[historical_df['precipitation_sum'] > 0].iloc[-1]['precipitation_sum']
+        last_rain = (last_rain_year, last_rain_amount)
+    else:
+        max_precipitation = historical_df['precipitation_sum'].max()
+        wettest_year = historical_df.loc[historical_df['precipitation_sum'].idxmax(), 'date'].year
+        wettest = (wettest_year, max_precipitation)
+
+    today_wind_speed = today_df['wind_speed_10m_max'].values[0]
+    historical_sorted_by_wind_speed = historical_df.sort_values(by='wind_speed_10m_max', ascending=False)
+    historical_sorted_by_calm_wind = historical_df.sort_values(by='wind_speed_10m_max', ascending=True)
+
+    max_wind_speed_year = historical_sorted_by_wind_speed.iloc[0]['date'].year
+    max_wind_speed = historical_sorted_by_wind_speed.iloc[0]['wind_speed_10m_max']
+    calmest_wind_year = historical_sorted_by_calm_wind.iloc[0]['date'].year
+    calmest_wind_speed = historical_sorted_by_calm_wind.iloc[0]['wind_speed_10m_max']
+
+    wind_speed_rank = (historical_sorted_by_wind_speed['wind_speed_10m_max'] >= today_wind_speed).sum()
+
+    return api.format_comparison_report(max_temp_rank, min_temp_rank, (hottest_year, hottest_temp),
+                                        (coldest_year, coldest_temp), today_precipitation, last_rain, wettest,
+                                        wind_speed_rank, (max_wind_speed_year, max_wind_speed),
+                                        (calmest_wind_year, calmest_wind_speed))
+
+
+def best_time(function, repeat=5):
+    number, _ = timeit.Timer(function).autorange()
+    return min(timeit.Timer(function).repeat(repeat=repeat, number=number)) / number
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>8} {'precip':>7} {'sorted':>12} {'arrays':>12} {'speedup':>8}  identical")
+    for rows in HISTORY_SIZES:
+        historical_df = make_history(rows)
+        for precipitation in (0.0, 4.2):
+            today_df = make_today(precipitation)
+            baseline = compare_todays_data_sorted(today_df, historical_df)
+            report = api.compare_todays_data(today_df, historical_df)
+            baseline_time = best_time(lambda: compare_todays_data_sorted(today_df, historical_df))
+            array_time = best_time(lambda: api.compare_todays_data(today_df, historical_df))
+            print(f"{rows:>8} {precipitation:>7} {baseline_time * 1e3:>9.3f} ms {array_time * 1e3:>9.3f} ms "
+                  f"{baseline_time / array_time:>7.1f}x  {baseline == report}")
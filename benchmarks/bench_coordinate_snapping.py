@@ -0,0 +1,50 @@
+"""
+Cache hit ratio of dense site lists with and without coordinate snapping.
+
+Builds lists of sites scattered around a city centre, the way saved locations of one area accumulate, and
+counts how many of their forecast and archive requests can be answered from the cache of an earlier request.
+Works offline: only request keys are compared. Run from the repository root:
+
+    python benchmarks/bench_coordinate_snapping.py
+"""
+import os
+import sys
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+os.chdir(SRC_DIR)  # api.py loads translations relative to the src directory
+
+import api  # noqa: E402
+from client_manager import SharedOpenMeteoClient, make_request_key  # noqa: E402
+
+# Number of sites and the radius in degrees they are scattered over
+SITE_LISTS = [(50, 0.05), (200, 0.1), (200, 0.3), (1000, 0.5)]
+
+
+def hit_ratio(client, requests_):
+    keys = [make_request_key("GET", url, client.normalize_params(url, params, False)) for url, params in requests_]
+    return 1 - len(set(keys)) / len(keys)
+
+
+def make_requests(sites, radius, seed=0):
+    rng = np.random.default_rng(seed)
+    latitudes = 50.4501 + rng.uniform(-radius, radius, sites)
+    longitudes = 30.5234 + rng.uniform(-radius, radius, sites)
+    requests_ = []
+    for latitude, longitude in zip(latitudes.round(4), longitudes.round(4)):
+        requests_.append(api.build_forecast_bundle_request(float(latitude), float(longitude)))
+        requests_.append(api.build_historical_request(float(latitude), float(longitude), "1945-01-01",
+                                                      "2025-12-31"))
+    return requests_
+
+
+if __name__ == "__main__":
+    exact_client = SharedOpenMeteoClient()
+    snapping_client = SharedOpenMeteoClient(snap_coordinates=True)
+    print(f"{'sites':>6} {'radius':>7} {'exact':>8} {'snapped':>8}")
+    for sites, radius in SITE_LISTS:
+        requests_ = make_requests(sites, radius)
+        print(f"{sites:>6} {radius:>6}° {hit_ratio(exact_client, requests_):>8.1%} "
+              f"{hit_ratio(snapping_client, requests_):>8.1%}")
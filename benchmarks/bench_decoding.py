@@ -0,0 +1,107 @@
+"""
+Micro-benchmark for decoding forecast responses.
+
+Decodes the hourly block of 14-day forecasts for 1, 50 and 500 sites with the original dict-of-columns +
+pd.DataFrame approach, into DecodedBlocks, and into DecodedBlocks converted with `to_dataframe()`, and
+reports the time and peak memory of each. Response blocks are simulated with read-only views into one bytes
+buffer, which is what `ValuesAsNumpy` returns for a real FlatBuffers response. Run from the repository root:
+
+    python benchmarks/bench_decoding.py
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+os.chdir(SRC_DIR)  # api.py loads translations relative to the src directory
+
+import api  # noqa: E402
+from decoding import DecodedBlock  # noqa: E402
+
+SITE_COUNTS = [1, 50, 500]
+HOURS = 14 * 24
+
+
+class Variable:
+    def __init__(self, values):
+        self.values = values
+
+    def ValuesAsNumpy(self):
+        return self.values
+
+
+class Block:
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def Time(self):
+        return 1729202400
+
+    def TimeEnd(self):
+        return 1729202400 + HOURS * 3600
+
+    def Interval(self):
+        return 3600
+
+    def Variables(self, i):
+        return Variable(np.frombuffer(self.buffer, dtype=np.float32, count=HOURS, offset=i * HOURS * 4))
+
+
+def make_blocks(sites):
+    variable_count = len(api.FORECAST_HOURLY_VARIABLES)
+    rng = np.random.default_rng(0)
+    return [Block(rng.random(HOURS * variable_count, dtype=np.float32).tobytes()) for _ in range(sites)]
+
+
+def decode_with_dict(block):
+    """The original decoding, kept as the baseline."""
+    hourly_data = {
+        "date": pd.date_range(
+            start=pd.to_datetime(block.Time(), unit="s", utc=True),
+            end=pd.to_datetime(block.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=block.Interval()),
+            inclusive="left"
+        )
+    }
+    for i, name in enumerate(api.FORECAST_HOURLY_VARIABLES):
+        hourly_data[name] = block.Variables(i).ValuesAsNumpy()
+    return pd.DataFrame(data=hourly_data)
+
+
+def decode_with_blocks(block):
+    return DecodedBlock.from_response_block(block, api.FORECAST_HOURLY_VARIABLES)
+
+
+def decode_to_dataframe(block):
+    return decode_with_blocks(block).to_dataframe()
+
+
+def measure(decode, blocks):
+    def run():
+        return [decode(block) for block in blocks]
+
+    number, _ = timeit.Timer(run).autorange()
+    seconds = min(timeit.Timer(run).repeat(repeat=3, number=number)) / number
+    tracemalloc.start()
+    decoded = run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+    return seconds, peak
+
+
+if __name__ == "__main__":
+    print(f"{'sites':>6} {'method':>14} {'time':>12} {'speedup':>8} {'peak':>12}")
+    for sites in SITE_COUNTS:
+        blocks = make_blocks(sites)
+        dict_time, _ = measure(decode_with_dict, blocks)
+        for method, decode in (("dict", decode_with_dict), ("blocks", decode_with_blocks),
+                               ("blocks + frame", decode_to_dataframe)):
+            seconds, peak = measure(decode, blocks)
+            print(f"{sites:>6} {method:>14} {seconds * 1e3:>9.3f} ms {dict_time / seconds:>7.1f}x "
+                  f"{peak / 1024:>9.0f} kB")
@@ -0,0 +1,118 @@
+"""
+Benchmark for downsampling the History chart.
+
+Draws 70 years of simulated daily data (three temperature lines and precipitation) into a 1000 pixel wide
+figure: reduced with the original stride of `len // 100` and drawn with bars as before, and reduced with min-max
+buckets for lines and max buckets for precipitation, or LTTB for lines, and drawn with one step patch for
+precipitation as the History tab does now. Reports the time to reduce and draw, and how far the highest
+temperature and precipitation drawn fall short of the true peaks. Then times zooming into windows of a year and
+a week of 7, 70 and 700 years loaded, with a SeriesPyramid per series. Run from the repository root:
+
+    python benchmarks/bench_downsampling.py
+"""
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from downsampling import downsample, downsample_series, downsample_cache, SeriesPyramid  # noqa: E402
+
+DAYS = 70 * 365
+LINE_COLUMNS = ["temperature_2m_max", "temperature_2m_min", "temperature_2m_mean"]
+WIDTH = 1000
+BAR_PIXELS = 2
+REPEATS = 5
+
+
+def make_data():
+    rng = np.random.default_rng(0)
+    x = np.arange(DAYS, dtype=np.float64) - 7305  # Days since 1970, from 1950 on
+    season = 12 * np.sin(2 * np.pi * x / 365.25)
+    data = {"temperature_2m_mean": season + rng.normal(0, 3, DAYS)}
+    data["temperature_2m_max"] = data["temperature_2m_mean"] + 5 + rng.gamma(2, 1, DAYS)
+    data["temperature_2m_min"] = data["temperature_2m_mean"] - 5 - rng.gamma(2, 1, DAYS)
+    data["precipitation_sum"] = rng.gamma(0.3, 6, DAYS)
+    return x, data
+
+
+def reduce_stride(x, data):
+    step = len(x) // 100
+    return {col: (x[::step], values[::step]) for col, values in data.items()}
+
+
+def reduce_buckets(x, data, line_method):
+    reduced = {}
+    for col, values in data.items():
+        if col == "precipitation_sum":
+            indices = downsample(x, values, WIDTH // BAR_PIXELS, method="max")
+        else:
+            indices = downsample(x, values, WIDTH, method=line_method)
+        reduced[col] = (x[indices], values[indices])
+    return reduced
+
+
+def draw(reduced, steps):
+    fig, ax = plt.subplots(figsize=(10, 5), dpi=100)
+    for col in LINE_COLUMNS:
+        ax.plot(*reduced[col])
+    bar_x, bar_values = reduced["precipitation_sum"]
+    if steps:
+        width = max(1, (bar_x[-1] - bar_x[0]) / (len(bar_x) - 1))
+        edges = np.concatenate(([bar_x[0] - width / 2], (bar_x[1:] + bar_x[:-1]) / 2, [bar_x[-1] + width / 2]))
+        ax.twinx().stairs(bar_values, edges, alpha=0.5, fill=True)
+    else:
+        ax.twinx().bar(bar_x, bar_values, width=1, alpha=0.5)
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def measure(reduce, steps):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        reduced = reduce()
+        draw(reduced, steps)
+        times.append(time.perf_counter() - start)
+    return min(times), reduced
+
+
+if __name__ == "__main__":
+    x, data = make_data()
+    true_max = np.max(data["temperature_2m_max"])
+    true_rain = np.max(data["precipitation_sum"])
+    print(f"{'method':>16} {'time':>10} {'points':>7} {'max temp missed':>16} {'max rain missed':>16}")
+    for method, reduce, steps in (("stride", lambda: reduce_stride(x, data), False),
+                                  ("min-max / max", lambda: reduce_buckets(x, data, "minmax"), True),
+                                  ("lttb / max", lambda: reduce_buckets(x, data, "lttb"), True)):
+        seconds, reduced = measure(reduce, steps)
+        points = sum(len(values) for _, values in reduced.values())
+        print(f"{method:>16} {seconds * 1e3:>7.1f} ms {points:>7} "
+              f"{true_max - np.max(reduced['temperature_2m_max'][1]):>13.2f} °C "
+              f"{true_rain - np.max(reduced['precipitation_sum'][1]):>13.2f} mm")
+
+    # Redraws of a chart that did not change take the downsampled series from the cache
+    downsample_cache.entries.clear()
+    downsample_cache.size = 0
+    for label in ("cold", "cached"):
+        start = time.perf_counter()
+        for col, values in data.items():
+            downsample_series(("bench", col), x, values, WIDTH)
+        print(f"{label:>16} {(time.perf_counter() - start) * 1e3:>7.2f} ms to downsample all columns")
+
+    # Zooming draws from a pyramid level, so its cost does not grow with the years loaded
+    for years in (7, 70, 700):
+        rng = np.random.default_rng(0)
+        x = np.arange(years * 365, dtype=np.float64)
+        pyramid = SeriesPyramid(x, rng.normal(0, 1, len(x)))
+        for label, span in (("year", 365), ("week", 7)):
+            start = time.perf_counter()
+            for first in np.linspace(0, len(x) - span, 100):
+                indices = pyramid.query(WIDTH, first, first + span)
+            print(f"{years:>5} years, {label} window: {(time.perf_counter() - start) * 1e4:>6.1f} µs per query, "
+                  f"{len(indices)} points")
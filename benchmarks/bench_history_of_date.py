@@ -0,0 +1,75 @@
+"""
+Benchmark for the "this day in history" fetch.
+
+Compares wall time and number of Open-Meteo requests of the bulk archive fetch against the
+original one-request-per-year loop. Every mode starts from an empty archive store in a temporary cache dir
+and an empty result cache, so each one pays for its first load and the modes compare like with like.
+Requires network access. Run from the repository root:
+
+    python benchmarks/bench_history_of_date.py
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import openmeteo_requests
+import requests
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+os.chdir(SRC_DIR)  # api.py loads translations relative to the src directory
+
+import api  # noqa: E402
+
+LOCATIONS = [
+    ("Kyiv", 50.4501, 30.5234),
+    ("San Francisco", 37.7749, -122.4194),
+]
+
+
+class CountingClient:
+    """Open-Meteo client without HTTP cache that counts issued requests."""
+
+    def __init__(self):
+        self.client = openmeteo_requests.Client(session=requests.Session())
+        self.request_count = 0
+        self.cache_expire_after = 3600
+
+    def normalize_params(self, url, params, count=True):
+        return dict(params)
+
+    def weather_api(self, url, params, method="GET"):
+        self.request_count += 1
+        return self.client.weather_api(url, params=params, method=method)
+
+    def data_age(self, url, params, method="GET"):
+        return None
+
+
+def run(mode_name, **kwargs):
+    client = CountingClient()
+    original_setup = api.setup_openmeteo_client
+    api.setup_openmeteo_client = lambda *args, **kw: client
+    # Forecast bundles memoized by an earlier mode would otherwise not be requested and counted again
+    api.get_result_cache().clear()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch("platformdirs.user_cache_dir", return_value=cache_dir):
+            for name, latitude, longitude in LOCATIONS:
+                client.request_count = 0
+                start = time.perf_counter()
+                today_df, historical_df = api.get_history_of_date(latitude, longitude, **kwargs)
+                elapsed = time.perf_counter() - start
+                print(f"{mode_name:<10} {name:<15} {elapsed:>8.2f} s {client.request_count:>6} requests "
+                      f"{len(historical_df):>4} years")
+    finally:
+        api.setup_openmeteo_client = original_setup
+
+
+if __name__ == "__main__":
+    print(f"{'mode':<10} {'location':<15} {'wall time':>10} {'requests':>15}")
+    run("per-year", bulk=False)
+    run("bulk", bulk=True)
+    run("chunked", bulk=True, chunk_years=30)
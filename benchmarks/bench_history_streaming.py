@@ -0,0 +1,107 @@
+"""
+Benchmark for loading long historical ranges in the History tab.
+
+Compares the time until the first data can be drawn and the total time of one `get_historical_weather_data`
+call for the whole range against `iter_historical_weather_data`, which fetches year-sized chunks
+concurrently. The archive API is simulated with a client whose response time grows with the number of days
+requested, so the benchmark runs offline and without the local archive store. Run from the repository root:
+
+    python benchmarks/bench_history_streaming.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+os.chdir(SRC_DIR)  # api.py loads translations relative to the src directory
+
+import api  # noqa: E402
+
+START_DATE = "1955-01-01"
+END_DATE = "2024-12-31"
+
+# Simulated server time: a fixed round trip plus the time to read the requested days
+ROUND_TRIP_SECONDS = 0.15
+SECONDS_PER_YEAR = 0.08
+
+
+class Variable:
+    def __init__(self, values):
+        self.values = values
+
+    def ValuesAsNumpy(self):
+        return self.values
+
+
+class Block:
+    def __init__(self, start, days):
+        self.start = start
+        self.days = days
+        self.values = np.random.default_rng(0).random(days, dtype=np.float32)
+
+    def Time(self):
+        return self.start
+
+    def TimeEnd(self):
+        return self.start + self.days * 86400
+
+    def Interval(self):
+        return 86400
+
+    def Variables(self, i):
+        return Variable(self.values)
+
+
+class Response:
+    def __init__(self, params):
+        start = pd.Timestamp(params["start_date"]).value // 10 ** 9
+        self.days = (pd.Timestamp(params["end_date"]) - pd.Timestamp(params["start_date"])).days + 1
+        self.block = Block(start, self.days)
+
+    def Daily(self):
+        return self.block
+
+    def UtcOffsetSeconds(self):
+        return 0
+
+
+class SimulatedClient:
+    """Archive client answering after a delay proportional to the requested range."""
+
+    def weather_api(self, url, params, method="GET"):
+        response = Response(params)
+        time.sleep(ROUND_TRIP_SECONDS + SECONDS_PER_YEAR * response.days / 365)
+        return [response]
+
+    def data_age(self, url, params, method="GET"):
+        return None
+
+
+def measure_single_call():
+    start = time.perf_counter()
+    api.get_historical_weather_data(0, 0, START_DATE, END_DATE, use_store=False)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def measure_streaming():
+    start = time.perf_counter()
+    first_chunk = None
+    for _ in api.iter_historical_weather_data(0, 0, START_DATE, END_DATE):
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - start
+    return first_chunk, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    client = SimulatedClient()
+    api.setup_openmeteo_client = lambda *args, **kwargs: client
+    api.get_location_archive_store = lambda *args, **kwargs: None
+    print(f"{'method':<12} {'first data':>12} {'total':>10}")
+    for method, measure in (("single call", measure_single_call), ("streaming", measure_streaming)):
+        first_data, total = measure()
+        print(f"{method:<12} {first_data:>10.2f} s {total:>8.2f} s")
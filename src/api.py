@@ -1,11 +1,21 @@
 import requests
-import openmeteo_requests
-import requests_cache
+import asyncio
+import threading
+import time
 import pandas as pd
-from retry_requests import retry
-from datetime import datetime
+import numpy as np
+import calendar
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, date, timedelta
 from ai_prompts import UA_prompt, EN_prompt
 from settings_manager import load_settings
+from client_manager import get_openmeteo_client, make_request_key, POOL_MAXSIZE
+from cache_manager import get_result_cache, get_column_cache, get_expiry, register_expiry_provider, \
+    NEAR_TERM_HOURS, NEAR_TERM_EXPIRY, FORECAST_TAIL_EXPIRY
+from archive_store import get_archive_store, settled_until, ARCHIVE_EPOCH_TIMESTAMP, ARCHIVE_SETTLE_DAYS
+from climatology import CLIMATOLOGY_VARIABLES, calendar_slot, update_climatology_index
+from decoding import DecodedBlock
+from unit_conversion import CANONICAL_UNITS, CANONICAL_UNIT_PARAMS, convert_dataframe, convert_values, convert_block
 import gettext
 
 selected_locale = load_settings().get("locale", "ua")
@@ -13,20 +23,255 @@ text_object = gettext.translation('api', localedir='../locales', languages=[sele
 text_object.install()
 _ = text_object.gettext
 
+# First year included in the "this day in history" comparison
+HISTORY_START_YEAR = 1945
+
+# Maximum number of concurrent requests of the async API, matching the keep-alive pool size
+ASYNC_CONCURRENCY_LIMIT = POOL_MAXSIZE
+
+# Daily variables of the archive requests, in the order they are requested
+HISTORICAL_DAILY_VARIABLES = ["temperature_2m_max", "temperature_2m_min", "temperature_2m_mean", "daylight_duration",
+                              "precipitation_sum", "wind_speed_10m_max"]
+
+# Hourly variables of the archive store, always fetched together so the store holds all of them for every span
+HISTORICAL_HOURLY_VARIABLES = ["temperature_2m", "precipitation", "wind_speed_10m"]
+
+# Hourly variables of the forecast requests, in the order they are requested
+FORECAST_HOURLY_VARIABLES = ["temperature_2m", "relative_humidity_2m", "apparent_temperature",
+                             "precipitation_probability", "precipitation", "surface_pressure", "visibility",
+                             "wind_speed_10m", "uv_index"]
+
+# Current weather variables, in the order they are requested
+CURRENT_VARIABLES = ["relative_humidity_2m", "apparent_temperature", "rain", "showers", "snowfall", "wind_speed_10m",
+                     "wind_gusts_10m"]
+
+# Number of days covered by forecast requests
+FORECAST_DAYS = 14
+
+# Maximum number of coordinates packed into one multi-location request
+BATCH_MAX_LOCATIONS = 100
+
+# Open-Meteo metadata of the models whose runs renew forecast data. The first days of a forecast come from
+# regional models updated every few hours, the rest from global ones.
+FORECAST_MODEL_METADATA_URLS = {
+    "near_term": "https://api.open-meteo.com/data/dwd_icon_eu/static/meta.json",
+    "tail": "https://api.open-meteo.com/data/dwd_icon/static/meta.json",
+}
+
+# Area of the ICON-EU model as (south, north, west, east) in degrees. The forecast API's best_match serves the
+# tracked models there; elsewhere it serves other models, so forecasts of other locations get fixed expiries.
+FORECAST_MODEL_AREA = (29.5, 70.5, -23.5, 62.5)
+
+# Seconds between metadata checks while a model's next run is overdue or its metadata cannot be downloaded
+MODEL_RUN_RECHECK = 600
+
+# Bounds in seconds of expiries derived from model runs
+MODEL_RUN_MIN_EXPIRY = 60
+MODEL_RUN_MAX_EXPIRY = 12 * 3600
+
+# Counters of the forecast refreshes of selected variables, see get_forecast_columns
+forecast_refresh_stats = {"refreshes": 0, "full_fetches": 0, "window_fetches": 0, "rows_fetched": 0,
+                          "bytes_fetched": 0}
+last_forecast_refresh = {"rows_fetched": 0, "bytes_fetched": 0}
+forecast_refresh_stats_lock = threading.Lock()
+
 
 def setup_openmeteo_client(cache_expire_after=3600):
     """
-    Sets up the Open-Meteo API client with caching and retry on errors.
+    Returns the shared Open-Meteo API client with caching, connection pooling and retry on errors.
+
+    The client is created once per process and reused by every call, so sessions, the cache database
+    and keep-alive connections are not rebuilt on each refresh. Coordinates are snapped to the model grid
+    when the "snap_coordinates" setting is enabled.
+
+    Args:
+        cache_expire_after (int, optional): Cache expiration time in seconds of endpoints without their own
+            expiry in `cache_manager.ENDPOINT_EXPIRY`. Defaults to 3600 seconds.
+
+    Returns:
+        SharedOpenMeteoClient: Open-Meteo API client instance.
+    """
+    return get_openmeteo_client(cache_expire_after, load_settings().get("snap_coordinates", False))
+
+
+def memoized(url, params, decode):
+    """
+    Returns the decoded result of a request, decoding it only when no unexpired result is memoized.
+
+    Results are kept in the process-wide result cache under the request's cache key, so they expire together
+    with the cached response they come from. Callers must not modify the returned result.
+
+    Args:
+        url (str): API endpoint URL.
+        params (dict): Request parameters.
+        decode (callable): Function fetching and decoding the result, called without arguments.
+
+    Returns:
+        Any: The decoded result.
+    """
+    openmeteo = setup_openmeteo_client()
+    result_cache = get_result_cache()
+    key = make_request_key("GET", url, openmeteo.normalize_params(url, params, count=False))
+    result = result_cache.get(key)
+    if result is None:
+        result = decode()
+        expiry = get_expiry(url, params, openmeteo.cache_expire_after)
+        if expiry is not None:
+            # A stale response served while it is refreshed gets an expiry in the past and is not memoized
+            expiry -= openmeteo.data_age(url, params) or 0
+        result_cache.set(key, result, None if expiry is None else time.time() + expiry)
+    return result
+
+
+class ModelRunScheduler:
+    """
+    Tracks when weather models published their last run and when the next one is expected.
+
+    Metadata is downloaded in the background on first use and again once the next run is due, so cached
+    forecasts expire when new data can exist rather than after a fixed time. Until the metadata is known,
+    callers fall back to fixed expiries.
+    """
+
+    def __init__(self, metadata_urls, recheck=MODEL_RUN_RECHECK):
+        self.metadata_urls = metadata_urls
+        self.recheck = recheck
+        self.lock = threading.Lock()
+        self.runs = {}
+        self.checked_at = {}
+        self.checking = set()
+
+    def update(self, name, metadata):
+        """
+        Stores the run times of a model.
+
+        Args:
+            name (str): Key of the model in `metadata_urls`.
+            metadata (dict): Contents of the model's meta.json.
+        """
+        with self.lock:
+            self.runs[name] = (metadata["last_run_availability_time"], metadata["update_interval_seconds"])
+            self.checked_at[name] = time.time()
+
+    def check(self, name):
+        """Downloads the metadata of a model. Known run times are kept if it fails."""
+        try:
+            response = requests.get(self.metadata_urls[name], timeout=10)
+            response.raise_for_status()
+            self.update(name, response.json())
+        except (requests.RequestException, ValueError, KeyError):
+            with self.lock:
+                self.checked_at[name] = time.time()
+        finally:
+            with self.lock:
+                self.checking.discard(name)
+
+    def check_in_background(self, name):
+        """Checks the metadata of a model in a daemon thread, at most once every `recheck` seconds."""
+        with self.lock:
+            if name in self.checking or time.time() - self.checked_at.get(name, 0) < self.recheck:
+                return
+            self.checking.add(name)
+        threading.Thread(target=self.check, args=(name,), daemon=True).start()
+
+    def expires_at(self, name, fetched_at):
+        """
+        Returns when data of a model downloaded at a given time goes stale.
+
+        Args:
+            name (str): Key of the model in `metadata_urls`.
+            fetched_at (float): Unix time the data was downloaded.
+
+        Returns:
+            float: Unix time the next run is expected, clamped to MODEL_RUN_MIN_EXPIRY and MODEL_RUN_MAX_EXPIRY
+                after `fetched_at`, or None if the model's runs are not known yet.
+        """
+        now = time.time()
+        with self.lock:
+            run = self.runs.get(name)
+        if run is None:
+            self.check_in_background(name)
+            return None
+        available_at, interval = run
+        if fetched_at < available_at:
+            # The data predates the last run
+            expires_at = available_at
+        elif available_at + interval > now:
+            expires_at = available_at + interval
+        else:
+            # The next run is overdue, so look for it and revalidate once it may have appeared
+            self.check_in_background(name)
+            expires_at = now + self.recheck
+        return min(max(expires_at, fetched_at + MODEL_RUN_MIN_EXPIRY), fetched_at + MODEL_RUN_MAX_EXPIRY)
+
+
+# Global scheduler of the forecast model runs
+model_runs = ModelRunScheduler(FORECAST_MODEL_METADATA_URLS)
+
+
+def in_forecast_model_area(latitude, longitude):
+    """
+    Checks whether every location of a request lies in FORECAST_MODEL_AREA.
+
+    Args:
+        latitude (float | str | list): Latitude, or latitudes as a list or a comma-separated string.
+        longitude (float | str | list): Longitude, or longitudes as a list or a comma-separated string.
+
+    Returns:
+        bool: Whether the runs of the tracked models renew the forecasts of the locations.
+    """
+    def coordinates(value):
+        return [float(v) for v in (value if isinstance(value, (list, tuple)) else str(value).split(","))]
+
+    south, north, west, east = FORECAST_MODEL_AREA
+    return all(south <= lat <= north and west <= lon <= east
+               for lat, lon in zip(coordinates(latitude), coordinates(longitude)))
+
+
+def get_forecast_expires_at(latitude, longitude, fetched_at, near_term=False):
+    """
+    Returns when forecast data downloaded at a given time goes stale.
 
     Args:
-        cache_expire_after (int, optional): Cache expiration time in seconds. Defaults to 3600 seconds.
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        fetched_at (float): Unix time the data was downloaded.
+        near_term (bool, optional): Whether the data only covers the near-term window. Defaults to False.
+
+    Returns:
+        float: Unix time of the next expected model run, or of the fixed expiry while run times are unknown or
+            the location is outside FORECAST_MODEL_AREA.
+    """
+    expires_at = None
+    if in_forecast_model_area(latitude, longitude):
+        expires_at = model_runs.expires_at("near_term" if near_term else "tail", fetched_at)
+    if expires_at is None:
+        return fetched_at + (NEAR_TERM_EXPIRY if near_term else FORECAST_TAIL_EXPIRY)
+    return expires_at
+
+
+def get_forecast_expiry(params):
+    """
+    Returns how long a forecast response fetched now stays fresh, for `cache_manager.get_expiry`.
+
+    Args:
+        params (dict): Request parameters.
 
     Returns:
-        openmeteo_requests.Client: Open-Meteo API client instance.
+        float: Seconds until the next run of the models behind the response, or None while unknown or for
+            locations outside FORECAST_MODEL_AREA.
     """
-    cache_session = requests_cache.CachedSession('.cache', expire_after=cache_expire_after)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    return openmeteo_requests.Client(session=retry_session)
+    if "latitude" not in params or not in_forecast_model_area(params["latitude"], params["longitude"]):
+        return None
+    now = time.time()
+    names = ["near_term"] if "forecast_hours" in params else ["near_term", "tail"]
+    # A full forecast holds near-term rows as well, so it goes stale with whichever model runs first
+    expiry_times = [model_runs.expires_at(name, now) for name in names]
+    if None in expiry_times:
+        return None
+    return min(expiry_times) - now
+
+
+register_expiry_provider("https://api.open-meteo.com/v1/forecast", get_forecast_expiry)
 
 
 def convert_units(temperature_unit="Celsius °C", wind_speed_unit="m/s", precipitation_unit="Millimeter"):
@@ -54,363 +299,437 @@ def convert_units(temperature_unit="Celsius °C", wind_speed_unit="m/s", precipi
     )
 
 
-def get_historical_weather_data(latitude, longitude, start_date, end_date, temperature_unit="celsius",
-                                wind_speed_unit="m/s", precipitation_unit="mm"):
+def build_historical_request(latitude, longitude, start_date, end_date):
     """
-    Fetches historical weather data for specified coordinates and date range.
+    Builds the archive API request for historical daily weather data in canonical units.
 
     Args:
         latitude (float): Latitude of the location.
         longitude (float): Longitude of the location.
         start_date (str): Start date for the data in 'YYYY-MM-DD' format.
         end_date (str): End date for the data in 'YYYY-MM-DD' format.
-        temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
-        wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
-        precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
 
     Returns:
-        pd.DataFrame: DataFrame containing the historical weather data.
+        tuple: Request URL and parameters.
     """
-    temperature_unit_, wind_speed_unit_, precipitation_unit_ = convert_units(
-        temperature_unit, wind_speed_unit, precipitation_unit
-    )
-
-    openmeteo = setup_openmeteo_client()
-
     url = "https://archive-api.open-meteo.com/v1/archive"
     params = {
         "latitude": latitude,
         "longitude": longitude,
         "start_date": start_date,
         "end_date": end_date,
-        "daily": ["temperature_2m_max", "temperature_2m_min", "temperature_2m_mean", "daylight_duration",
-                  "precipitation_sum", "wind_speed_10m_max"],
-        "temperature_unit": temperature_unit_,
-        "wind_speed_unit": wind_speed_unit_,
-        "precipitation_unit": precipitation_unit_,
+        "daily": HISTORICAL_DAILY_VARIABLES,
+        **CANONICAL_UNIT_PARAMS,
         "timezone": "auto"
     }
+    return url, params
 
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
-
-    daily = response.Daily()
-    daily_data = {
-        "date": pd.date_range(
-            start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-            end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=daily.Interval()),
-            inclusive="left"
-        ),
-        "temperature_2m_max": daily.Variables(0).ValuesAsNumpy(),
-        "temperature_2m_min": daily.Variables(1).ValuesAsNumpy(),
-        "temperature_2m_mean": daily.Variables(2).ValuesAsNumpy(),
-        "daylight_duration": daily.Variables(3).ValuesAsNumpy(),
-        "precipitation_sum": daily.Variables(4).ValuesAsNumpy(),
-        "wind_speed_10m_max": daily.Variables(5).ValuesAsNumpy()
-    }
 
-    daily_dataframe = pd.DataFrame(data=daily_data)
-    return daily_dataframe
+def parse_historical_response(response):
+    """
+    Converts an archive API response into a DataFrame of daily weather data.
+
+    Args:
+        response (WeatherApiResponse): Response for one location.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the historical weather data.
+    """
+    return DecodedBlock.from_response_block(response.Daily(), HISTORICAL_DAILY_VARIABLES).to_dataframe()
 
 
-def get_forecast_data(latitude, longitude, temperature_unit="celsius", wind_speed_unit="m/s", precipitation_unit="mm"):
+def build_historical_hourly_request(latitude, longitude, start_date, end_date,
+                                    variables=HISTORICAL_HOURLY_VARIABLES):
     """
-    Fetches forecast weather data for specified coordinates.
+    Builds the archive API request for historical hourly weather data in canonical units.
+
+    Hourly data is requested in GMT, so its time axis has no daylight saving gaps or repeats and maps directly
+    onto the slots of the hourly archive store.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        start_date (str): Start date for the data in 'YYYY-MM-DD' format.
+        end_date (str): End date for the data in 'YYYY-MM-DD' format.
+        variables (list, optional): Hourly variables to request. Defaults to HISTORICAL_HOURLY_VARIABLES.
+
+    Returns:
+        tuple: Request URL and parameters.
+    """
+    url, params = build_historical_request(latitude, longitude, start_date, end_date)
+    del params["daily"]
+    params.update(hourly=list(variables), timezone="GMT")
+    return url, params
+
+
+def get_location_archive_store(latitude, longitude, resolution="daily"):
+    """
+    Returns the local archive store holding a location's data in canonical units.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        resolution (str, optional): 'daily' or 'hourly'. Defaults to 'daily'.
+
+    Returns:
+        ArchiveStore: Store for the location.
+    """
+    return get_archive_store(latitude, longitude, "_".join(CANONICAL_UNITS), resolution)
+
+
+def store_archive_response(store, response, hourly=False):
+    """
+    Writes the daily or hourly block of an archive API response into a local archive store.
+
+    Args:
+        store (ArchiveStore): Store of the response's location.
+        response (WeatherApiResponse): Archive response for one location.
+        hourly (bool, optional): Whether to store the hourly block with HISTORICAL_HOURLY_VARIABLES instead of
+            the daily one. Defaults to False.
+    """
+    if hourly:
+        block = DecodedBlock.from_response_block(response.Hourly(), HISTORICAL_HOURLY_VARIABLES)
+    else:
+        block = DecodedBlock.from_response_block(response.Daily(), HISTORICAL_DAILY_VARIABLES)
+    utc_offset_seconds = response.UtcOffsetSeconds()
+    start_index = (block.start + utc_offset_seconds - ARCHIVE_EPOCH_TIMESTAMP) // block.interval
+    columns = {name: block.column(name) for name in block.names}
+    store.write(start_index, columns, utc_offset_seconds, settled_until(store))
+
+
+def get_historical_weather_data(latitude, longitude, start_date, end_date, temperature_unit="celsius",
+                                wind_speed_unit="m/s", precipitation_unit="mm", use_store=True):
+    """
+    Fetches historical weather data for specified coordinates and date range.
+
+    Archive data does not change, so by default it is kept in a local archive store and only the date spans
+    not held yet are requested from the API. Data is fetched and stored in canonical units and converted to the
+    requested units afterwards. The data read from the store is memoized, so repeated calls for the same range
+    skip the store as well.
 
     Args:
         latitude (float): Latitude of the location.
         longitude (float): Longitude of the location.
+        start_date (str): Start date for the data in 'YYYY-MM-DD' format.
+        end_date (str): End date for the data in 'YYYY-MM-DD' format.
         temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
         wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
         precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+        use_store (bool, optional): Whether to use the local archive store. Defaults to True.
 
     Returns:
-        pd.DataFrame: DataFrame containing the forecast weather data.
+        pd.DataFrame: DataFrame containing the historical weather data.
     """
-    temperature_unit_, wind_speed_unit_, precipitation_unit_ = convert_units(
-        temperature_unit, wind_speed_unit, precipitation_unit
-    )
-
+    units = convert_units(temperature_unit, wind_speed_unit, precipitation_unit)
+    url, params = build_historical_request(latitude, longitude, start_date, end_date)
     openmeteo = setup_openmeteo_client()
 
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "hourly": ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "precipitation_probability",
-                   "precipitation", "surface_pressure", "visibility", "wind_speed_10m", "uv_index"],
-        "forecast_days": 14,
-        "temperature_unit": temperature_unit_,
-        "wind_speed_unit": wind_speed_unit_,
-        "precipitation_unit": precipitation_unit_,
-        "timezone": "auto"
-    }
+    store = get_location_archive_store(latitude, longitude) if use_store else None
+    if store is None or store.index_of(start_date) < 0:
+        responses = openmeteo.weather_api(url, params=params)
+        return convert_dataframe(parse_historical_response(responses[0]), units)
 
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
-
-    hourly = response.Hourly()
-    hourly_data = {
-        "date": pd.date_range(
-            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=hourly.Interval()),
-            inclusive="left"
-        ),
-        "temperature_2m": hourly.Variables(0).ValuesAsNumpy(),
-        "relative_humidity_2m": hourly.Variables(1).ValuesAsNumpy(),
-        "apparent_temperature": hourly.Variables(2).ValuesAsNumpy(),
-        "precipitation_probability": hourly.Variables(3).ValuesAsNumpy(),
-        "precipitation": hourly.Variables(4).ValuesAsNumpy(),
-        "surface_pressure": hourly.Variables(5).ValuesAsNumpy(),
-        "visibility": hourly.Variables(6).ValuesAsNumpy(),
-        "wind_speed_10m": hourly.Variables(7).ValuesAsNumpy(),
-        "uv_index": hourly.Variables(8).ValuesAsNumpy()
-    }
+    def read_from_store():
+        start_index = store.index_of(start_date)
+        end_index = store.index_of(end_date) + 1
+        for gap_start, gap_end in store.missing_ranges(start_index, end_index):
+            gap_url, gap_params = build_historical_request(latitude, longitude,
+                                                           store.date_of(gap_start).isoformat(),
+                                                           store.date_of(gap_end - 1).isoformat())
+            responses = openmeteo.weather_api(gap_url, params=gap_params)
+            store_archive_response(store, responses[0])
 
-    hourly_dataframe = pd.DataFrame(data=hourly_data)
-    return hourly_dataframe
+        daily_data = {"date": pd.to_datetime(store.timestamps(start_index, end_index), unit="s", utc=True)}
+        daily_data.update(store.read(start_index, end_index, HISTORICAL_DAILY_VARIABLES))
+        return pd.DataFrame(data=daily_data)
 
+    daily_dataframe = memoized(url, params, read_from_store)
+    return convert_dataframe(daily_dataframe, units)
 
-def get_current_weather(latitude, longitude, temperature_unit="celsius",
-                        wind_speed_unit="m/s", precipitation_unit="mm"):
+
+def get_historical_hourly_data(latitude, longitude, start_date, end_date, variables=None, temperature_unit="celsius",
+                               wind_speed_unit="m/s", precipitation_unit="mm", use_store=True):
     """
-    Fetches current weather data for specified coordinates.
+    Fetches hourly historical weather data for specified coordinates and UTC date range.
+
+    Hourly series hold 24 times the values of daily ones, so they are returned as a compact DecodedBlock rather
+    than a DataFrame; its `to_dataframe()` builds one when needed. By default the data is kept in the
+    location's hourly archive store, one memory-mapped file per variable, so only spans not held yet are
+    requested and reading a year of a multi-decade series touches just that year of the files.
 
     Args:
         latitude (float): Latitude of the location.
         longitude (float): Longitude of the location.
+        start_date (str): Start date for the data in 'YYYY-MM-DD' format.
+        end_date (str): End date for the data in 'YYYY-MM-DD' format.
+        variables (list, optional): Names from HISTORICAL_HOURLY_VARIABLES. Defaults to all of them.
         temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
         wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
         precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+        use_store (bool, optional): Whether to use the local archive store. Defaults to True.
 
     Returns:
-        str: Formatted string containing the current weather data.
-    """
-    temperature_unit_, wind_speed_unit_, precipitation_unit_ = convert_units(
-        temperature_unit, wind_speed_unit, precipitation_unit
-    )
+        DecodedBlock: Hourly values of the variables.
 
+    Raises:
+        ValueError: If a variable is not in HISTORICAL_HOURLY_VARIABLES, the only ones the store holds.
+    """
+    variables = list(variables or HISTORICAL_HOURLY_VARIABLES)
+    unknown = [name for name in variables if name not in HISTORICAL_HOURLY_VARIABLES]
+    if unknown:
+        raise ValueError(f"Unknown hourly variables: {', '.join(unknown)}")
+    units = convert_units(temperature_unit, wind_speed_unit, precipitation_unit)
     openmeteo = setup_openmeteo_client()
 
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "current": ["relative_humidity_2m", "apparent_temperature", "rain", "showers", "snowfall", "wind_speed_10m",
-                    "wind_gusts_10m"],
-        "hourly": "temperature_2m",
-        "temperature_unit": temperature_unit_,
-        "wind_speed_unit": wind_speed_unit_,
-        "precipitation_unit": precipitation_unit_,
-        "timezone": "auto"
-    }
+    store = get_location_archive_store(latitude, longitude, "hourly") if use_store else None
+    if store is None or store.index_of(start_date) < 0:
+        url, params = build_historical_hourly_request(latitude, longitude, start_date, end_date, variables)
+        responses = openmeteo.weather_api(url, params=params)
+        return convert_block(DecodedBlock.from_response_block(responses[0].Hourly(), variables), units)
 
-    # Fetch weather data
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
-    current = response.Current()
+    start_index = store.index_of(start_date)
+    end_index = store.index_of(end_date) + 86400 // store.step_seconds
+    for gap_start, gap_end in store.missing_ranges(start_index, end_index):
+        gap_url, gap_params = build_historical_hourly_request(latitude, longitude,
+                                                              store.date_of(gap_start).isoformat(),
+                                                              store.date_of(gap_end - 1).isoformat())
+        responses = openmeteo.weather_api(gap_url, params=gap_params)
+        store_archive_response(store, responses[0], hourly=True)
 
-    current_relative_humidity_2m = current.Variables(0).Value()
-    current_apparent_temperature = current.Variables(1).Value()
-    current_rain = current.Variables(2).Value()
-    current_showers = current.Variables(3).Value()
-    current_snowfall = current.Variables(4).Value()
-    current_wind_speed_10m = current.Variables(5).Value()
-    current_wind_gusts_10m = current.Variables(6).Value()
+    start = store.timestamps(start_index, start_index + 1)[0]
+    values = store.read_array(start_index, end_index, variables)
+    return convert_block(DecodedBlock(start, store.step_seconds, variables, values), units)
 
-    # Get the current system time in HH:mm format
-    current_system_time = datetime.now().strftime("%H:%M")
 
-    # Format the current weather data into a string
-    weather_string = (
-        f"Time: {current_system_time}, "
-        f"Apparent Temperature: {round(current_apparent_temperature, 1)} {temperature_unit_}, "
-        f"Relative Humidity: {round(current_relative_humidity_2m, 1)}%, "
-        f"Rain: {round(current_rain, 1)} {precipitation_unit_}, "
-        f"Showers: {round(current_showers, 1)} {precipitation_unit_}, "
-        f"Snowfall: {round(current_snowfall, 1)} {precipitation_unit_}, "
-        f"Wind Speed: {round(current_wind_speed_10m, 1)} {wind_speed_unit_}, "
-        f"Wind Gusts: {round(current_wind_gusts_10m, 1)} {wind_speed_unit_}"
-    )
-    return weather_string
+def split_date_range(start_date, end_date, chunk_years=1):
+    """
+    Splits a date range into chunks aligned to calendar years.
 
+    Args:
+        start_date (str): Start date in 'YYYY-MM-DD' format.
+        end_date (str): End date in 'YYYY-MM-DD' format.
+        chunk_years (int, optional): Number of calendar years per chunk. Defaults to 1.
 
-def get_history_of_date(latitude, longitude, temperature_unit="celsius", wind_speed_unit="m/s",
-                        precipitation_unit="mm"):
+    Returns:
+        list: (start_date, end_date) tuples of 'YYYY-MM-DD' strings in chronological order.
     """
-    Fetches historical weather data for a specified location on this date for years starting from 1945.
+    start, end = date.fromisoformat(str(start_date)), date.fromisoformat(str(end_date))
+    chunks = []
+    while start <= end:
+        chunk_end = min(date(start.year + chunk_years - 1, 12, 31), end)
+        chunks.append((start.isoformat(), chunk_end.isoformat()))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def iter_historical_weather_data(latitude, longitude, start_date, end_date, temperature_unit="celsius",
+                                 wind_speed_unit="m/s", precipitation_unit="mm", chunk_years=1,
+                                 max_workers=ASYNC_CONCURRENCY_LIMIT):
+    """
+    Fetches historical weather data in year-sized chunks, yielding each chunk as soon as it arrives.
+
+    Chunks are fetched concurrently with `get_historical_weather_data`, so they share its archive store and
+    memoization, and are yielded in the order they complete rather than in date order. Closing the generator
+    early cancels the chunks that have not started.
 
     Args:
         latitude (float): Latitude of the location.
         longitude (float): Longitude of the location.
+        start_date (str): Start date for the data in 'YYYY-MM-DD' format.
+        end_date (str): End date for the data in 'YYYY-MM-DD' format.
         temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
         wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
         precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+        chunk_years (int, optional): Number of calendar years per chunk. Defaults to 1.
+        max_workers (int, optional): Maximum number of chunks fetched at once. Defaults to ASYNC_CONCURRENCY_LIMIT.
 
-    Returns:
-        tuple: DataFrames containing today's weather data and historical weather data.
+    Yields:
+        pd.DataFrame: Historical weather data of one chunk.
     """
-    temperature_unit_, wind_speed_unit_, precipitation_unit_ = convert_units(
-        temperature_unit, wind_speed_unit, precipitation_unit
-    )
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(get_historical_weather_data, latitude, longitude, chunk_start, chunk_end,
+                                   temperature_unit, wind_speed_unit, precipitation_unit)
+                   for chunk_start, chunk_end in split_date_range(start_date, end_date, chunk_years)]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def build_forecast_request(latitude, longitude, variables=FORECAST_HOURLY_VARIABLES):
+    """
+    Builds the forecast API request for hourly forecast data in canonical units.
 
-    openmeteo = setup_openmeteo_client()
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        variables (list, optional): Hourly variables to request. Defaults to FORECAST_HOURLY_VARIABLES.
 
-    # Fetch current weather data
-    current_url = "https://api.open-meteo.com/v1/forecast"
-    current_params = {
+    Returns:
+        tuple: Request URL and parameters.
+    """
+    url = "https://api.open-meteo.com/v1/forecast"
+    params = {
         "latitude": latitude,
         "longitude": longitude,
-        "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum", "wind_speed_10m_max"],
-        "temperature_unit": temperature_unit_,
-        "wind_speed_unit": wind_speed_unit_,
-        "precipitation_unit": precipitation_unit_,
+        "hourly": list(variables),
+        "forecast_days": FORECAST_DAYS,
+        **CANONICAL_UNIT_PARAMS,
         "timezone": "auto"
     }
+    return url, params
 
-    current_responses = openmeteo.weather_api(current_url, params=current_params)
-    current_response = current_responses[0]
-    current_daily = current_response.Daily()
 
-    today_data = {
-        "date": [pd.to_datetime(current_daily.Time(), unit="s", utc=True)],
-        "temperature_2m_max": [current_daily.Variables(0).ValuesAsNumpy()[0]],
-        "temperature_2m_min": [current_daily.Variables(1).ValuesAsNumpy()[0]],
-        "precipitation_sum": [current_daily.Variables(2).ValuesAsNumpy()[0]],
-        "wind_speed_10m_max": [current_daily.Variables(3).ValuesAsNumpy()[0]]
-    }
-    today_dataframe = pd.DataFrame(data=today_data)
+def parse_forecast_response(response):
+    """
+    Converts a forecast API response into a DataFrame of hourly forecast data.
 
-    # Fetch historical weather data
-    historical_url = "https://archive-api.open-meteo.com/v1/archive"
-    today = datetime.now()
-    historical_data = []
-
-    for year in range(1945, today.year):
-        date_str = today.replace(year=year).strftime('%Y-%m-%d')
-        historical_params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "start_date": date_str,
-            "end_date": date_str,
-            "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum", "wind_speed_10m_max"],
-            "temperature_unit": temperature_unit_,
-            "wind_speed_unit": wind_speed_unit_,
-            "precipitation_unit": precipitation_unit_,
-            "timezone": "auto"
-        }
-        historical_responses = openmeteo.weather_api(historical_url, params=historical_params)
-        historical_response = historical_responses[0]
-        historical_daily = historical_response.Daily()
-
-        historical_data.append({
-            "date": pd.to_datetime(historical_daily.Time(), unit="s", utc=True),
-            "temperature_2m_max": historical_daily.Variables(0).ValuesAsNumpy()[0],
-            "temperature_2m_min": historical_daily.Variables(1).ValuesAsNumpy()[0],
-            "precipitation_sum": historical_daily.Variables(2).ValuesAsNumpy()[0],
-            "wind_speed_10m_max": historical_daily.Variables(3).ValuesAsNumpy()[0]
-        })
-
-    historical_dataframe = pd.DataFrame(data=historical_data)
-    return today_dataframe, historical_dataframe
+    Args:
+        response (WeatherApiResponse): Response for one location.
 
+    Returns:
+        pd.DataFrame: DataFrame containing the forecast weather data.
+    """
+    return DecodedBlock.from_response_block(response.Hourly(), FORECAST_HOURLY_VARIABLES).to_dataframe()
 
-def compare_todays_data(today_df, historical_df):
+
+def get_forecast_location_key(latitude, longitude):
     """
-    Compares today's weather data with historical data and generates a comparison report.
+    Returns the key under which the hourly forecast columns of a location are cached.
+
+    It is the cache key of the location's forecast request without its variable list, so requests for
+    different variables share it, and snapped coordinates share it with their neighbours.
 
     Args:
-        today_df (pd.DataFrame): DataFrame containing today's weather data.
-        historical_df (pd.DataFrame): DataFrame containing historical weather data.
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
 
     Returns:
-        str: Comparison report.
+        tuple: Key of the location.
     """
-    report = []
+    url, params = build_forecast_request(latitude, longitude)
+    del params["hourly"]
+    return make_request_key("GET", url, setup_openmeteo_client().normalize_params(url, params, count=False))
 
-    # Max and Min Temperature Analysis
-    today_max_temp = today_df['temperature_2m_max'].values[0]
-    today_min_temp = today_df['temperature_2m_min'].values[0]
-    historical_sorted_by_max_temp = historical_df.sort_values(by='temperature_2m_max', ascending=False)
-    historical_sorted_by_min_temp = historical_df.sort_values(by='temperature_2m_min', ascending=True)
 
-    hottest_year = historical_sorted_by_max_temp.iloc[0]['date'].year
-    hottest_temp = historical_sorted_by_max_temp.iloc[0]['temperature_2m_max']
-    coldest_year = historical_sorted_by_min_temp.iloc[0]['date'].year
-    coldest_temp = historical_sorted_by_min_temp.iloc[0]['temperature_2m_min']
+def fetch_forecast_columns(latitude, longitude, variables, near_term=False):
+    """
+    Requests hourly forecast columns of selected variables.
 
-    max_temp_rank = (historical_sorted_by_max_temp['temperature_2m_max'] >= today_max_temp).sum()
-    min_temp_rank = (historical_sorted_by_min_temp['temperature_2m_min'] <= today_min_temp).sum()
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        variables (list): Names from FORECAST_HOURLY_VARIABLES.
+        near_term (bool, optional): Whether to request only the next NEAR_TERM_HOURS instead of all
+            FORECAST_DAYS. Defaults to False.
 
-    if max_temp_rank == 1:
-        temp_rank_text = _("Today is the hottest day on this date since 1945")
-    elif min_temp_rank == 1:
-        temp_rank_text = _("Today is the coldest day on this date since 1945")
-    else:
-        if max_temp_rank >= min_temp_rank:
-            temp_rank_text = _("Today is the {}-th hottest day on this date since 1945").format(max_temp_rank)
-        else:
-            temp_rank_text = _("Today is the {}-th coldest day on this date since 1945").format(min_temp_rank)
+    Returns:
+        tuple: DecodedBlock with the variables in canonical units and the Unix time it was downloaded at.
+    """
+    url, params = build_forecast_request(latitude, longitude, variables)
+    if near_term:
+        del params["forecast_days"]
+        params["forecast_hours"] = NEAR_TERM_HOURS
+    openmeteo = setup_openmeteo_client()
+    responses = openmeteo.weather_api(url, params=params)
+    block = DecodedBlock.from_response_block(responses[0].Hourly(), variables)
+    data_age = openmeteo.data_age(url, params)
+    return block, time.time() - (data_age or 0)
 
-    report.append(
-        temp_rank_text + _(", with the hottest being in ") + f"{hottest_year}" + _(" with a max temperature of ") +
-        f"{hottest_temp:.1f}°C, " + _("and the coldest being in ") + f"{coldest_year}" + _(
-            " with a min temperature of ") +
-        f"{coldest_temp:.1f}°C."
-    )
 
-    # Precipitation Analysis
-    today_precipitation = today_df['precipitation_sum'].values[0]
-    if today_precipitation == 0:
-        last_rain_year = historical_df[historical_df['precipitation_sum'] > 0].iloc[-1]['date'].year
-        last_rain_amount = historical_df[historical_df['precipitation_sum'] > 0].iloc[-1]['precipitation_sum']
-        report.append(
-            _("Last rain on this date was in ") + f"{last_rain_year}" + _(" with ") + f"{last_rain_amount:.1f}" +
-            _(" mm of rain."))
-    else:
-        max_precipitation = historical_df['precipitation_sum'].max()
-        if today_precipitation > max_precipitation:
-            report.append(
-                _("Today has the highest precipitation on this date since 1945 with ") + f"{today_precipitation:.1f}" +
-                _(" mm of rain."))
-        else:
-            wettest_year = historical_df.loc[historical_df['precipitation_sum'].idxmax(), 'date'].year
-            report.append(
-                _("Today has ") + f"{today_precipitation:.1f}" + _(
-                    " mm of rain. The wettest day on this date since 1945 was in ") + f"{wettest_year}" + _(
-                    " with ") + f"{max_precipitation:.1f}" + _(" mm of rain."))
+def get_forecast_columns(latitude, longitude, variables, retry=True):
+    """
+    Fetches the hourly forecast of selected variables, requesting only data that is not cached.
 
-    # Wind Speed Analysis
-    today_wind_speed = today_df['wind_speed_10m_max'].values[0]
-    historical_sorted_by_wind_speed = historical_df.sort_values(by='wind_speed_10m_max', ascending=False)
-    historical_sorted_by_calm_wind = historical_df.sort_values(by='wind_speed_10m_max', ascending=True)
+    Columns that are not cached, or whose full horizon expired with the next run of the global model, are
+    requested for all FORECAST_DAYS. Cached columns whose first NEAR_TERM_HOURS expired with the next run of
+    the regional model only have that window requested and merged into them, which is most of the refreshes.
+    See `get_forecast_expires_at`. The rows and bytes fetched are counted in `forecast_refresh_stats`.
 
-    max_wind_speed_year = historical_sorted_by_wind_speed.iloc[0]['date'].year
-    max_wind_speed = historical_sorted_by_wind_speed.iloc[0]['wind_speed_10m_max']
-    calmest_wind_year = historical_sorted_by_calm_wind.iloc[0]['date'].year
-    calmest_wind_speed = historical_sorted_by_calm_wind.iloc[0]['wind_speed_10m_max']
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        variables (list): Names from FORECAST_HOURLY_VARIABLES.
+        retry (bool, optional): Whether to drop the location's columns and fetch them again once when a
+            fetched block does not fit them. Defaults to True.
 
-    wind_speed_rank = (historical_sorted_by_wind_speed['wind_speed_10m_max'] >= today_wind_speed).sum()
+    Returns:
+        tuple: DecodedBlock with the variables in canonical units and the Unix time its oldest column was
+            downloaded at, or None if unknown.
+    """
+    column_cache = get_column_cache()
+    key = get_forecast_location_key(latitude, longitude)
+    fetched = []
+
+    missing = column_cache.missing(key, variables)
+    if missing:
+        block, fetched_at = fetch_forecast_columns(latitude, longitude, missing)
+        column_cache.add(key, block, fetched_at, get_forecast_expires_at(latitude, longitude, fetched_at),
+                         get_forecast_expires_at(latitude, longitude, fetched_at, near_term=True))
+        fetched.append(("full_fetches", block))
+
+    stale = column_cache.stale_near_term(key, variables)
+    if stale:
+        block, fetched_at = fetch_forecast_columns(latitude, longitude, stale, near_term=True)
+        if column_cache.patch(key, block, get_forecast_expires_at(latitude, longitude, fetched_at, near_term=True)):
+            fetched.append(("window_fetches", block))
+        elif retry:
+            # The window does not fit the cached columns, e.g. after midnight moved the time axis
+            column_cache.remove(key)
+            return get_forecast_columns(latitude, longitude, variables, retry=False)
+        # Otherwise it does not fit the columns just fetched either, as when both responses are old copies
+        # served offline, so the columns are returned without the window
+
+    columns = column_cache.get(key, variables)
+    if columns is None and retry:
+        # The location's time axis moved on between the fetch and the merge, so fetch everything again
+        column_cache.remove(key)
+        return get_forecast_columns(latitude, longitude, variables, retry=False)
+    if columns is None:
+        # It moved on again, so the full horizon is returned without going through the cache
+        block, fetched_at = fetch_forecast_columns(latitude, longitude, variables)
+        fetched.append(("full_fetches", block))
+        columns = block, fetched_at
+
+    with forecast_refresh_stats_lock:
+        forecast_refresh_stats["refreshes"] += 1
+        last_forecast_refresh.update(rows_fetched=0, bytes_fetched=0)
+        for counter, block in fetched:
+            forecast_refresh_stats[counter] += 1
+            last_forecast_refresh["rows_fetched"] += len(block)
+            last_forecast_refresh["bytes_fetched"] += block.values.nbytes
+        forecast_refresh_stats["rows_fetched"] += last_forecast_refresh["rows_fetched"]
+        forecast_refresh_stats["bytes_fetched"] += last_forecast_refresh["bytes_fetched"]
+    return columns
+
+
+def get_forecast_refresh_stats():
+    """
+    Returns a snapshot of the forecast refresh counters.
 
-    if wind_speed_rank == 1:
-        wind_speed_text = _("Today has the highest wind speed on this date since 1945")
-    else:
-        wind_speed_text = _("Today is the {}-th windiest day on this date since 1945").format(wind_speed_rank)
+    Bytes are counted as the size of the decoded values, which is close to their size in the FlatBuffers
+    payload.
 
-    report.append(
-        wind_speed_text + _(", with the highest wind speed being in ") + f"{max_wind_speed_year}" + _(" with ") +
-        f"{max_wind_speed:.1f}" + _(" m/s, and the calmest in ") + f"{calmest_wind_year}" + _(
-            " with ") + f"{calmest_wind_speed:.1f}" + _(" m/s.")
-    )
-    return "\n\n".join(report)
+    Returns:
+        dict: Number of refreshes, full and near-term window fetches, rows and bytes fetched in total, and
+            'last_refresh' with the rows and bytes fetched by the latest refresh.
+    """
+    with forecast_refresh_stats_lock:
+        stats = dict(forecast_refresh_stats)
+        stats["last_refresh"] = dict(last_forecast_refresh)
+    return stats
 
 
-def get_clothing_recommendations(latitude, longitude, temperature_unit="celsius",
-                                 wind_speed_unit="m/s", precipitation_unit="mm"):
+def get_forecast_data(latitude, longitude, temperature_unit="celsius", wind_speed_unit="m/s", precipitation_unit="mm",
+                      variables=None):
     """
-    Fetches clothing recommendations based on current weather data for the specified location.
+    Fetches forecast weather data for specified coordinates.
+
+    Without `variables` the data is sliced from the location's forecast bundle. With `variables` only those
+    columns are returned, and only the ones not cached yet are requested, so the payload and the decode scale
+    with what is displayed. Cached data is returned immediately, even when expired or offline, and refreshed in
+    the background. The age of the returned data in seconds is stored in the DataFrame's `attrs["data_age"]`.
 
     Args:
         latitude (float): Latitude of the location.
@@ -418,11 +737,661 @@ def get_clothing_recommendations(latitude, longitude, temperature_unit="celsius"
         temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
         wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
         precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+        variables (list, optional): Names from FORECAST_HOURLY_VARIABLES to return. Defaults to all of them.
 
     Returns:
-        str: Clothing recommendations.
+        pd.DataFrame: DataFrame containing the forecast weather data.
     """
-    api_url = "https://misha1tigr.pythonanywhere.com/generate"
+    if variables is None:
+        bundle = get_forecast_bundle(latitude, longitude)
+        hourly, fetched_at = bundle["hourly"], bundle["fetched_at"]
+    else:
+        # The time axis comes with the columns, so at least one has to be fetched
+        hourly, fetched_at = get_forecast_columns(latitude, longitude, list(variables) or FORECAST_HOURLY_VARIABLES[:1])
+    units = convert_units(temperature_unit, wind_speed_unit, precipitation_unit)
+    hourly_dataframe = convert_dataframe(hourly.to_dataframe(), units)
+    hourly_dataframe.attrs["data_age"] = None if fetched_at is None else time.time() - fetched_at
+    return hourly_dataframe
+
+
+def build_current_weather_request(latitude, longitude):
+    """
+    Builds the forecast API request for current weather data in canonical units.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+
+    Returns:
+        tuple: Request URL and parameters.
+    """
+    url = "https://api.open-meteo.com/v1/forecast"
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "current": CURRENT_VARIABLES,
+        "hourly": "temperature_2m",
+        **CANONICAL_UNIT_PARAMS,
+        "timezone": "auto"
+    }
+    return url, params
+
+
+def format_current_weather(values, units):
+    """
+    Formats current weather values as a string.
+
+    Args:
+        values (dict): Current weather variable names mapped to their values in canonical units.
+        units (tuple): Open-Meteo temperature, wind speed and precipitation units to show the values in.
+
+    Returns:
+        str: Formatted string containing the current weather data.
+    """
+    values = convert_values(values, units)
+    temperature_unit_, wind_speed_unit_, precipitation_unit_ = units
+
+    # Get the current system time in HH:mm format
+    current_system_time = datetime.now().strftime("%H:%M")
+
+    # Format the current weather data into a string
+    weather_string = (
+        f"Time: {current_system_time}, "
+        f"Apparent Temperature: {round(values['apparent_temperature'], 1)} {temperature_unit_}, "
+        f"Relative Humidity: {round(values['relative_humidity_2m'], 1)}%, "
+        f"Rain: {round(values['rain'], 1)} {precipitation_unit_}, "
+        f"Showers: {round(values['showers'], 1)} {precipitation_unit_}, "
+        f"Snowfall: {round(values['snowfall'], 1)} {precipitation_unit_}, "
+        f"Wind Speed: {round(values['wind_speed_10m'], 1)} {wind_speed_unit_}, "
+        f"Wind Gusts: {round(values['wind_gusts_10m'], 1)} {wind_speed_unit_}"
+    )
+    return weather_string
+
+
+def parse_current_weather_response(response, units):
+    """
+    Formats a current weather API response as a string.
+
+    Args:
+        response (WeatherApiResponse): Response for one location, in canonical units.
+        units (tuple): Open-Meteo temperature, wind speed and precipitation units to show the values in.
+
+    Returns:
+        str: Formatted string containing the current weather data.
+    """
+    current = response.Current()
+    values = {name: current.Variables(i).Value() for i, name in enumerate(CURRENT_VARIABLES)}
+    return format_current_weather(values, units)
+
+
+class ReportText(str):
+    """
+    Text built from weather data, with the age of that data in seconds in `data_age`, or None if unknown.
+    """
+    data_age = None
+
+
+def report_text(text, data_age):
+    """
+    Attaches the age of the data a text was built from to it.
+
+    Args:
+        text (str): The text.
+        data_age (float): Age of the data in seconds, or None if unknown.
+
+    Returns:
+        ReportText: The text with its `data_age`.
+    """
+    text = ReportText(text)
+    text.data_age = data_age
+    return text
+
+
+def get_current_weather(latitude, longitude, temperature_unit="celsius",
+                        wind_speed_unit="m/s", precipitation_unit="mm"):
+    """
+    Fetches current weather data for specified coordinates.
+
+    The data is sliced from the location's forecast bundle.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
+        wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
+        precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+
+    Returns:
+        ReportText: Formatted string containing the current weather data, with the age of the bundle it was
+            taken from in `data_age`.
+    """
+    bundle = get_forecast_bundle(latitude, longitude)
+    text = format_current_weather(bundle["current"], convert_units(temperature_unit, wind_speed_unit,
+                                                                   precipitation_unit))
+    return report_text(text, None if bundle["fetched_at"] is None else time.time() - bundle["fetched_at"])
+
+
+def build_forecast_bundle_request(latitude, longitude):
+    """
+    Builds one forecast API request covering the current, hourly and daily blocks in canonical units.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+
+    Returns:
+        tuple: Request URL and parameters.
+    """
+    url, params = build_forecast_request(latitude, longitude)
+    params["current"] = CURRENT_VARIABLES
+    params["daily"] = CLIMATOLOGY_VARIABLES
+    return url, params
+
+
+def get_forecast_bundle(latitude, longitude):
+    """
+    Fetches the current, hourly and daily forecast of a location with a single request.
+
+    The decoded bundle is memoized until its response expires, so the Forecast, AI and history tabs share one
+    request and one decode per location. Values are in canonical units, so a unit change is served from the
+    same bundle.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+
+    Returns:
+        dict: 'hourly' and 'daily' DecodedBlocks, 'current' values, request 'params' and 'fetched_at', the Unix
+            time the data was downloaded at, or None if unknown.
+    """
+    url, params = build_forecast_bundle_request(latitude, longitude)
+    openmeteo = setup_openmeteo_client()
+
+    def decode():
+        responses = openmeteo.weather_api(url, params=params)
+        response = responses[0]
+        current = response.Current()
+        data_age = openmeteo.data_age(url, params)
+        fetched_at = None if data_age is None else time.time() - data_age
+        hourly = DecodedBlock.from_response_block(response.Hourly(), FORECAST_HOURLY_VARIABLES)
+        # Share the hourly columns with forecasts of selected variables
+        column_fetched_at = fetched_at or time.time()
+        get_column_cache().add(get_forecast_location_key(latitude, longitude), hourly, fetched_at,
+                               get_forecast_expires_at(latitude, longitude, column_fetched_at),
+                               get_forecast_expires_at(latitude, longitude, column_fetched_at, near_term=True))
+        return {
+            "hourly": hourly,
+            "daily": DecodedBlock.from_response_block(response.Daily(), CLIMATOLOGY_VARIABLES),
+            "current": {name: current.Variables(i).Value() for i, name in enumerate(CURRENT_VARIABLES)},
+            "params": params,
+            "fetched_at": fetched_at
+        }
+
+    return memoized(url, params, decode)
+
+
+def fetch_locations_batched(locations, build_request, batch_size=BATCH_MAX_LOCATIONS):
+    """
+    Fetches one response per location, packing several locations into each request.
+
+    Args:
+        locations (list): Locations as stored in the settings, each with 'latitude' and 'longitude'.
+        build_request (callable): Function taking latitude and longitude and returning the request URL and
+            parameters. It is called with comma-separated coordinate lists.
+        batch_size (int, optional): Maximum number of locations per request. Defaults to BATCH_MAX_LOCATIONS.
+
+    Returns:
+        list: WeatherApiResponse objects in the order of the given locations.
+    """
+    openmeteo = setup_openmeteo_client()
+    responses = []
+    for start in range(0, len(locations), batch_size):
+        batch = locations[start:start + batch_size]
+        url, params = build_request(",".join(str(location["latitude"]) for location in batch),
+                                    ",".join(str(location["longitude"]) for location in batch))
+        responses.extend(openmeteo.weather_api(url, params=params))
+    return responses
+
+
+def get_forecast_data_batch(locations, temperature_unit="celsius", wind_speed_unit="m/s", precipitation_unit="mm",
+                            batch_size=BATCH_MAX_LOCATIONS):
+    """
+    Fetches forecast weather data for several locations with as few requests as possible.
+
+    Args:
+        locations (list): Locations as stored in the settings, each with 'latitude' and 'longitude'.
+        temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
+        wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
+        precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+        batch_size (int, optional): Maximum number of locations per request. Defaults to BATCH_MAX_LOCATIONS.
+
+    Returns:
+        list: Forecast DataFrames in the order of the given locations.
+    """
+    units = convert_units(temperature_unit, wind_speed_unit, precipitation_unit)
+    responses = fetch_locations_batched(locations, build_forecast_request, batch_size)
+    return [convert_dataframe(parse_forecast_response(response), units) for response in responses]
+
+
+def get_current_weather_batch(locations, temperature_unit="celsius", wind_speed_unit="m/s", precipitation_unit="mm",
+                              batch_size=BATCH_MAX_LOCATIONS):
+    """
+    Fetches current weather data for several locations with as few requests as possible.
+
+    Args:
+        locations (list): Locations as stored in the settings, each with 'latitude' and 'longitude'.
+        temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
+        wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
+        precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+        batch_size (int, optional): Maximum number of locations per request. Defaults to BATCH_MAX_LOCATIONS.
+
+    Returns:
+        list: Formatted current weather strings in the order of the given locations.
+    """
+    units = convert_units(temperature_unit, wind_speed_unit, precipitation_unit)
+    responses = fetch_locations_batched(locations, build_current_weather_request, batch_size)
+    return [parse_current_weather_response(response, units) for response in responses]
+
+
+def same_calendar_day(date, year):
+    """
+    Returns the same calendar day as the given date in another year.
+
+    February 29 falls back to February 28 in non-leap years.
+
+    Args:
+        date (datetime): The reference date.
+        year (int): The year to move the date to.
+
+    Returns:
+        datetime: The date in the given year.
+    """
+    if date.month == 2 and date.day == 29 and not calendar.isleap(year):
+        return date.replace(year=year, day=28)
+    return date.replace(year=year)
+
+
+def same_calendar_day_mask(dates, month, day):
+    """
+    Builds a boolean mask selecting one calendar day from every year of a daily date series.
+
+    When the requested day is February 29, February 28 is selected in non-leap years so every year is represented.
+
+    Args:
+        dates (pd.DatetimeIndex): Local dates of the series.
+        month (int): Month of the calendar day.
+        day (int): Day of month of the calendar day.
+
+    Returns:
+        np.ndarray: Boolean mask with one True value per year covered by the series.
+    """
+    months = dates.month.to_numpy()
+    days = dates.day.to_numpy()
+    mask = (months == month) & (days == day)
+    if month == 2 and day == 29:
+        years = dates.year.to_numpy()
+        leap_years = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+        mask |= ~leap_years & (months == 2) & (days == 28)
+    return mask
+
+
+def get_history_of_date(latitude, longitude, temperature_unit="celsius", wind_speed_unit="m/s",
+                        precipitation_unit="mm", bulk=True, chunk_years=None):
+    """
+    Fetches historical weather data for a specified location on this date for years starting from 1945.
+
+    By default the daily archive series is downloaded in one request (or one request per `chunk_years` years)
+    and this date is selected from every year locally. With `bulk=False` one archive request is made per year.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
+        wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
+        precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+        bulk (bool, optional): Whether to fetch the whole archive series at once. Defaults to True.
+        chunk_years (int, optional): Number of years per archive request in bulk mode. Defaults to all years
+            in a single request.
+
+    Returns:
+        tuple: DataFrames containing today's weather data and historical weather data.
+    """
+    units = convert_units(temperature_unit, wind_speed_unit, precipitation_unit)
+    openmeteo = setup_openmeteo_client()
+
+    # Today's weather comes from the shared forecast bundle
+    bundle = get_forecast_bundle(latitude, longitude)
+    today_dataframe = convert_dataframe(bundle["daily"].slice(0, 1).to_dataframe(), units)
+
+    # Fetch historical weather data
+    historical_url = "https://archive-api.open-meteo.com/v1/archive"
+    today = datetime.now()
+    historical_variables = ["temperature_2m_max", "temperature_2m_min", "precipitation_sum", "wind_speed_10m_max"]
+
+    if not bulk:
+        historical_data = []
+        for year in range(HISTORY_START_YEAR, today.year):
+            date_str = same_calendar_day(today, year).strftime('%Y-%m-%d')
+            historical_params = {
+                "latitude": latitude,
+                "longitude": longitude,
+                "start_date": date_str,
+                "end_date": date_str,
+                "daily": historical_variables,
+                **CANONICAL_UNIT_PARAMS,
+                "timezone": "auto"
+            }
+            historical_responses = openmeteo.weather_api(historical_url, params=historical_params)
+            historical_response = historical_responses[0]
+            historical_daily = historical_response.Daily()
+
+            historical_data.append({
+                "date": pd.to_datetime(historical_daily.Time(), unit="s", utc=True),
+                "temperature_2m_max": historical_daily.Variables(0).ValuesAsNumpy()[0],
+                "temperature_2m_min": historical_daily.Variables(1).ValuesAsNumpy()[0],
+                "precipitation_sum": historical_daily.Variables(2).ValuesAsNumpy()[0],
+                "wind_speed_10m_max": historical_daily.Variables(3).ValuesAsNumpy()[0]
+            })
+
+        historical_dataframe = convert_dataframe(pd.DataFrame(data=historical_data), units)
+        return today_dataframe, historical_dataframe
+
+    # Fetch the whole daily series in as few archive requests as possible and pick this date from every year.
+    # The series goes through the local archive store, so only years not fetched before hit the network.
+    chunk_years = chunk_years or max(today.year - HISTORY_START_YEAR, 1)
+    historical_frames = []
+    for chunk_start in range(HISTORY_START_YEAR, today.year, chunk_years):
+        chunk_end = min(chunk_start + chunk_years, today.year) - 1
+        chunk_dataframe = get_historical_weather_data(latitude, longitude, f"{chunk_start}-01-01",
+                                                      f"{chunk_end}-12-31", temperature_unit, wind_speed_unit,
+                                                      precipitation_unit)
+        local_dates = pd.date_range(start=f"{chunk_start}-01-01", periods=len(chunk_dataframe), freq="D")
+        mask = same_calendar_day_mask(local_dates, today.month, today.day)
+        historical_frames.append(chunk_dataframe.loc[mask, ["date"] + historical_variables])
+
+    historical_dataframe = pd.concat(historical_frames, ignore_index=True)
+    return today_dataframe, historical_dataframe
+
+
+def format_comparison_report(max_temp_rank, min_temp_rank, hottest, coldest, today_precipitation, last_rain,
+                             wettest, wind_speed_rank, windiest, calmest, day=None):
+    """
+    Formats the comparison of a day's weather with the same date in previous years.
+
+    Args:
+        max_temp_rank (int): Number of years at least as hot as the day.
+        min_temp_rank (int): Number of years at least as cold as the day.
+        hottest (tuple): Year and max temperature of the hottest year.
+        coldest (tuple): Year and min temperature of the coldest year.
+        today_precipitation (float): Precipitation of the day.
+        last_rain (tuple): Year and amount of the last precipitation on this date, or None.
+        wettest (tuple): Year and amount of the highest precipitation on this date.
+        wind_speed_rank (int): Number of years at least as windy as the day.
+        windiest (tuple): Year and wind speed of the windiest year.
+        calmest (tuple): Year and wind speed of the calmest year.
+        day (date, optional): The compared date, named in the report unless it is today. Defaults to today.
+
+    Returns:
+        str: Comparison report.
+    """
+    report = []
+    today = day is None or day == date.today()
+    day_text = "" if today else day.isoformat()
+
+    hottest_year, hottest_temp = hottest
+    coldest_year, coldest_temp = coldest
+    if max_temp_rank == 1:
+        temp_rank_text = (_("Today is the hottest day on this date since 1945") if today else
+                          _("{} is the hottest day on this date since 1945").format(day_text))
+    elif min_temp_rank == 1:
+        temp_rank_text = (_("Today is the coldest day on this date since 1945") if today else
+                          _("{} is the coldest day on this date since 1945").format(day_text))
+    else:
+        if max_temp_rank >= min_temp_rank:
+            temp_rank_text = (
+                _("Today is the {}-th hottest day on this date since 1945").format(max_temp_rank) if today else
+                _("{} is the {}-th hottest day on this date since 1945").format(day_text, max_temp_rank))
+        else:
+            temp_rank_text = (
+                _("Today is the {}-th coldest day on this date since 1945").format(min_temp_rank) if today else
+                _("{} is the {}-th coldest day on this date since 1945").format(day_text, min_temp_rank))
+
+    report.append(
+        temp_rank_text + _(", with the hottest being in ") + f"{hottest_year}" + _(" with a max temperature of ") +
+        f"{hottest_temp:.1f}°C, " + _("and the coldest being in ") + f"{coldest_year}" + _(
+            " with a min temperature of ") +
+        f"{coldest_temp:.1f}°C."
+    )
+
+    # Precipitation Analysis
+    if today_precipitation == 0:
+        if last_rain is not None:
+            last_rain_year, last_rain_amount = last_rain
+            report.append(
+                _("Last rain on this date was in ") + f"{last_rain_year}" + _(" with ") + f"{last_rain_amount:.1f}" +
+                _(" mm of rain."))
+    else:
+        wettest_year, max_precipitation = wettest
+        if today_precipitation > max_precipitation:
+            report.append(
+                (_("Today has the highest precipitation on this date since 1945 with ") if today else
+                 _("{} has the highest precipitation on this date since 1945 with ").format(day_text)) +
+                f"{today_precipitation:.1f}" + _(" mm of rain."))
+        else:
+            report.append(
+                (_("Today has ") if today else _("{} has ").format(day_text)) + f"{today_precipitation:.1f}" + _(
+                    " mm of rain. The wettest day on this date since 1945 was in ") + f"{wettest_year}" + _(
+                    " with ") + f"{max_precipitation:.1f}" + _(" mm of rain."))
+
+    # Wind Speed Analysis
+    max_wind_speed_year, max_wind_speed = windiest
+    calmest_wind_year, calmest_wind_speed = calmest
+    if wind_speed_rank == 1:
+        wind_speed_text = (_("Today has the highest wind speed on this date since 1945") if today else
+                           _("{} has the highest wind speed on this date since 1945").format(day_text))
+    else:
+        wind_speed_text = (
+            _("Today is the {}-th windiest day on this date since 1945").format(wind_speed_rank) if today else
+            _("{} is the {}-th windiest day on this date since 1945").format(day_text, wind_speed_rank))
+
+    report.append(
+        wind_speed_text + _(", with the highest wind speed being in ") + f"{max_wind_speed_year}" + _(" with ") +
+        f"{max_wind_speed:.1f}" + _(" m/s, and the calmest in ") + f"{calmest_wind_year}" + _(
+            " with ") + f"{calmest_wind_speed:.1f}" + _(" m/s.")
+    )
+    return "\n\n".join(report)
+
+
+def compare_todays_data(today_df, historical_df):
+    """
+    Compares today's weather data with historical data and generates a comparison report.
+
+    All extrema, ranks and the last rain lookup are computed directly on the column arrays, without sorting
+    or copying the DataFrame. Ties resolve to the earliest row.
+
+    Args:
+        today_df (pd.DataFrame): DataFrame containing today's weather data.
+        historical_df (pd.DataFrame): DataFrame containing historical weather data.
+
+    Returns:
+        str: Comparison report.
+    """
+    dates = historical_df['date'].values
+    max_temps = historical_df['temperature_2m_max'].to_numpy()
+    min_temps = historical_df['temperature_2m_min'].to_numpy()
+    precipitation = historical_df['precipitation_sum'].to_numpy()
+    wind_speeds = historical_df['wind_speed_10m_max'].to_numpy()
+
+    def year_at(position):
+        return pd.Timestamp(dates[position]).year
+
+    def extreme(values, highest):
+        # Missing values never win, like with sort_values, which places them last
+        position = int(np.argmax(np.where(np.isnan(values), -np.inf, values)) if highest
+                       else np.argmin(np.where(np.isnan(values), np.inf, values)))
+        return year_at(position), values[position]
+
+    # Max and Min Temperature Analysis
+    today_max_temp = today_df['temperature_2m_max'].values[0]
+    today_min_temp = today_df['temperature_2m_min'].values[0]
+    max_temp_rank = np.count_nonzero(max_temps >= today_max_temp)
+    min_temp_rank = np.count_nonzero(min_temps <= today_min_temp)
+
+    # Precipitation Analysis
+    today_precipitation = today_df['precipitation_sum'].values[0]
+    last_rain = None
+    wettest = None
+    if today_precipitation == 0:
+        rainy_positions = np.flatnonzero(precipitation > 0)
+        if len(rainy_positions):
+            last_rain = (year_at(rainy_positions[-1]), precipitation[rainy_positions[-1]])
+    else:
+        wettest = extreme(precipitation, highest=True)
+
+    # Wind Speed Analysis
+    today_wind_speed = today_df['wind_speed_10m_max'].values[0]
+    wind_speed_rank = np.count_nonzero(wind_speeds >= today_wind_speed)
+
+    return format_comparison_report(max_temp_rank, min_temp_rank, extreme(max_temps, highest=True),
+                                    extreme(min_temps, highest=False), today_precipitation, last_rain, wettest,
+                                    wind_speed_rank, extreme(wind_speeds, highest=True),
+                                    extreme(wind_speeds, highest=False))
+
+
+def get_weather_of_date(latitude, longitude, day):
+    """
+    Fetches the daily weather of one date in canonical units, from the forecast API for recent and coming days
+    and from the archive otherwise.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        day (date): The date.
+
+    Returns:
+        pd.DataFrame: One-row DataFrame with the date's weather data. The age in seconds of forecast data is
+            stored in its `attrs["data_age"]`; settled archive data has none.
+    """
+    if day < date.today() - timedelta(days=ARCHIVE_SETTLE_DAYS):
+        day_dataframe = get_historical_weather_data(latitude, longitude, day.isoformat(), day.isoformat())
+        day_dataframe = day_dataframe[["date"] + CLIMATOLOGY_VARIABLES]
+        day_dataframe.attrs["data_age"] = None
+        return day_dataframe
+
+    days_ahead = (day - date.today()).days
+    if 0 <= days_ahead < FORECAST_DAYS:
+        bundle = get_forecast_bundle(latitude, longitude)
+        day_dataframe = bundle["daily"].slice(days_ahead, days_ahead + 1).to_dataframe()
+        day_dataframe.attrs["data_age"] = (None if bundle["fetched_at"] is None
+                                           else time.time() - bundle["fetched_at"])
+        return day_dataframe
+
+    openmeteo = setup_openmeteo_client()
+    url = "https://api.open-meteo.com/v1/forecast"
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "daily": CLIMATOLOGY_VARIABLES,
+        "start_date": day.isoformat(),
+        "end_date": day.isoformat(),
+        **CANONICAL_UNIT_PARAMS,
+        "timezone": "auto"
+    }
+    responses = openmeteo.weather_api(url, params=params)
+    daily = responses[0].Daily()
+
+    day_data = {"date": [pd.to_datetime(daily.Time(), unit="s", utc=True)]}
+    for i, variable in enumerate(CLIMATOLOGY_VARIABLES):
+        day_data[variable] = [daily.Variables(i).ValuesAsNumpy()[0]]
+    day_dataframe = pd.DataFrame(data=day_data)
+    day_dataframe.attrs["data_age"] = openmeteo.data_age(url, params)
+    return day_dataframe
+
+
+def get_date_comparison(latitude, longitude, day=None):
+    """
+    Compares the weather of a date with the same date in every year since 1945.
+
+    The comparison uses the location's climatology index, which is built from the local archive store on
+    first use and extended when a new year completes. The index holds canonical units, which are the units
+    the report is worded in.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        day (date, optional): The compared date. Defaults to today.
+
+    Returns:
+        ReportText: Comparison report, with the age of the compared date's data in `data_age`.
+    """
+    day = day or date.today()
+    last_year = date.today().year - 1
+
+    store = get_location_archive_store(latitude, longitude)
+    first_index = store.index_of(f"{HISTORY_START_YEAR}-01-01")
+    last_index = store.index_of(f"{last_year}-12-31") + 1
+    if store.missing_ranges(first_index, last_index):
+        get_historical_weather_data(latitude, longitude, f"{HISTORY_START_YEAR}-01-01", f"{last_year}-12-31")
+    index = update_climatology_index(store, HISTORY_START_YEAR, last_year)
+
+    day_dataframe = get_weather_of_date(latitude, longitude, day)
+    return report_text(compare_date_with_climatology(index, day_dataframe, day), day_dataframe.attrs.get("data_age"))
+
+
+def compare_date_with_climatology(index, day_df, day):
+    """
+    Compares the weather of a date with the same date in the years of a climatology index.
+
+    Ranks and records are looked up in the precomputed index, so no historical data is scanned. When the
+    date's own year is in the index, it is left out of the comparison.
+
+    Args:
+        index (ClimatologyIndex): Climatology index of the location.
+        day_df (pd.DataFrame): DataFrame containing the weather data of the date.
+        day (date): The compared date.
+
+    Returns:
+        str: Comparison report.
+    """
+    slot = calendar_slot(day.month, day.day)
+    year = day.year
+
+    day_max_temp = day_df['temperature_2m_max'].values[0]
+    day_min_temp = day_df['temperature_2m_min'].values[0]
+    day_precipitation = day_df['precipitation_sum'].values[0]
+    day_wind_speed = day_df['wind_speed_10m_max'].values[0]
+
+    return format_comparison_report(
+        index.count_at_least('temperature_2m_max', slot, day_max_temp, year),
+        index.count_at_most('temperature_2m_min', slot, day_min_temp, year),
+        index.record('temperature_2m_max', slot, highest=True, exclude_year=year),
+        index.record('temperature_2m_min', slot, highest=False, exclude_year=year),
+        day_precipitation,
+        index.last_rain(slot, exclude_year=year),
+        index.record('precipitation_sum', slot, highest=True, exclude_year=year),
+        index.count_at_least('wind_speed_10m_max', slot, day_wind_speed, year),
+        index.record('wind_speed_10m_max', slot, highest=True, exclude_year=year),
+        index.record('wind_speed_10m_max', slot, highest=False, exclude_year=year),
+        day
+    )
+
+
+def get_clothing_recommendations(latitude, longitude, temperature_unit="celsius",
+                                 wind_speed_unit="m/s", precipitation_unit="mm"):
+    """
+    Fetches clothing recommendations based on current weather data for the specified location.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
+        wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
+        precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+
+    Returns:
+        ReportText: Clothing recommendations, with the age of the weather data they are based on in `data_age`.
+    """
+    api_url = "https://misha1tigr.pythonanywhere.com/generate"
     current_weather = get_current_weather(latitude, longitude, temperature_unit,
                                           wind_speed_unit, precipitation_unit)
     selected_locale = load_settings().get("locale", "en")
@@ -431,26 +1400,162 @@ def get_clothing_recommendations(latitude, longitude, temperature_unit="celsius"
     else:
         prompt_text = UA_prompt
     prompt_text += current_weather
-    response = requests.post(api_url, json={"prompt": prompt_text})
+    try:
+        response = requests.post(api_url, json={"prompt": prompt_text})
+    except requests.ConnectionError as e:
+        return _("Error while loading data: ") + str(e)
 
     if response.status_code == 200:
-        return response.json()["response"]
+        return report_text(response.json()["response"], current_weather.data_age)
     else:
         return _("Error while loading data: ") + str(response.status_code)
 
 
-def search_location(query):
+def build_search_location_url(query):
     """
-    Searches for a location by name using the Open-Meteo geocoding API.
+    Builds the geocoding API URL for a location search.
 
     Args:
         query (str): The name of the location to search for.
 
+    Returns:
+        str: Request URL.
+    """
+    return f"https://geocoding-api.open-meteo.com/v1/search?name={query}"
+
+
+def parse_search_location_response(response):
+    """
+    Extracts the matching locations from a geocoding API response.
+
+    Args:
+        response (requests.Response): Geocoding API response.
+
     Returns:
         list: A list of matching locations.
     """
-    url = f"https://geocoding-api.open-meteo.com/v1/search?name={query}"
-    response = requests.get(url)
     response.raise_for_status()
     data = response.json()
     return data.get('results', [])
+
+
+def search_location(query):
+    """
+    Searches for a location by name using the Open-Meteo geocoding API.
+
+    Args:
+        query (str): The name of the location to search for.
+
+    Returns:
+        list: A list of matching locations.
+    """
+    response = requests.get(build_search_location_url(query))
+    return parse_search_location_response(response)
+
+
+async def gather_with_concurrency(coroutines, limit=ASYNC_CONCURRENCY_LIMIT):
+    """
+    Runs coroutines concurrently with at most `limit` of them in progress at a time.
+
+    Args:
+        coroutines (iterable): Coroutines to run.
+        limit (int, optional): Maximum number of coroutines running at once. Defaults to ASYNC_CONCURRENCY_LIMIT.
+
+    Returns:
+        list: Results in the order of the given coroutines.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run_limited(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run_limited(coroutine) for coroutine in coroutines))
+
+
+async def async_weather_api(url, params):
+    """
+    Runs a blocking request on the shared client in a worker thread.
+
+    Args:
+        url (str): API endpoint URL.
+        params (dict): Request parameters.
+
+    Returns:
+        list: WeatherApiResponse objects, one per requested location.
+    """
+    openmeteo = setup_openmeteo_client()
+    return await asyncio.to_thread(openmeteo.weather_api, url, params=params)
+
+
+async def async_get_historical_weather_data(latitude, longitude, start_date, end_date, temperature_unit="celsius",
+                                            wind_speed_unit="m/s", precipitation_unit="mm"):
+    """
+    Asynchronous counterpart of `get_historical_weather_data`.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the historical weather data.
+    """
+    return await asyncio.to_thread(get_historical_weather_data, latitude, longitude, start_date, end_date,
+                                   temperature_unit, wind_speed_unit, precipitation_unit)
+
+
+async def async_get_forecast_data(latitude, longitude, temperature_unit="celsius", wind_speed_unit="m/s",
+                                  precipitation_unit="mm"):
+    """
+    Asynchronous counterpart of `get_forecast_data`.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the forecast weather data.
+    """
+    url, params = build_forecast_request(latitude, longitude)
+    responses = await async_weather_api(url, params)
+    return convert_dataframe(parse_forecast_response(responses[0]),
+                             convert_units(temperature_unit, wind_speed_unit, precipitation_unit))
+
+
+async def async_get_current_weather(latitude, longitude, temperature_unit="celsius", wind_speed_unit="m/s",
+                                    precipitation_unit="mm"):
+    """
+    Asynchronous counterpart of `get_current_weather`.
+
+    Returns:
+        str: Formatted string containing the current weather data.
+    """
+    url, params = build_current_weather_request(latitude, longitude)
+    responses = await async_weather_api(url, params)
+    return parse_current_weather_response(responses[0],
+                                          convert_units(temperature_unit, wind_speed_unit, precipitation_unit))
+
+
+async def async_search_location(query):
+    """
+    Asynchronous counterpart of `search_location`.
+
+    Returns:
+        list: A list of matching locations.
+    """
+    response = await asyncio.to_thread(requests.get, build_search_location_url(query))
+    return parse_search_location_response(response)
+
+
+async def async_get_forecast_data_for_locations(locations, temperature_unit="celsius", wind_speed_unit="m/s",
+                                                precipitation_unit="mm", limit=ASYNC_CONCURRENCY_LIMIT):
+    """
+    Fetches forecast data for several saved locations concurrently.
+
+    Args:
+        locations (list): Locations as stored in the settings, each with 'latitude' and 'longitude'.
+        temperature_unit (str, optional): Unit for temperature. Defaults to 'celsius'.
+        wind_speed_unit (str, optional): Unit for wind speed. Defaults to 'm/s'.
+        precipitation_unit (str, optional): Unit for precipitation. Defaults to 'mm'.
+        limit (int, optional): Maximum number of requests in flight. Defaults to ASYNC_CONCURRENCY_LIMIT.
+
+    Returns:
+        list: Forecast DataFrames in the order of the given locations.
+    """
+    return await gather_with_concurrency(
+        (async_get_forecast_data(location["latitude"], location["longitude"], temperature_unit, wind_speed_unit,
+                                 precipitation_unit) for location in locations),
+        limit
+    )
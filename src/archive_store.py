@@ -0,0 +1,306 @@
+import calendar
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+import numpy as np
+import platformdirs
+
+# Archive data starts in 1940, all stored series are indexed from this local date
+ARCHIVE_EPOCH = datetime(1940, 1, 1)
+ARCHIVE_EPOCH_TIMESTAMP = calendar.timegm(ARCHIVE_EPOCH.timetuple())
+
+# Archive values of the most recent days may still be revised, they are refetched until this many days old
+ARCHIVE_SETTLE_DAYS = 7
+
+# Extra time allocated when a series file has to grow, to avoid rewriting it on every append
+GROWTH_SLACK_SECONDS = 366 * 86400
+
+# Seconds between the slots of a series of each resolution
+RESOLUTION_STEP_SECONDS = {"daily": 86400, "hourly": 3600}
+
+# Locks guarding each store directory against concurrent writers in this process
+store_locks = {}
+store_locks_lock = threading.Lock()
+
+
+def get_archive_dir():
+    """
+    Retrieve the directory holding the local archive store.
+
+    Returns:
+        str: The full path to the archive directory inside the user cache dir.
+    """
+    archive_dir = os.path.join(platformdirs.user_cache_dir("NeboKrug", "Korbut Mykhailo"), "archive")
+    os.makedirs(archive_dir, exist_ok=True)
+    return archive_dir
+
+
+def merge_spans(spans):
+    """
+    Merges overlapping or adjacent half-open index spans.
+
+    Args:
+        spans (list): Spans as [start, end) pairs.
+
+    Returns:
+        list: Sorted, non-overlapping spans.
+    """
+    merged = []
+    for start, end in sorted(spans):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def subtract_spans(start, end, spans):
+    """
+    Finds the parts of a half-open index range not covered by the given spans.
+
+    Args:
+        start (int): Start of the range.
+        end (int): End of the range (exclusive).
+        spans (list): Sorted, non-overlapping [start, end) spans.
+
+    Returns:
+        list: Missing sub-ranges as (start, end) tuples.
+    """
+    missing = []
+    position = start
+    for span_start, span_end in spans:
+        if span_end <= position:
+            continue
+        if span_start >= end:
+            break
+        if span_start > position:
+            missing.append((position, span_start))
+        position = max(position, span_end)
+        if position >= end:
+            break
+    if position < end:
+        missing.append((position, end))
+    return missing
+
+
+class ArchiveStore:
+    """
+    Persistent columnar store of archive data for one location.
+
+    Every variable is kept in its own NumPy file as a dense series indexed from ARCHIVE_EPOCH, so any
+    sub-range is read through a memory map without loading the whole file. A metadata file records which
+    index spans are already held.
+    """
+
+    def __init__(self, directory, step_seconds=86400):
+        self.directory = directory
+        self.step_seconds = step_seconds
+        self.metadata_path = os.path.join(directory, "metadata.json")
+        os.makedirs(directory, exist_ok=True)
+        with store_locks_lock:
+            self.lock = store_locks.setdefault(os.path.abspath(directory), threading.RLock())
+        self.metadata = self.load_metadata()
+
+    def load_metadata(self):
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path, "r") as file:
+                return json.load(file)
+        return {"utc_offset_seconds": None, "spans": []}
+
+    def save_metadata(self):
+        temporary_path = self.metadata_path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(self.metadata, file)
+        os.replace(temporary_path, self.metadata_path)
+
+    def variable_path(self, variable):
+        return os.path.join(self.directory, f"{variable}.npy")
+
+    def index_of(self, day):
+        """
+        Converts a local date to a series index.
+
+        Args:
+            day (str | date | datetime): Local date, strings in 'YYYY-MM-DD' format.
+
+        Returns:
+            int: Index of the first slot of that date.
+        """
+        if isinstance(day, str):
+            day = datetime.strptime(day, "%Y-%m-%d")
+        timestamp = calendar.timegm(day.timetuple()[:3] + (0, 0, 0))
+        return (timestamp - ARCHIVE_EPOCH_TIMESTAMP) // self.step_seconds
+
+    def date_of(self, index):
+        """
+        Converts a series index to the local date it belongs to.
+
+        Args:
+            index (int): Series index.
+
+        Returns:
+            date: Local date of the slot.
+        """
+        return (ARCHIVE_EPOCH + timedelta(seconds=int(index) * self.step_seconds)).date()
+
+    def missing_ranges(self, start_index, end_index):
+        """
+        Finds the index ranges that still have to be fetched.
+
+        Args:
+            start_index (int): Start of the requested range.
+            end_index (int): End of the requested range (exclusive).
+
+        Returns:
+            list: Missing sub-ranges as (start, end) tuples.
+        """
+        with self.lock:
+            return subtract_spans(start_index, end_index, self.metadata["spans"])
+
+    def open_for_write(self, variable, length):
+        """
+        Opens the series file of a variable for writing, growing it to at least the given length.
+
+        Args:
+            variable (str): Variable name.
+            length (int): Required number of slots.
+
+        Returns:
+            np.memmap: Writable memory map of the series.
+        """
+        path = self.variable_path(variable)
+        if os.path.exists(path):
+            series = np.lib.format.open_memmap(path, mode="r+")
+            if len(series) >= length:
+                return series
+            old_series = np.array(series)
+            del series
+        else:
+            old_series = np.empty(0, dtype=np.float32)
+
+        temporary_path = path + ".tmp.npy"
+        series = np.lib.format.open_memmap(temporary_path, mode="w+", dtype=np.float32,
+                                           shape=(length + GROWTH_SLACK_SECONDS // self.step_seconds,))
+        series[:] = np.nan
+        series[:len(old_series)] = old_series
+        series.flush()
+        del series
+        os.replace(temporary_path, path)
+        return np.lib.format.open_memmap(path, mode="r+")
+
+    def write(self, start_index, columns, utc_offset_seconds, settled_until_index=None):
+        """
+        Writes a block of fetched values and records it as held.
+
+        The metadata is read again before the span is added, so stores of the same directory writing
+        concurrently, such as the year chunks of one History load, keep each other's spans.
+
+        Args:
+            start_index (int): Series index of the first value.
+            columns (dict): Variable names mapped to value arrays of equal length.
+            utc_offset_seconds (int): UTC offset of the location's local time.
+            settled_until_index (int, optional): Values from this index on are written but not recorded as held,
+                so they are fetched again later. Defaults to no limit.
+        """
+        length = len(next(iter(columns.values())))
+        end_index = start_index + length
+        with self.lock:
+            for variable, values in columns.items():
+                series = self.open_for_write(variable, end_index)
+                series[start_index:end_index] = values
+                series.flush()
+                del series
+
+            held_end = end_index if settled_until_index is None else min(end_index, settled_until_index)
+            self.metadata = self.load_metadata()
+            self.metadata["spans"] = merge_spans(self.metadata["spans"] + [[start_index, held_end]])
+            self.metadata["utc_offset_seconds"] = int(utc_offset_seconds)
+            self.save_metadata()
+
+    def read_array(self, start_index, end_index, variables):
+        """
+        Reads a range of stored values into one array.
+
+        Only the pages of the requested range are read from the memory-mapped series files.
+
+        Args:
+            start_index (int): Start of the range.
+            end_index (int): End of the range (exclusive).
+            variables (list): Variable names to read.
+
+        Returns:
+            np.ndarray: float32 array of shape (time, variable), NaN where nothing is stored.
+        """
+        values = np.full((end_index - start_index, len(variables)), np.nan, dtype=np.float32)
+        with self.lock:
+            for i, variable in enumerate(variables):
+                path = self.variable_path(variable)
+                if os.path.exists(path):
+                    series = np.load(path, mmap_mode="r")
+                    available_end = min(end_index, len(series))
+                    if available_end > start_index:
+                        values[:available_end - start_index, i] = series[start_index:available_end]
+                    del series
+        return values
+
+    def read(self, start_index, end_index, variables):
+        """
+        Reads a range of stored values.
+
+        Args:
+            start_index (int): Start of the range.
+            end_index (int): End of the range (exclusive).
+            variables (list): Variable names to read.
+
+        Returns:
+            dict: Variable names mapped to copies of the stored values, NaN where nothing is stored.
+        """
+        values = self.read_array(start_index, end_index, variables)
+        return {variable: values[:, i] for i, variable in enumerate(variables)}
+
+    def timestamps(self, start_index, end_index):
+        """
+        Returns the UTC timestamps of a range of slots, matching the time axis of API responses.
+
+        Args:
+            start_index (int): Start of the range.
+            end_index (int): End of the range (exclusive).
+
+        Returns:
+            np.ndarray: Unix timestamps in seconds.
+        """
+        offset = self.metadata["utc_offset_seconds"] or 0
+        return ARCHIVE_EPOCH_TIMESTAMP + np.arange(start_index, end_index, dtype=np.int64) * self.step_seconds - offset
+
+
+def get_archive_store(latitude, longitude, units_key, resolution="daily"):
+    """
+    Returns the archive store of a location in the user cache dir.
+
+    Args:
+        latitude (float): Latitude of the location.
+        longitude (float): Longitude of the location.
+        units_key (str): Identifier of the units the values are stored in.
+        resolution (str, optional): Series resolution, a key of RESOLUTION_STEP_SECONDS. Defaults to 'daily'.
+
+    Returns:
+        ArchiveStore: Store for the location.
+    """
+    directory = os.path.join(get_archive_dir(), f"{latitude:.4f}_{longitude:.4f}_{units_key}", resolution)
+    return ArchiveStore(directory, RESOLUTION_STEP_SECONDS[resolution])
+
+
+def settled_until(store):
+    """
+    Returns the first index whose archive values may still change.
+
+    Args:
+        store (ArchiveStore): Store to compute the index for.
+
+    Returns:
+        int: Index of the first unsettled slot.
+    """
+    return store.index_of(date.today() - timedelta(days=ARCHIVE_SETTLE_DAYS))
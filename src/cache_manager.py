@@ -0,0 +1,613 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+import platformdirs
+from archive_store import ARCHIVE_SETTLE_DAYS
+from decoding import DecodedBlock
+
+# Seconds responses of each endpoint stay fresh, None keeps them until they are evicted
+ENDPOINT_EXPIRY = {
+    "https://archive-api.open-meteo.com/v1/archive": None,
+    "https://api.open-meteo.com/v1/forecast": 3600,
+}
+
+# Requests for current conditions go stale sooner than plain forecasts
+CURRENT_WEATHER_EXPIRY = 900
+
+# Hourly forecasts are refreshed in two windows: the next NEAR_TERM_HOURS often, as every model run changes
+# them, and the full horizon, whose long tail changes slowly, less often
+NEAR_TERM_HOURS = 48
+NEAR_TERM_EXPIRY = 900
+FORECAST_TAIL_EXPIRY = 3 * 3600
+
+# Archive requests reaching into the last days may still be revised, so they expire like forecasts
+RECENT_ARCHIVE_EXPIRY = 86400
+
+# Size limits in bytes of the two response tiers and of the decoded results
+MEMORY_CACHE_MAX_BYTES = 32 * 1024 * 1024
+DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+COLUMN_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Functions returning the expiry of an endpoint's requests from outside knowledge, e.g. model run times
+expiry_providers = {}
+
+# Global variables to hold the process-wide caches
+response_cache = None
+result_cache = None
+column_cache = None
+response_cache_lock = threading.Lock()
+
+
+def get_cache_path(filename="responses.sqlite"):
+    """
+    Retrieve the path of a database in the user cache dir.
+
+    Args:
+        filename (str, optional): Name of the database file. Defaults to the response cache database.
+
+    Returns:
+        str: The full path to the database file inside the user cache dir.
+    """
+    cache_dir = platformdirs.user_cache_dir("NeboKrug", "Korbut Mykhailo")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, filename)
+
+
+def register_expiry_provider(url, provider):
+    """
+    Lets a function decide the expiry of an endpoint's requests.
+
+    Args:
+        url (str): Endpoint URL.
+        provider (callable): Function taking the request parameters and returning the seconds a response
+            fetched now stays fresh, or None to fall back to the fixed expiry.
+    """
+    expiry_providers[url] = provider
+
+
+def get_expiry(url, params, default_expiry=3600):
+    """
+    Returns how long a response stays fresh.
+
+    Args:
+        url (str): Request URL.
+        params (dict): Request parameters.
+        default_expiry (int, optional): Expiry of endpoints not in ENDPOINT_EXPIRY. Defaults to 3600 seconds.
+
+    Returns:
+        int: Seconds the response stays fresh, or None if it never expires.
+    """
+    provider = expiry_providers.get(url)
+    expiry = provider(params) if provider is not None else None
+    if expiry is None:
+        expiry = ENDPOINT_EXPIRY.get(url, default_expiry)
+        if "forecast_hours" in params:
+            expiry = min(expiry or NEAR_TERM_EXPIRY, NEAR_TERM_EXPIRY)
+    if "current" in params:
+        expiry = min(expiry or CURRENT_WEATHER_EXPIRY, CURRENT_WEATHER_EXPIRY)
+    if expiry is None and "end_date" in params:
+        settled_date = (date.today() - timedelta(days=ARCHIVE_SETTLE_DAYS)).isoformat()
+        if str(params["end_date"]) >= settled_date:
+            expiry = RECENT_ARCHIVE_EXPIRY
+    return expiry
+
+
+class CacheEntry:
+    """
+    Cached response body with the time it was downloaded and the time it goes stale.
+    """
+
+    __slots__ = ("data", "fetched_at", "expires_at")
+
+    def __init__(self, data, fetched_at, expires_at):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+    def is_fresh(self, now=None):
+        return self.expires_at is None or (now or time.time()) < self.expires_at
+
+
+class MemoryCache:
+    """
+    Least recently used cache of entries in memory, bounded by the total size of their data.
+    """
+
+    def __init__(self, max_bytes=MEMORY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        old_entry = self.entries.pop(key, None)
+        if old_entry is not None:
+            self.size -= len(old_entry.data)
+        if len(entry.data) > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.size += len(entry.data)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted.data)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class DiskCache:
+    """
+    Least recently used cache of entries in an SQLite database, bounded by the total size of their data.
+    """
+
+    def __init__(self, path, max_bytes=DISK_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, data BLOB NOT NULL, fetched_at REAL NOT NULL,"
+            " expires_at REAL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.connection.commit()
+        self.size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        row = self.connection.execute("SELECT data, fetched_at, expires_at FROM responses WHERE key = ?",
+                                      (key,)).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        return CacheEntry(bytes(row[0]), row[1], row[2])
+
+    def set(self, key, entry):
+        size = len(entry.data)
+        if size > self.max_bytes:
+            return
+        old_size = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self.connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                                (key, entry.data, entry.fetched_at, entry.expires_at, time.time(), size))
+        self.size += size - (old_size[0] if old_size else 0)
+        if self.size > self.max_bytes:
+            self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        """Deletes the least recently used entries until the cache fits its size limit."""
+        rows = self.connection.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        evicted_keys = []
+        for key, size in rows:
+            if self.size <= self.max_bytes:
+                break
+            evicted_keys.append((key,))
+            self.size -= size
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", evicted_keys)
+        self.evictions += len(evicted_keys)
+
+    def clear(self):
+        self.connection.execute("DELETE FROM responses")
+        self.connection.commit()
+        self.size = 0
+
+
+class TieredCache:
+    """
+    Response cache with a memory tier in front of a disk tier.
+
+    Entries found on disk are promoted to memory. Both tiers evict their least recently used entries when
+    they grow past their size limit.
+    """
+
+    def __init__(self, path, memory_max_bytes=MEMORY_CACHE_MAX_BYTES, disk_max_bytes=DISK_CACHE_MAX_BYTES):
+        self.lock = threading.Lock()
+        self.memory = MemoryCache(memory_max_bytes)
+        self.disk = DiskCache(path, disk_max_bytes)
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stale_hits": 0}
+
+    @staticmethod
+    def make_key(request_key):
+        return hashlib.sha256(repr(request_key).encode("utf-8")).hexdigest()
+
+    def get(self, request_key):
+        """
+        Looks up a cached response, fresh or stale.
+
+        Args:
+            request_key (tuple): Key built by `make_request_key`.
+
+        Returns:
+            CacheEntry: The cached entry, or None if there is none.
+        """
+        key = self.make_key(request_key)
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.counters["memory_hits"] += 1
+            else:
+                entry = self.disk.get(key)
+                if entry is None:
+                    self.counters["misses"] += 1
+                    return None
+                self.counters["disk_hits"] += 1
+                self.memory.set(key, entry)
+            if not entry.is_fresh():
+                self.counters["stale_hits"] += 1
+            return entry
+
+    def set(self, request_key, data, fetched_at, expiry):
+        """
+        Stores a response in both tiers.
+
+        Args:
+            request_key (tuple): Key built by `make_request_key`.
+            data (bytes): Response body.
+            fetched_at (float): Unix time the response was downloaded.
+            expiry (int): Seconds the response stays fresh, or None if it never expires.
+
+        Returns:
+            CacheEntry: The stored entry.
+        """
+        entry = CacheEntry(data, fetched_at, None if expiry is None else fetched_at + expiry)
+        key = self.make_key(request_key)
+        with self.lock:
+            self.memory.set(key, entry)
+            self.disk.set(key, entry)
+        return entry
+
+    def clear(self):
+        """Removes every entry from both tiers."""
+        with self.lock:
+            self.memory.clear()
+            self.disk.clear()
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            dict: Hits per tier, misses, stale hits, evictions per tier and the size of each tier.
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats.update({
+                "memory_evictions": self.memory.evictions,
+                "disk_evictions": self.disk.evictions,
+                "memory_entries": len(self.memory.entries),
+                "memory_bytes": self.memory.size,
+                "disk_bytes": self.disk.size,
+            })
+        return stats
+
+
+def estimate_size(value):
+    """
+    Estimates the memory held by a decoded result.
+
+    Args:
+        value: DataFrame, NumPy array, object with a `values` array, or a dict, list or tuple of those.
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value)
+    if isinstance(getattr(value, "values", None), np.ndarray):
+        return value.values.nbytes
+    return 64
+
+
+class ResultCache:
+    """
+    Least recently used cache of decoded results in memory, bounded by their estimated size.
+
+    Every entry has its own expiry time, so results go stale together with the responses they were decoded
+    from.
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.counters = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0}
+
+    def get(self, key):
+        """
+        Looks up a result that has not expired.
+
+        Args:
+            key (hashable): Key of the result.
+
+        Returns:
+            Any: The cached result, or None if there is none or it expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] is not None and time.time() >= entry[2]:
+                self.remove(key)
+                self.counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry[0]
+
+    def set(self, key, value, expires_at=None):
+        """
+        Stores a result.
+
+        Args:
+            key (hashable): Key of the result.
+            value: The result. It must not be modified afterwards, as it is shared with every caller.
+            expires_at (float, optional): Unix time the result expires at. Defaults to never.
+        """
+        size = estimate_size(value)
+        with self.lock:
+            self.remove(key)
+            if size > self.max_bytes or (expires_at is not None and expires_at <= time.time()):
+                return
+            self.entries[key] = (value, size, expires_at)
+            self.size += size
+            while self.size > self.max_bytes:
+                evicted_key = next(iter(self.entries))
+                self.remove(evicted_key)
+                self.counters["evictions"] += 1
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self):
+        """Removes every result."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            dict: Hits, misses, expirations, evictions, number of entries and their estimated size.
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats.update({"entries": len(self.entries), "bytes": self.size})
+        return stats
+
+
+class ColumnCache:
+    """
+    Least recently used cache of decoded columns, grouped by location and bounded by their total size.
+
+    Each column is stored on its own with the time it was downloaded and the time it expires, so requests for
+    different variables of one location merge into one block and only missing columns have to be fetched.
+    All columns of a location share one time axis; columns arriving on a different axis replace the old ones.
+    The first rows of a column can expire earlier than the rest and be refreshed on their own with `patch`.
+    """
+
+    def __init__(self, max_bytes=COLUMN_CACHE_MAX_BYTES):
+        self.lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.counters = {"column_hits": 0, "column_misses": 0, "evictions": 0}
+
+    def missing(self, key, names):
+        """
+        Returns the variables of a location that are not cached or expired.
+
+        Args:
+            key (hashable): Key of the location.
+            names (list): Requested variable names.
+
+        Returns:
+            list: Names that have to be fetched, in the given order.
+        """
+        now = time.time()
+        with self.lock:
+            columns = self.entries[key]["columns"] if key in self.entries else {}
+            missing = [name for name in names
+                       if name not in columns or (columns[name][2] is not None and now >= columns[name][2])]
+            self.counters["column_misses"] += len(missing)
+            self.counters["column_hits"] += len(names) - len(missing)
+        return missing
+
+    def stale_near_term(self, key, names):
+        """
+        Returns the cached variables of a location whose near-term rows expired.
+
+        Args:
+            key (hashable): Key of the location.
+            names (list): Requested variable names.
+
+        Returns:
+            list: Names whose first rows have to be refreshed, in the given order.
+        """
+        now = time.time()
+        with self.lock:
+            columns = self.entries[key]["columns"] if key in self.entries else {}
+            return [name for name in names
+                    if name in columns and columns[name][3] is not None and now >= columns[name][3]]
+
+    def add(self, key, block, fetched_at, expires_at=None, near_term_expires_at=None):
+        """
+        Stores every column of a block.
+
+        Args:
+            key (hashable): Key of the location.
+            block (DecodedBlock): Decoded block with the columns.
+            fetched_at (float): Unix time the block was downloaded, or None if unknown.
+            expires_at (float, optional): Unix time the columns expire at. Defaults to never.
+            near_term_expires_at (float, optional): Unix time the first rows expire at. Defaults to
+                `expires_at`.
+        """
+        if near_term_expires_at is None:
+            near_term_expires_at = expires_at
+        axis = (block.start, block.interval, len(block))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["axis"] != axis:
+                self.remove(key)
+                entry = {"axis": axis, "columns": {}, "size": 0}
+                self.entries[key] = entry
+            self.entries.move_to_end(key)
+            for name in block.names:
+                # An own copy frees its memory on eviction instead of pinning the whole block, and can be patched
+                values = np.array(block.column(name))
+                old_column = entry["columns"].get(name)
+                entry["size"] += values.nbytes - (old_column[0].nbytes if old_column else 0)
+                self.size += values.nbytes - (old_column[0].nbytes if old_column else 0)
+                entry["columns"][name] = (values, fetched_at, expires_at, near_term_expires_at)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                self.remove(next(iter(self.entries)))
+                self.counters["evictions"] += 1
+
+    def patch(self, key, block, near_term_expires_at=None):
+        """
+        Overwrites the rows of cached columns covered by a block, such as a refreshed near-term window.
+
+        Args:
+            key (hashable): Key of the location.
+            block (DecodedBlock): Decoded block with a subset of the location's rows.
+            near_term_expires_at (float, optional): New expiry time of the columns' first rows. Defaults to never.
+
+        Returns:
+            bool: Whether the block was merged. It is not if a column is not cached or the block does not lie
+                on the location's time axis.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or any(name not in entry["columns"] for name in block.names):
+                return False
+            start, interval, length = entry["axis"]
+            offset, remainder = divmod(block.start - start, interval)
+            if block.interval != interval or remainder or offset < 0 or offset >= length:
+                return False
+            rows = min(len(block), length - offset)
+            for name in block.names:
+                values, fetched_at, expires_at, _ = entry["columns"][name]
+                # Blocks returned by get are copies, so the cached column can be written in place
+                values[offset:offset + rows] = block.column(name)[:rows]
+                entry["columns"][name] = (values, fetched_at, expires_at, near_term_expires_at)
+            self.entries.move_to_end(key)
+        return True
+
+    def get(self, key, names):
+        """
+        Merges cached columns of a location into one block.
+
+        Expired columns are returned as well, so callers fetch missing columns first with `missing`.
+
+        Args:
+            key (hashable): Key of the location.
+            names (list): Variable names, in the order of the returned block's columns.
+
+        Returns:
+            tuple: The DecodedBlock and the Unix time its oldest column was downloaded (None if unknown), or
+                None if a column is not cached.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or any(name not in entry["columns"] for name in names):
+                return None
+            self.entries.move_to_end(key)
+            columns = [entry["columns"][name] for name in names]
+        start, interval, length = entry["axis"]
+        values = np.empty((length, len(names)), dtype=np.float32)
+        for i, column in enumerate(columns):
+            values[:, i] = column[0]
+        fetch_times = [column[1] for column in columns]
+        fetched_at = None if None in fetch_times or not fetch_times else min(fetch_times)
+        return DecodedBlock(start, interval, names, values), fetched_at
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry["size"]
+
+    def clear(self):
+        """Removes every column."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            dict: Column hits and misses, evictions, number of locations and the size of their columns.
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats.update({"locations": len(self.entries), "bytes": self.size})
+        return stats
+
+
+def get_result_cache():
+    """
+    Returns the process-wide cache of decoded results, creating it on first use.
+
+    Returns:
+        ResultCache: Shared cache instance.
+    """
+    global result_cache
+    with response_cache_lock:
+        if result_cache is None:
+            result_cache = ResultCache()
+    return result_cache
+
+
+def get_column_cache():
+    """
+    Returns the process-wide cache of decoded columns, creating it on first use.
+
+    Returns:
+        ColumnCache: Shared cache instance.
+    """
+    global column_cache
+    with response_cache_lock:
+        if column_cache is None:
+            column_cache = ColumnCache()
+    return column_cache
+
+
+def get_response_cache():
+    """
+    Returns the process-wide response cache, creating it on first use.
+
+    Returns:
+        TieredCache: Shared cache instance.
+    """
+    global response_cache
+    with response_cache_lock:
+        if response_cache is None:
+            response_cache = TieredCache(get_cache_path())
+    return response_cache
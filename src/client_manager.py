@@ -0,0 +1,495 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from openmeteo_requests.Client import OpenMeteoRequestsError
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+from cache_manager import get_response_cache, get_expiry, get_cache_path
+from rate_limiter import TokenBucket, AdaptiveConcurrency, CircuitBreaker, CircuitOpenError
+
+# Number of keep-alive connections kept open per host
+POOL_MAXSIZE = 10
+
+# Attempts of a request answered with 429 or a server error, each waiting for the rate limiter again
+DOWNLOAD_ATTEMPTS = 3
+
+# Seconds to wait before the first repeated attempt, doubled for each further one, unless the response
+# asks for a different delay with Retry-After
+RETRY_BACKOFF = 1.0
+MAX_RETRY_DELAY = 30.0
+
+# Grid spacing in degrees coordinates are snapped to when snapping is enabled. Archive data comes from the
+# 0.1° ERA5-Land grid, forecasts blend global models with regional ones of a few kilometers.
+COORDINATE_GRID = {
+    "https://archive-api.open-meteo.com/v1/archive": 0.1,
+    "https://api.open-meteo.com/v1/forecast": 0.05,
+}
+
+# Global variables to hold the shared clients and their counters
+clients = {}
+clients_lock = threading.Lock()
+client_stats = {
+    "clients_created": 0,
+    "client_reuses": 0,
+    "sessions_created": 0,
+    "requests": 0,
+    "network_requests": 0,
+    "cache_hits": 0,
+    "background_refreshes": 0,
+    "coalesced_requests": 0,
+    "snapped_requests": 0,
+    "throttled_responses": 0,
+    "circuit_rejections": 0,
+}
+stats_lock = threading.Lock()
+
+# Global limiters shared by every client, see get_rate_limiter
+rate_limiter = None
+rate_limiter_lock = threading.Lock()
+adaptive_concurrency = AdaptiveConcurrency(maximum=POOL_MAXSIZE)
+circuit_breaker = CircuitBreaker()
+
+
+def increment_stat(name, amount=1):
+    """
+    Increments one of the client counters in a thread-safe way.
+
+    Args:
+        name (str): Name of the counter.
+        amount (int, optional): Value to add. Defaults to 1.
+    """
+    with stats_lock:
+        client_stats[name] += amount
+
+
+def make_request_key(method, url, params):
+    """
+    Builds a hashable key identifying a request.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        params (dict): Request parameters.
+
+    Returns:
+        tuple: Key that is equal for identical URL, method and parameters.
+    """
+    normalized_params = tuple(sorted(
+        (key, tuple(value) if isinstance(value, (list, tuple)) else value) for key, value in params.items()
+    ))
+    return method.upper(), url, normalized_params
+
+
+def decode_weather_api_responses(data):
+    """
+    Splits a FlatBuffers payload into Open-Meteo response messages.
+
+    Args:
+        data (bytes): Raw response body.
+
+    Returns:
+        list: WeatherApiResponse objects, one per requested location.
+    """
+    messages = []
+    total = len(data)
+    position = 0
+    while position < total:
+        length = int.from_bytes(data[position:position + 4], byteorder="little")
+        messages.append(WeatherApiResponse.GetRootAs(data, position + 4))
+        position += length + 4
+    return messages
+
+
+def snap_coordinates(coordinates, step):
+    """
+    Rounds coordinates to the nearest point of a grid.
+
+    Args:
+        coordinates (float | str): One coordinate, or a comma-separated list as used by batched requests.
+        step (float): Grid spacing in degrees.
+
+    Returns:
+        float | str: Snapped coordinates, in the same form as given.
+    """
+    if isinstance(coordinates, str):
+        return ",".join(str(snap_coordinates(float(value), step)) for value in coordinates.split(","))
+    return round(round(coordinates / step) * step, 4)
+
+
+def snap_params(url, params):
+    """
+    Snaps the coordinates of a request to the model grid of its endpoint.
+
+    Args:
+        url (str): API endpoint URL.
+        params (dict): Request parameters.
+
+    Returns:
+        dict: Parameters with snapped 'latitude' and 'longitude', or the given parameters if the endpoint has no
+            known grid.
+    """
+    step = COORDINATE_GRID.get(url)
+    if step is None or "latitude" not in params:
+        return params
+    return dict(params, latitude=snap_coordinates(params["latitude"], step),
+                longitude=snap_coordinates(params["longitude"], step))
+
+
+def get_rate_limiter():
+    """
+    Returns the token bucket shared by every client and every process using the same cache dir.
+
+    Returns:
+        TokenBucket: Shared rate limiter.
+    """
+    global rate_limiter
+    with rate_limiter_lock:
+        if rate_limiter is None:
+            rate_limiter = TokenBucket(path=get_cache_path("rate_limit.sqlite"))
+    return rate_limiter
+
+
+def get_retry_delay(response, attempt):
+    """
+    Returns how long to wait before repeating a request refused because of load.
+
+    Args:
+        response (requests.Response): The refused response.
+        attempt (int): Number of the attempt that was refused, starting at 0.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    retry_after = response.headers.get("Retry-After")
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):
+        delay = RETRY_BACKOFF * 2 ** attempt
+    return min(max(delay, 0.0), MAX_RETRY_DELAY)
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls so that only one of them does the actual work.
+    """
+
+    class Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, function):
+        """
+        Runs the function for the key, or waits for an identical call already in flight and shares its result.
+
+        Args:
+            key (hashable): Identity of the call.
+            function (callable): Function doing the work.
+
+        Returns:
+            Any: Result of the function.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self.calls[key] = SingleFlight.Call()
+
+        if not is_leader:
+            increment_stat("coalesced_requests")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+
+class SharedOpenMeteoClient:
+    """
+    Thread-safe Open-Meteo client with one connection-pooled session per host and a tiered response cache.
+
+    Exposes the same `weather_api` method as `openmeteo_requests.Client`. Expired responses are returned at
+    once and refreshed in the background, and kept in use while the network is unreachable. With
+    `snap_coordinates` set, requests for nearby locations in the same model grid cell share one cache entry.
+
+    Downloads pass a token bucket shared across processes, an adaptive limit of requests in flight and a
+    circuit breaker, so bursts from several tabs stay within the API's rate limits, and an unhealthy upstream
+    gets no requests while cached responses are served.
+    """
+
+    def __init__(self, cache_expire_after=3600, snap_coordinates=False):
+        self.cache_expire_after = cache_expire_after
+        self.snap_coordinates = snap_coordinates
+        self.cache = get_response_cache()
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.single_flight = SingleFlight()
+        self.fetched_at = {}
+        self.refreshing = set()
+        self.refreshing_lock = threading.Lock()
+        self.rate_limiter = get_rate_limiter()
+        self.concurrency = adaptive_concurrency
+        self.circuit_breaker = circuit_breaker
+
+    def get_session(self, url):
+        """
+        Returns the session for the host of the URL, creating it on first use.
+
+        Args:
+            url (str): Request URL.
+
+        Returns:
+            requests.Session: Session with keep-alive connection pool and retries.
+        """
+        host = urlsplit(url).netloc
+        with self.sessions_lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # Only connection errors are retried here, refused requests are retried through the limiters
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE,
+                                      max_retries=Retry(total=2, status=0, backoff_factor=0.2))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.sessions[host] = session
+                increment_stat("sessions_created")
+        return session
+
+    def send(self, session, url, params, method):
+        """
+        Sends one request once the circuit breaker, the rate limiter and the concurrency limit let it through.
+
+        Returns:
+            requests.Response: The response.
+        """
+        try:
+            self.circuit_breaker.before_request()
+        except CircuitOpenError:
+            increment_stat("circuit_rejections")
+            raise
+        # Any outcome is recorded, as a half-open circuit keeps rejecting requests until its probe reports back
+        succeeded = False
+        try:
+            self.rate_limiter.acquire()
+            self.concurrency.acquire()
+            overloaded = True
+            try:
+                if method.upper() == "POST":
+                    response = session.request("POST", url, data=params)
+                else:
+                    response = session.request("GET", url, params=params)
+                overloaded = response.status_code == 429 or response.status_code >= 500
+            finally:
+                self.concurrency.release(overloaded)
+            increment_stat("network_requests")
+            if overloaded:
+                increment_stat("throttled_responses")
+            succeeded = not overloaded
+        finally:
+            if succeeded:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+        return response
+
+    def download(self, key, url, params, method):
+        """
+        Requests a response from the network and stores it in the cache.
+
+        Requests refused with 429 or a server error are repeated up to DOWNLOAD_ATTEMPTS times.
+
+        Returns:
+            CacheEntry: The stored entry.
+        """
+        session = self.get_session(url)
+        for attempt in range(DOWNLOAD_ATTEMPTS):
+            response = self.send(session, url, params, method)
+            if response.status_code != 429 and response.status_code < 500:
+                break
+            # Once the circuit opened, the next attempt is rejected right away instead of after the delay
+            if attempt + 1 < DOWNLOAD_ATTEMPTS and not self.circuit_breaker.is_open():
+                time.sleep(get_retry_delay(response, attempt))
+
+        if response.status_code in [400, 429]:
+            raise OpenMeteoRequestsError(response.json())
+        response.raise_for_status()
+        return self.cache.set(key, response.content, time.time(), get_expiry(url, params, self.cache_expire_after))
+
+    def refresh_in_background(self, key, url, params, method):
+        """
+        Downloads a new version of a stale response in a daemon thread, unless one is already being downloaded.
+        A failed refresh keeps the stale response in the cache.
+        """
+        with self.refreshing_lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+        increment_stat("background_refreshes")
+
+        def refresh():
+            try:
+                self.download(key, url, params, method)
+            except Exception:
+                pass
+            finally:
+                with self.refreshing_lock:
+                    self.refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def fetch(self, key, url, params, method):
+        entry = self.cache.get(key)
+        if entry is not None:
+            increment_stat("cache_hits")
+            # While the circuit is open the stale response is all there is, so no refresh is attempted
+            if not entry.is_fresh() and not self.circuit_breaker.is_open():
+                self.refresh_in_background(key, url, params, method)
+        else:
+            entry = self.download(key, url, params, method)
+        self.fetched_at[key] = entry.fetched_at
+        return decode_weather_api_responses(entry.data)
+
+    def normalize_params(self, url, params, count=True):
+        """
+        Returns the parameters actually sent for a request, which also make up its cache key.
+
+        Args:
+            url (str): API endpoint URL.
+            params (dict): Request parameters.
+            count (bool, optional): Whether to count snapped requests. Defaults to True.
+
+        Returns:
+            dict: Parameters in FlatBuffers format, with snapped coordinates if snapping is enabled.
+        """
+        params = dict(params, format="flatbuffers")
+        if self.snap_coordinates:
+            snapped_params = snap_params(url, params)
+            if count and snapped_params is not params:
+                increment_stat("snapped_requests")
+            params = snapped_params
+        return params
+
+    def weather_api(self, url, params, method="GET"):
+        """
+        Gets and decodes a weather API response, sharing one round trip between identical concurrent calls.
+
+        Args:
+            url (str): API endpoint URL.
+            params (dict): Request parameters.
+            method (str, optional): HTTP method. Defaults to 'GET'.
+
+        Returns:
+            list: WeatherApiResponse objects, one per requested location.
+        """
+        params = self.normalize_params(url, params)
+        increment_stat("requests")
+        key = make_request_key(method, url, params)
+        return self.single_flight.do(key, lambda: self.fetch(key, url, params, method))
+
+    def data_age(self, url, params, method="GET"):
+        """
+        Returns how old the data last returned for a request is.
+
+        Args:
+            url (str): API endpoint URL.
+            params (dict): Request parameters.
+            method (str, optional): HTTP method. Defaults to 'GET'.
+
+        Returns:
+            float: Seconds since the data was downloaded, or None if the request was not made yet.
+        """
+        fetched_at = self.fetched_at.get(make_request_key(method, url, self.normalize_params(url, params, False)))
+        if fetched_at is None:
+            return None
+        return time.time() - fetched_at
+
+    def pool_stats(self):
+        """
+        Collects connection pool counters of every host session.
+
+        Returns:
+            dict: Per-host number of opened connections and requests sent over them.
+        """
+        stats = {}
+        with self.sessions_lock:
+            sessions = dict(self.sessions)
+        for host, session in sessions.items():
+            connections = 0
+            requests_sent = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for pool_key in pools.keys():
+                    pool = pools.get(pool_key)
+                    if pool is not None:
+                        connections += pool.num_connections
+                        requests_sent += pool.num_requests
+            stats[host] = {"connections_opened": connections, "requests_sent": requests_sent}
+        return stats
+
+
+def get_openmeteo_client(cache_expire_after=3600, snap_coordinates=False):
+    """
+    Returns the process-wide Open-Meteo client, creating it on first use.
+
+    Args:
+        cache_expire_after (int, optional): Cache expiration time in seconds of endpoints without their own
+            expiry in `cache_manager.ENDPOINT_EXPIRY`. Defaults to 3600 seconds.
+        snap_coordinates (bool, optional): Whether to snap coordinates to the model grid. Defaults to False.
+
+    Returns:
+        SharedOpenMeteoClient: Shared client instance.
+    """
+    with clients_lock:
+        client = clients.get((cache_expire_after, snap_coordinates))
+        if client is None:
+            client = SharedOpenMeteoClient(cache_expire_after, snap_coordinates)
+            clients[(cache_expire_after, snap_coordinates)] = client
+            increment_stat("clients_created")
+        else:
+            increment_stat("client_reuses")
+    return client
+
+
+def get_client_stats():
+    """
+    Returns a snapshot of the client counters, including connection pool reuse, response cache, concurrency
+    limit and circuit breaker statistics.
+
+    Returns:
+        dict: Counter values, per-host pool statistics, cache, concurrency and circuit statistics.
+    """
+    with stats_lock:
+        stats = dict(client_stats)
+    stats["cache"] = get_response_cache().stats()
+    stats["concurrency"] = adaptive_concurrency.stats()
+    stats["circuit"] = circuit_breaker.stats()
+    with clients_lock:
+        shared_clients = list(clients.values())
+    stats["pools"] = {}
+    for client in shared_clients:
+        stats["pools"].update(client.pool_stats())
+    return stats
+
+
+def reset_client_stats():
+    """Resets all client counters to zero."""
+    with stats_lock:
+        for name in client_stats:
+            client_stats[name] = 0
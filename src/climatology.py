@@ -0,0 +1,282 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Variables covered by the climatology index
+CLIMATOLOGY_VARIABLES = ["temperature_2m_max", "temperature_2m_min", "precipitation_sum", "wind_speed_10m_max"]
+
+# Number of calendar-day slots, February 29 included
+SLOTS_PER_YEAR = 366
+FEBRUARY_29_SLOT = 59
+
+
+def calendar_slot(month, day):
+    """
+    Returns the calendar-day slot of a date, counting days in a leap year.
+
+    Args:
+        month (int): Month of the date.
+        day (int): Day of month of the date.
+
+    Returns:
+        int: Slot index from 0 (January 1) to 365 (December 31).
+    """
+    return pd.Timestamp(2000, month, day).dayofyear - 1
+
+
+def calendar_slots(dates):
+    """
+    Vectorized `calendar_slot` for a series of dates.
+
+    Args:
+        dates (pd.DatetimeIndex): Local dates.
+
+    Returns:
+        np.ndarray: Slot index of every date.
+    """
+    slots = dates.dayofyear.to_numpy() - 1
+    shift = ~dates.is_leap_year & (dates.month.to_numpy() > 2)
+    return slots + shift
+
+
+class ClimatologyIndex:
+    """
+    Per calendar-day statistics of past years for one location.
+
+    For every calendar day and variable the index holds the value of every year, the same values sorted
+    ascending (missing values last) for binary-search ranking, the record years and the last year with
+    precipitation. In non-leap years February 29 takes the value of February 28.
+    """
+
+    def __init__(self, years, values):
+        self.years = np.asarray(years, dtype=np.int32)
+        self.values = {variable: np.asarray(values[variable], dtype=np.float32) for variable in CLIMATOLOGY_VARIABLES}
+        self.sorted_values = {}
+        self.valid_counts = {}
+        self.max_positions = {}
+        self.min_positions = {}
+        self.compute_lookups()
+
+    def compute_lookups(self):
+        """Recomputes the sorted arrays and record lookups from the per-year values."""
+        for variable, values in self.values.items():
+            valid = ~np.isnan(values)
+            self.sorted_values[variable] = np.sort(values, axis=1)
+            self.valid_counts[variable] = valid.sum(axis=1)
+            self.max_positions[variable] = np.argmax(np.where(valid, values, -np.inf), axis=1)
+            self.min_positions[variable] = np.argmin(np.where(valid, values, np.inf), axis=1)
+
+        rainy = self.values["precipitation_sum"] > 0
+        last_rainy = rainy.shape[1] - 1 - np.argmax(rainy[:, ::-1], axis=1)
+        self.last_rain_positions = np.where(rainy.any(axis=1), last_rainy, -1)
+
+    @classmethod
+    def from_daily_series(cls, start_date, columns, first_year, last_year):
+        """
+        Builds the index from consecutive daily values.
+
+        Args:
+            start_date (str): Local date of the first value in 'YYYY-MM-DD' format.
+            columns (dict): Variable names mapped to daily value arrays.
+            first_year (int): First year to include.
+            last_year (int): Last year to include.
+
+        Returns:
+            ClimatologyIndex: The built index.
+        """
+        years = np.arange(first_year, last_year + 1)
+        length = len(next(iter(columns.values())))
+        dates = pd.date_range(start=start_date, periods=length, freq="D")
+        in_range = (dates.year >= first_year) & (dates.year <= last_year)
+        dates = dates[in_range]
+        slots = calendar_slots(dates)
+        year_positions = dates.year.to_numpy() - first_year
+        leap_years = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+        non_leap_positions = np.flatnonzero(~leap_years)
+
+        values = {}
+        for variable in CLIMATOLOGY_VARIABLES:
+            table = np.full((SLOTS_PER_YEAR, len(years)), np.nan, dtype=np.float32)
+            table[slots, year_positions] = np.asarray(columns[variable])[in_range]
+            table[FEBRUARY_29_SLOT, non_leap_positions] = table[FEBRUARY_29_SLOT - 1, non_leap_positions]
+            values[variable] = table
+        return cls(years, values)
+
+    def extend(self, other):
+        """
+        Appends the years of another index that this one does not hold yet.
+
+        Args:
+            other (ClimatologyIndex): Index covering later years.
+        """
+        new_positions = np.flatnonzero(other.years > self.years[-1]) if len(self.years) else \
+            np.arange(len(other.years))
+        if not len(new_positions):
+            return
+        self.years = np.concatenate([self.years, other.years[new_positions]])
+        for variable in CLIMATOLOGY_VARIABLES:
+            self.values[variable] = np.concatenate([self.values[variable], other.values[variable][:, new_positions]],
+                                                   axis=1)
+        self.compute_lookups()
+
+    def save(self, path):
+        """
+        Saves the index to an .npz file.
+
+        Args:
+            path (str): Path of the file.
+        """
+        temporary_path = path + ".tmp.npz"
+        np.savez(temporary_path, years=self.years, **self.values)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an index saved with `save`.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            ClimatologyIndex: The loaded index, or None if the file does not exist.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(data["years"], {variable: data[variable] for variable in CLIMATOLOGY_VARIABLES})
+
+    def year_position(self, year):
+        positions = np.flatnonzero(self.years == year)
+        return int(positions[0]) if len(positions) else None
+
+    def count_at_least(self, variable, slot, value, exclude_year=None):
+        """
+        Counts the years whose value on a calendar day is greater than or equal to the given value.
+
+        Args:
+            variable (str): Variable name.
+            slot (int): Calendar-day slot.
+            value (float): Value to rank.
+            exclude_year (int, optional): Year left out of the comparison. Defaults to None.
+
+        Returns:
+            int: Number of years with a value >= the given value.
+        """
+        sorted_values = self.sorted_values[variable][slot]
+        count = int(self.valid_counts[variable][slot]) - int(np.searchsorted(sorted_values, value, side="left"))
+        position = self.year_position(exclude_year)
+        if position is not None and self.values[variable][slot, position] >= value:
+            count -= 1
+        return count
+
+    def count_at_most(self, variable, slot, value, exclude_year=None):
+        """
+        Counts the years whose value on a calendar day is less than or equal to the given value.
+
+        Args:
+            variable (str): Variable name.
+            slot (int): Calendar-day slot.
+            value (float): Value to rank.
+            exclude_year (int, optional): Year left out of the comparison. Defaults to None.
+
+        Returns:
+            int: Number of years with a value <= the given value.
+        """
+        sorted_values = self.sorted_values[variable][slot]
+        count = min(int(np.searchsorted(sorted_values, value, side="right")), int(self.valid_counts[variable][slot]))
+        position = self.year_position(exclude_year)
+        if position is not None and self.values[variable][slot, position] <= value:
+            count -= 1
+        return count
+
+    def record(self, variable, slot, highest=True, exclude_year=None):
+        """
+        Returns the record year and value of a variable on a calendar day.
+
+        Args:
+            variable (str): Variable name.
+            slot (int): Calendar-day slot.
+            highest (bool, optional): Whether to return the highest or the lowest value. Defaults to True.
+            exclude_year (int, optional): Year left out of the comparison. Defaults to None.
+
+        Returns:
+            tuple: Year and value of the record.
+        """
+        positions = self.max_positions if highest else self.min_positions
+        position = int(positions[variable][slot])
+        if exclude_year is not None and self.years[position] == exclude_year:
+            values = self.values[variable][slot].copy()
+            values[position] = np.nan
+            fill = -np.inf if highest else np.inf
+            values = np.where(np.isnan(values), fill, values)
+            position = int(np.argmax(values) if highest else np.argmin(values))
+        return int(self.years[position]), float(self.values[variable][slot, position])
+
+    def last_rain(self, slot, exclude_year=None):
+        """
+        Returns the last year with precipitation on a calendar day.
+
+        Args:
+            slot (int): Calendar-day slot.
+            exclude_year (int, optional): Year left out of the comparison. Defaults to None.
+
+        Returns:
+            tuple: Year and precipitation amount, or None if it never rained on that day.
+        """
+        position = int(self.last_rain_positions[slot])
+        if position >= 0 and exclude_year is not None and self.years[position] == exclude_year:
+            rainy = np.flatnonzero(self.values["precipitation_sum"][slot, :position] > 0)
+            position = int(rainy[-1]) if len(rainy) else -1
+        if position < 0:
+            return None
+        return int(self.years[position]), float(self.values["precipitation_sum"][slot, position])
+
+
+def get_climatology_path(store):
+    """
+    Returns the path of the climatology index kept next to an archive store.
+
+    Args:
+        store (ArchiveStore): Archive store of the location.
+
+    Returns:
+        str: Path of the index file.
+    """
+    return os.path.join(store.directory, "climatology.npz")
+
+
+def update_climatology_index(store, first_year, last_year):
+    """
+    Loads the climatology index of a store and appends years it does not hold yet.
+
+    The years must already be present in the store.
+
+    Args:
+        store (ArchiveStore): Archive store of the location.
+        first_year (int): First year of the index.
+        last_year (int): Last year the index has to cover.
+
+    Returns:
+        ClimatologyIndex: Up-to-date index.
+    """
+    path = get_climatology_path(store)
+    index = ClimatologyIndex.load(path)
+    if index is not None and (not len(index.years) or index.years[0] != first_year):
+        index = None
+    if index is not None and index.years[-1] >= last_year:
+        return index
+
+    build_from_year = first_year if index is None else int(index.years[-1]) + 1
+    start_date = f"{build_from_year}-01-01"
+    start_index = store.index_of(start_date)
+    end_index = store.index_of(f"{last_year}-12-31") + 1
+    columns = store.read(start_index, end_index, CLIMATOLOGY_VARIABLES)
+    new_years = ClimatologyIndex.from_daily_series(start_date, columns, build_from_year, last_year)
+
+    if index is None:
+        index = new_years
+    else:
+        index.extend(new_years)
+    index.save(path)
+    return index
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+
+class DecodedBlock:
+    """
+    Compact decoded form of one block (hourly, daily, ...) of an Open-Meteo response.
+
+    All variables share one contiguous float32 array of shape (time, variable). Columns are returned as views
+    into it, and the time axis is only built when asked for.
+    """
+
+    def __init__(self, start, interval, names, values):
+        self.start = int(start)
+        self.interval = int(interval)
+        self.names = list(names)
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.values = values
+        self._dates = None
+
+    @classmethod
+    def from_response_block(cls, block, names):
+        """
+        Copies the variables of a response block into one array.
+
+        Args:
+            block (VariablesWithTime): Block of a WeatherApiResponse, e.g. `response.Hourly()`.
+            names (list): Names of the block's variables in request order.
+
+        Returns:
+            DecodedBlock: The decoded block.
+        """
+        interval = block.Interval()
+        length = (block.TimeEnd() - block.Time()) // interval if interval else 0
+        values = np.empty((length, len(names)), dtype=np.float32)
+        for i in range(len(names)):
+            # ValuesAsNumpy is a view into the response buffer, so this is the only copy made
+            values[:, i] = block.Variables(i).ValuesAsNumpy()
+        return cls(block.Time(), interval, names, values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def column(self, name):
+        """
+        Returns the values of one variable.
+
+        Args:
+            name (str): Variable name.
+
+        Returns:
+            np.ndarray: View of the variable's values.
+        """
+        return self.values[:, self.positions[name]]
+
+    @property
+    def timestamps(self):
+        """np.ndarray: Unix timestamps in seconds of every row."""
+        return self.start + np.arange(len(self), dtype=np.int64) * self.interval
+
+    @property
+    def dates(self):
+        """pd.DatetimeIndex: UTC time of every row, built on first use."""
+        if self._dates is None:
+            # Reinterpreting nanosecond integers is several times faster than pd.date_range
+            nanoseconds = self.timestamps * 1_000_000_000
+            self._dates = pd.DatetimeIndex(nanoseconds.view("datetime64[ns]")).tz_localize("UTC")
+        return self._dates
+
+    def slice(self, start, stop):
+        """
+        Returns the rows in [start, stop) as a new block sharing this block's memory.
+
+        Args:
+            start (int): First row.
+            stop (int): End row (exclusive).
+
+        Returns:
+            DecodedBlock: Block with the selected rows.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return DecodedBlock(self.start + start * self.interval, self.interval, self.names, self.values[start:stop])
+
+    def to_dataframe(self):
+        """
+        Builds a DataFrame with a 'date' column followed by one column per variable.
+
+        The variable columns are backed by the block's array without copying it.
+
+        Returns:
+            pd.DataFrame: DataFrame of the block.
+        """
+        dataframe = pd.DataFrame(self.values, columns=self.names, copy=False)
+        dataframe.insert(0, "date", self.dates)
+        return dataframe
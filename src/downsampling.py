@@ -0,0 +1,232 @@
+import numpy as np
+from cache_manager import ResultCache
+
+# Memory bound of the cache of downsampled series and pyramid levels
+DOWNSAMPLE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# Number of points below which a pyramid gets no coarser level
+PYRAMID_MIN_POINTS = 256
+
+# Methods of `downsample`: min-max keeps both extremes of every bucket, max keeps the peak of every bucket
+# (for bars of totals such as precipitation), and LTTB keeps the points that best preserve the line's shape
+DOWNSAMPLE_METHODS = ("minmax", "max", "lttb")
+
+downsample_cache = ResultCache(max_bytes=DOWNSAMPLE_CACHE_MAX_BYTES)
+
+
+def bucket_extremes(y, buckets, largest):
+    """
+    Finds the index of the smallest or largest value in each of equally sized buckets. NaNs are skipped unless a
+    bucket holds nothing else.
+
+    Args:
+        y (np.ndarray): Values.
+        buckets (int): Number of buckets.
+        largest (bool): Whether to find the largest values instead of the smallest.
+
+    Returns:
+        np.ndarray: Index into `y` of the extreme of every bucket.
+    """
+    size = -(-len(y) // buckets)
+    rows = -(-len(y) // size)
+    fill = -np.inf if largest else np.inf
+    padded = np.full(rows * size, fill)
+    padded[:len(y)] = np.where(np.isnan(y), fill, y)
+    padded = padded.reshape(rows, size)
+    offsets = padded.argmax(axis=1) if largest else padded.argmin(axis=1)
+    return np.arange(rows) * size + offsets
+
+
+def min_max_indices(y, points):
+    """
+    Picks the minimum and maximum of every bucket, so no peak is lost whatever the number of points.
+
+    Args:
+        y (np.ndarray): Values.
+        points (int): Maximum number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    buckets = max(points // 2, 1)
+    smallest = bucket_extremes(y, buckets, False)
+    largest = bucket_extremes(y, buckets, True)
+    # Buckets follow each other, so interleaving each bucket's pair in order sorts the indices without a sort
+    indices = np.stack((np.minimum(smallest, largest), np.maximum(smallest, largest)), axis=1).ravel()
+    return indices[np.concatenate(([True], np.diff(indices) > 0))]
+
+
+def max_indices(y, points):
+    """
+    Picks the maximum of every bucket.
+
+    Args:
+        y (np.ndarray): Values.
+        points (int): Maximum number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    return bucket_extremes(y, max(points, 1), True)
+
+
+def lttb_indices(x, y, points):
+    """
+    Picks points with Largest-Triangle-Three-Buckets: the first and last points are kept, and from every bucket in
+    between the point forming the largest triangle with the previously kept point and the average of the next
+    bucket. Each point depends on the one kept before it, so buckets are walked in order, with every bucket
+    handled in one vectorized step.
+
+    Args:
+        x (np.ndarray): Increasing x coordinates.
+        y (np.ndarray): Values.
+        points (int): Number of points to keep, at least 3.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    length = len(y)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, length - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+    # Averages of every bucket after the first, the last point being a bucket of its own
+    starts = np.append(edges[1:-1], length - 1)
+    valid = ~np.isnan(y)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average_x = np.add.reduceat(x, starts) / np.diff(np.append(starts, length))
+        average_y = np.add.reduceat(np.where(valid, y, 0), starts) / counts
+    previous = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        areas = np.abs((x[previous] - average_x[i]) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (average_y[i] - y[previous]))
+        previous = start + np.argmax(np.nan_to_num(areas, nan=-1.0))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample(x, y, points, method="minmax"):
+    """
+    Reduces a series to at most about the given number of points.
+
+    Args:
+        x (np.ndarray): Increasing x coordinates.
+        y (np.ndarray): Values.
+        points (int): Target number of points, usually derived from the chart's width in pixels.
+        method (str, optional): One of DOWNSAMPLE_METHODS. Defaults to "minmax".
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points. All indices if the series is not longer than the target.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= points:
+        return np.arange(len(y))
+    if method == "lttb":
+        return lttb_indices(x, y, max(points, 3))
+    if method == "max":
+        return max_indices(y, points)
+    return min_max_indices(y, points)
+
+
+def series_fingerprint(x, y):
+    """
+    Returns a cheap fingerprint of a series' points, so cached results of other versions of a series are not
+    used for it.
+    """
+    return len(x), float(x[0]), float(x[-1]), float(np.sum(x)), float(np.nansum(y))
+
+
+def downsample_series(key, x, y, points, method="minmax", start=None, end=None):
+    """
+    Downsamples the part of a series between two x coordinates, caching the result.
+
+    Args:
+        key (hashable): Identifies the series, such as its location and column. The cache also tells apart
+            versions of the series with other points, using their sums as a cheap fingerprint.
+        x (np.ndarray): Increasing x coordinates.
+        y (np.ndarray): Values.
+        points (int): Target number of points.
+        method (str, optional): One of DOWNSAMPLE_METHODS. Defaults to "minmax".
+        start (float, optional): First x coordinate to include. Defaults to the start of the series.
+        end (float, optional): Last x coordinate to include. Defaults to the end of the series.
+
+    Returns:
+        np.ndarray: Sorted indices into `x` and `y` of the kept points.
+    """
+    if len(x) == 0:
+        return np.arange(0)
+    cache_key = (key, series_fingerprint(x, y), start, end, points, method)
+    indices = downsample_cache.get(cache_key)
+    if indices is None:
+        first = 0 if start is None else int(np.searchsorted(x, start, side="left"))
+        last = len(x) if end is None else int(np.searchsorted(x, end, side="right"))
+        indices = first + downsample(x[first:last], y[first:last], points, method)
+        downsample_cache.set(cache_key, indices)
+    return indices
+
+
+class SeriesPyramid:
+    """
+    Multi-resolution levels of a series for charts that zoom and pan.
+
+    Level 0 is the full series and every further level is downsampled to half the points of the one before, down
+    to PYRAMID_MIN_POINTS. A query picks the finest level that fits the visible window into the target number
+    of points and slices it, so its cost depends on the target and not on the length of the series: zoomed out,
+    a coarse level is drawn, and zoomed in far enough, the full-resolution points of the window.
+    """
+
+    def __init__(self, x, y, method="minmax", key=None, min_points=PYRAMID_MIN_POINTS):
+        """
+        Args:
+            x (np.ndarray): Increasing x coordinates.
+            y (np.ndarray): Values.
+            method (str, optional): One of DOWNSAMPLE_METHODS used to build the levels. Defaults to "minmax".
+            key (hashable, optional): Identifies the series, so the levels are cached and reused by pyramids of
+                the same series. Defaults to building them every time.
+            min_points (int, optional): Number of points below which no coarser level is built.
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        cache_key = None if key is None or len(x) == 0 else (key, series_fingerprint(x, y), method, min_points)
+        levels = None if cache_key is None else downsample_cache.get(cache_key)
+        if levels is None:
+            levels = [np.arange(len(self.y))]
+            while len(levels[-1]) > min_points:
+                # Every level is built from the one before, so building all of them costs about twice the first
+                previous = levels[-1]
+                half = -(-len(previous) // 2)
+                # With an even target, min-max buckets do not round up to more points, so every level halves
+                indices = previous[downsample(self.x[previous], self.y[previous], half + half % 2, method)]
+                if len(indices) >= len(previous):
+                    break
+                levels.append(indices)
+            if cache_key is not None:
+                downsample_cache.set(cache_key, levels)
+        self.levels = levels
+        self.level_x = [self.x[indices] for indices in levels]
+
+    def query(self, points, start=None, end=None):
+        """
+        Finds the points to draw for a window.
+
+        Args:
+            points (int): Target number of points, usually the chart's width in pixels.
+            start (float, optional): First visible x coordinate. Defaults to the start of the series.
+            end (float, optional): Last visible x coordinate. Defaults to the end of the series.
+
+        Returns:
+            np.ndarray: Sorted indices into the series of the points in the window, plus one on each side so
+                lines reach the window's edges.
+        """
+        for indices, level_x in zip(self.levels, self.level_x):
+            first = 0 if start is None else int(np.searchsorted(level_x, start, side="left"))
+            last = len(level_x) if end is None else int(np.searchsorted(level_x, end, side="right"))
+            if last - first <= points:
+                break
+        return indices[max(first - 1, 0):last + 1]
@@ -1,32 +1,72 @@
+import time
+# Taken before the heavy imports below, so the logged startup timings include them
+launch_time = time.perf_counter()
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 from settings_manager import load_settings, extract_units
-from api import get_historical_weather_data, get_forecast_data, get_clothing_recommendations, \
-    compare_todays_data, get_history_of_date
+from api import iter_historical_weather_data, get_forecast_data, get_clothing_recommendations, \
+    get_date_comparison, FORECAST_DAYS
 from settings_windows import settings_units_window, settings_locations_window, settings_misc_window
 from info_windows import open_about_window, open_feedback_window, open_help_window
+from task_executor import executor
+from downsampling import SeriesPyramid
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.dates import DateFormatter
+import matplotlib.dates as mdates
+from matplotlib.container import BarContainer
+from matplotlib.patches import StepPatch
+import numpy as np
 import pandas as pd
 from tkcalendar import DateEntry
-from urllib import request
-import sys
 import threading
-import time
+from datetime import date, timedelta
 import random
 import gettext
+import logging
 import traceback
 selected_locale = load_settings().get("locale", "ua")
 text_object = gettext.translation('main', localedir='../locales', languages=[selected_locale])
 text_object.install()
 _ = text_object.gettext
 
+# Minimum seconds between redraws of the History chart while chunks of data arrive
+HISTORY_REDRAW_INTERVAL = 0.25
+
+# Minimum width in pixels of a precipitation step in the History chart, which sets how many steps long date ranges
+# are reduced to
+HISTORY_BAR_PIXELS = 2
+
+# Milliseconds the Forecast chart waits to redraw after the days slider moves, one frame at 60 fps
+SLIDER_REDRAW_INTERVAL = 16
+
+# Milliseconds the History chart waits to redraw the visible window after zooming or panning
+ZOOM_REDRAW_INTERVAL = 16
+
+# Milliseconds between building the remaining tabs in the background, when prefetching tabs is enabled
+TAB_PREFETCH_DELAY = 500
+
+startup_logger = logging.getLogger("nebokrug.startup")
+
+# Names and builders of the tabs by the path of their frame, and the paths of the tabs built so far
+tab_builders = {}
+built_tabs = set()
+
 color_cycle = ["red", "green", "blue", "yellow", "orange", "purple", "cyan", "magenta", "lime", "pink", "teal",
                "lavender", "brown", "beige", "maroon", "mint", "olive", "coral", "navy", "grey"]
 
 
+def date_numbers(dates):
+    """
+    Converts a column of dates to Matplotlib date numbers. Going through datetime64 values is far faster than
+    converting every Timestamp.
+    """
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(None)
+    return mdates.date2num(dates.to_numpy())
+
+
 def create_menu_bar(root):
     """
     Creates the menu bar for the main application window.
@@ -38,11 +78,12 @@ def create_menu_bar(root):
 
     # Your Locations
     # Creates a list of functions to call when the location list is updated
+    # Tabs that were not shown yet are built with the new locations on their first visit
     function_list_with_params = [
-        (open_history_tab, (history_frame,)),
-        (open_forecast_tab, (forecast_frame,)),
-        (open_clothing_recommendations_tab, (forecast_ai_frame,)),
-        (open_day_in_history_tab, (this_day_history_frame,))
+        (rebuild_tab, (open_history_tab, history_frame)),
+        (rebuild_tab, (open_forecast_tab, forecast_frame)),
+        (rebuild_tab, (open_clothing_recommendations_tab, forecast_ai_frame)),
+        (rebuild_tab, (open_day_in_history_tab, this_day_history_frame))
     ]
     menubar.add_command(label=_("Your Locations"), command=lambda: settings_locations_window(root,
                                                                                              function_list_with_params))
@@ -68,6 +109,22 @@ def open_history_tab(master):
     Opens the History tab in the main application.
     """
 
+    def get_selected_columns():
+        selected_columns = []
+        if temperature_max_var.get():
+            selected_columns.append('temperature_2m_max')
+        if temperature_min_var.get():
+            selected_columns.append('temperature_2m_min')
+        if temperature_mean_var.get():
+            selected_columns.append('temperature_2m_mean')
+        if daylight_duration_var.get():
+            selected_columns.append('daylight_duration')
+        if precipitation_var.get():
+            selected_columns.append('precipitation_sum')
+        if wind_speed_var.get():
+            selected_columns.append('wind_speed_10m_max')
+        return selected_columns
+
     def on_refresh():
         location = location_var.get()
         if not location:
@@ -92,38 +149,122 @@ def open_history_tab(master):
         # Extract units from settings
         temperature_unit, wind_speed_unit, precipitation_unit = extract_units()
 
-        # Get historical weather data with units
-        data = get_historical_weather_data(latitude, longitude, start_date, end_date, temperature_unit, wind_speed_unit,
-                                           precipitation_unit)
-        update_graph(data, temperature_unit, wind_speed_unit, precipitation_unit)
-
-    def update_graph(data, temperature_unit, wind_speed_unit, precipitation_unit):
-        fig.clear()
-
-        selected_columns = []
-        if temperature_max_var.get():
-            selected_columns.append('temperature_2m_max')
-        if temperature_min_var.get():
-            selected_columns.append('temperature_2m_min')
-        if temperature_mean_var.get():
-            selected_columns.append('temperature_2m_mean')
-        if daylight_duration_var.get():
-            selected_columns.append('daylight_duration')
-        if precipitation_var.get():
-            selected_columns.append('precipitation_sum')
-        if wind_speed_var.get():
-            selected_columns.append('wind_speed_10m_max')
-
+        selected_columns = get_selected_columns()
         if not selected_columns:
             messagebox.showerror(_("Error"), _("Please select at least one data type to display."))
             return
 
+        # A new query is shown whole even if the previous one was zoomed, and only its own chunks keep a zoom
+        for series_ax in chart.get("axes", []):
+            series_ax.set_autoscale_on(True)
+
+        # Year-sized chunks are fetched concurrently on a worker and drawn as they arrive, so the chart starts
+        # filling in long before decades of data are loaded. A newer refresh stops the chunks of an older one.
+        chunks = iter_historical_weather_data(latitude, longitude, start_date, end_date, temperature_unit,
+                                              wind_speed_unit, precipitation_unit)
+        loaded_chunks = []
+        last_draw = [0.0]
+
+        def draw_chunks():
+            data = pd.concat(loaded_chunks, ignore_index=True).sort_values("date", ignore_index=True)
+            update_graph(data, selected_columns, temperature_unit, wind_speed_unit, precipitation_unit,
+                         (latitude, longitude))
+            last_draw[0] = time.perf_counter()
+
+        def add_chunk(chunk):
+            loaded_chunks.append(chunk)
+            if time.perf_counter() - last_draw[0] >= HISTORY_REDRAW_INTERVAL:
+                draw_chunks()
+
+        def finish():
+            if loaded_chunks:
+                draw_chunks()
+
+        executor.stream("history", chunks, add_chunk, on_done=finish)
+
+    def build_pyramids(data, selected_columns, series_key):
+        """
+        Builds the multi-resolution levels of every selected column. Lines keep the minimum and maximum of every
+        bucket and bars its maximum, so temperature records and precipitation spikes stay visible at every zoom
+        level.
+        """
+        x = date_numbers(data['date'])
+        return {col: SeriesPyramid(x, data[col].to_numpy(dtype=float),
+                                   method="max" if col == 'precipitation_sum' else "minmax",
+                                   key=series_key + (col,))
+                for col in selected_columns}
+
+    def reduce_series(pyramids, start=None, end=None):
+        """
+        Picks the points of every series to draw between two date numbers, about one per pixel of the chart's
+        width. The cost depends on the width only, not on how many years are loaded.
+        """
+        width = int(fig.get_figwidth() * fig.dpi)
+        reduced = {}
+        for col, pyramid in pyramids.items():
+            indices = pyramid.query(width // HISTORY_BAR_PIXELS if col == 'precipitation_sum' else width, start, end)
+            reduced[col] = (pyramid.x[indices], pyramid.y[indices])
+        return reduced
+
+    def set_series_data(reduced):
+        for col, (series_ax, artist) in chart["series"].items():
+            if isinstance(artist, StepPatch):
+                artist.set_data(reduced[col][1], get_bar_edges(reduced[col][0]))
+            else:
+                artist.set_data(*reduced[col])
+
+    def on_xlim_changed(axis):
+        # Zooming and panning change the limits many times per second, so redraws are coalesced to one per frame
+        if pending_zoom[0] is None:
+            pending_zoom[0] = frame.after(ZOOM_REDRAW_INTERVAL, redraw_visible_window)
+
+    def redraw_visible_window():
+        pending_zoom[0] = None
+        if "pyramids" not in chart:
+            return
+        start, end = chart["axes"][0].get_xlim()
+        set_series_data(reduce_series(chart["pyramids"], start, end))
+        canvas.draw_idle()
+
+    def get_bar_edges(bar_x):
+        # Precipitation is drawn as one filled step patch, which looks like adjacent bars but is a single artist,
+        # so it draws far faster than hundreds of bars and can be updated in place. Every step spans the days it
+        # stands for.
+        width = 1 if len(bar_x) < 2 else max(1, (bar_x[-1] - bar_x[0]) / (len(bar_x) - 1))
+        return np.concatenate(([bar_x[0] - width / 2], (bar_x[1:] + bar_x[:-1]) / 2, [bar_x[-1] + width / 2]))
+
+    def update_graph(data, selected_columns, temperature_unit, wind_speed_unit, precipitation_unit, location):
         # Convert date column to datetime
         data['date'] = pd.to_datetime(data['date'])
-
-        # Adjust data frequency if too many points
-        if len(data) > 100:
-            data = data.iloc[::len(data) // 100, :]
+        pyramids = build_pyramids(data, selected_columns,
+                                  location + (temperature_unit, wind_speed_unit, precipitation_unit))
+
+        # While chunks stream in the series stay the same, so the existing artists get the new values in place
+        # instead of the figure being rebuilt for every redraw
+        chart_key = (tuple(selected_columns), temperature_unit, wind_speed_unit, precipitation_unit)
+        rebuild = chart.get("key") != chart_key
+        zoomed = not rebuild and not chart["axes"][0].get_autoscalex_on()
+        if rebuild:
+            build_graph(reduce_series(pyramids), selected_columns, temperature_unit, wind_speed_unit,
+                        precipitation_unit)
+            chart["key"] = chart_key
+        elif zoomed:
+            # The user zoomed or panned, so the view keeps its window and is drawn from the level that fits it
+            set_series_data(reduce_series(pyramids, *chart["axes"][0].get_xlim()))
+        else:
+            set_series_data(reduce_series(pyramids))
+            for series_ax in chart["axes"]:
+                series_ax.relim()
+                series_ax.autoscale_view()
+        chart["pyramids"] = pyramids
+        if not zoomed:
+            toolbar.update()  # The toolbar's Home button returns to the whole range
+        canvas.draw_idle()
+
+    def build_graph(reduced, selected_columns, temperature_unit, wind_speed_unit, precipitation_unit):
+        fig.clear()
+        chart.clear()
+        series = {}
 
         # Create the main axis
         ax = fig.add_subplot(111)
@@ -157,43 +298,50 @@ def open_history_tab(master):
 
         # Plot each selected column
         if 'temperature_2m_max' in selected_columns:
-            ax_temp.plot(data['date'], data['temperature_2m_max'],
-                         label=_("Temperature Max (") + f"{temperature_unit})",
-                         color=color_cycle[color_index])
+            line, = ax_temp.plot(*reduced['temperature_2m_max'],
+                                 label=_("Temperature Max (") + f"{temperature_unit})",
+                                 color=color_cycle[color_index])
+            series['temperature_2m_max'] = (ax_temp, line)
             color_index += 1
 
         if 'temperature_2m_min' in selected_columns:
-            ax_temp.plot(data['date'], data['temperature_2m_min'],
-                         label=_("Temperature Min (") + f"{temperature_unit})",
-                         color=color_cycle[color_index])
+            line, = ax_temp.plot(*reduced['temperature_2m_min'],
+                                 label=_("Temperature Min (") + f"{temperature_unit})",
+                                 color=color_cycle[color_index])
+            series['temperature_2m_min'] = (ax_temp, line)
             color_index += 1
 
         if 'temperature_2m_mean' in selected_columns:
-            ax_temp.plot(data['date'], data['temperature_2m_mean'],
-                         label=_("Temperature Mean (") + f"{temperature_unit})",
-                         color=color_cycle[color_index])
+            line, = ax_temp.plot(*reduced['temperature_2m_mean'],
+                                 label=_("Temperature Mean (") + f"{temperature_unit})",
+                                 color=color_cycle[color_index])
+            series['temperature_2m_mean'] = (ax_temp, line)
             color_index += 1
 
         if 'daylight_duration' in selected_columns:
-            ax_daylight.plot(data['date'], data['daylight_duration'], label=_("Daylight Duration (seconds)"),
-                             color=color_cycle[color_index])
+            line, = ax_daylight.plot(*reduced['daylight_duration'], label=_("Daylight Duration (seconds)"),
+                                     color=color_cycle[color_index])
+            series['daylight_duration'] = (ax_daylight, line)
             color_index += 1
 
         if 'precipitation_sum' in selected_columns:
-            ax_precip.bar(data['date'], data['precipitation_sum'],
-                          label=_("Precipitation (") + f"{precipitation_unit})",
-                          color=color_cycle[color_index], alpha=0.5, width=1)
+            bar_x, bar_values = reduced['precipitation_sum']
+            bar = ax_precip.stairs(bar_values, get_bar_edges(bar_x),
+                                   label=_("Precipitation (") + f"{precipitation_unit})",
+                                   color=color_cycle[color_index], alpha=0.5, fill=True)
+            series['precipitation_sum'] = (ax_precip, bar)
             color_index += 1
 
         if 'wind_speed_10m_max' in selected_columns:
-            ax_wind.plot(data['date'], data['wind_speed_10m_max'], label=_("Wind Speed (") + f"{wind_speed_unit})",
-                         color=color_cycle[color_index])
+            line, = ax_wind.plot(*reduced['wind_speed_10m_max'],
+                                 label=_("Wind Speed (") + f"{wind_speed_unit})", color=color_cycle[color_index])
+            series['wind_speed_10m_max'] = (ax_wind, line)
             color_index += 1
 
         # Set labels and legends
         ax.set_xlabel(_("Date"))
         ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
-        ax.xaxis.set_major_locator(plt.MaxNLocator(len(data['date']) // (len(data['date']) // 10)))
+        ax.xaxis.set_major_locator(plt.MaxNLocator(10))
 
         if ax_temp:
             ax_temp.set_ylabel(_("Temperature (") + f"{temperature_unit})")
@@ -217,8 +365,16 @@ def open_history_tab(master):
             ax.tick_params(left=False, labelleft=False)
 
         fig.tight_layout()
-        canvas.draw()
+        chart.update(series=series, axes=[axis for axis in (ax_temp, ax_precip, ax_daylight, ax_wind) if axis])
+        for axis in fig.axes:
+            axis.callbacks.connect('xlim_changed', on_xlim_changed)
+
+    # Results of refreshes started before the tab was rebuilt would land on destroyed widgets
+    executor.cancel("history")
 
+    # Artists and series pyramids of the drawn chart, and the zoom redraw waiting for the next frame
+    chart = {}
+    pending_zoom = [None]
     for widget in master.winfo_children():
         widget.destroy()
     frame = ttk.Frame(master, padding="10")
@@ -233,6 +389,8 @@ def open_history_tab(master):
                                      values=[f"{loc['name']}, {loc['country']}" for loc in
                                              stored_locations_listbox.locations])
     location_combobox.grid(column=1, row=0, padx=5, pady=5)
+    # Results for a location the user switched away from are dropped
+    location_combobox.bind("<<ComboboxSelected>>", lambda event: executor.cancel("history"))
 
     if stored_locations_listbox.locations:
         location_combobox.current(0)  # Select the first location by default
@@ -283,47 +441,17 @@ def open_history_tab(master):
     canvas.get_tk_widget().grid(column=0, row=3, columnspan=5, padx=5, pady=5)
     canvas.draw()
 
+    # Toolbar for zooming and panning the graph
+    toolbar = NavigationToolbar2Tk(canvas, frame, pack_toolbar=False)
+    toolbar.grid(column=0, row=4, columnspan=5, padx=5, sticky='w')
+
 
 def open_forecast_tab(master):
     """
     Opens the Forecast tab in the main application.
     """
 
-    def on_refresh(fetch_new_data=True):
-        location = location_var.get()
-        if not location:
-            messagebox.showerror(_("Error"), _("Please select a location."))
-            return
-
-        for loc in stored_locations_listbox.locations:
-            if f"{loc['name']}, {loc['country']}" == location:
-                selected_location = loc
-                break
-        else:
-            selected_location = stored_locations_listbox.locations[0]
-
-        latitude = selected_location['latitude']
-        longitude = selected_location['longitude']
-
-        # Extract units from settings
-        temperature_unit, wind_speed_unit, precipitation_unit = extract_units()
-
-        # Get forecast weather data with units only once
-        if fetch_new_data:
-            global forecast_data  # Store the forecast data globally to avoid repeated API calls
-            forecast_data = get_forecast_data(latitude, longitude, temperature_unit, wind_speed_unit,
-                                              precipitation_unit)
-        else:
-            try:
-                # noinspection PyUnboundLocalVariable
-                forecast_data
-            except NameError:
-                return
-        update_graph(forecast_data, temperature_unit, wind_speed_unit, precipitation_unit)
-
-    def update_graph(data, temperature_unit, wind_speed_unit, precipitation_unit):
-        fig.clear()
-
+    def get_selected_columns():
         selected_columns = []
         if temperature_2m_var.get():
             selected_columns.append('temperature_2m')
@@ -343,27 +471,120 @@ def open_forecast_tab(master):
             selected_columns.append('wind_speed_10m')
         if uv_index_var.get():
             selected_columns.append('uv_index')
+        return selected_columns
 
-        if not selected_columns:
-            messagebox.showerror(_("Error"), _("Please select at least one data type to display."))
+    def on_refresh(fetch_new_data=True):
+        location = location_var.get()
+        if not location:
+            messagebox.showerror(_("Error"), _("Please select a location."))
             return
 
-        # Convert date column to datetime
-        data['date'] = pd.to_datetime(data['date'])
+        for loc in stored_locations_listbox.locations:
+            if f"{loc['name']}, {loc['country']}" == location:
+                selected_location = loc
+                break
+        else:
+            selected_location = stored_locations_listbox.locations[0]
+
+        latitude = selected_location['latitude']
+        longitude = selected_location['longitude']
 
-        # Shorten the data according to slider value
-        forecast_days = int(forecast_slider.get())
-        data = data.iloc[:forecast_days * 24, :]  # 24 hours in a day
+        # Extract units from settings
+        temperature_unit, wind_speed_unit, precipitation_unit = extract_units()
+
+        # Redraws for changed display options wait until the forecast was loaded once
+        if not fetch_new_data and not forecast_loaded.get():
+            return
+
+        selected_columns = get_selected_columns()
+        if not selected_columns:
+            if fetch_new_data:
+                messagebox.showerror(_("Error"), _("Please select at least one data type to display."))
+            else:
+                clear_graph()
+            return
+
+        def show_forecast(forecast_data):
+            forecast_loaded.set(True)
+            show_data_age(data_age_label, forecast_data.attrs.get("data_age"))
+            update_graph(forecast_data, selected_columns, temperature_unit, wind_speed_unit, precipitation_unit)
+
+        # Only columns that are not cached yet are requested, so ticking one more box fetches just that column
+        executor.submit("forecast", get_forecast_data, latitude, longitude, temperature_unit, wind_speed_unit,
+                        precipitation_unit, variables=selected_columns, on_done=show_forecast)
+
+    def update_graph(data, selected_columns, temperature_unit, wind_speed_unit, precipitation_unit):
+        # The figure is only rebuilt when the series or their units change. Otherwise the existing lines and bars
+        # get the new values in place, which skips recreating the axes and the layout pass.
+        chart_key = (tuple(selected_columns), temperature_unit, wind_speed_unit, precipitation_unit)
+        dates = pd.to_datetime(data['date'])
+        if chart.get("key") != chart_key or len(chart["dates"]) != len(dates):
+            build_graph(data, dates, selected_columns, temperature_unit, wind_speed_unit, precipitation_unit)
+            chart["key"] = chart_key
+        else:
+            x = mdates.date2num(dates)
+            for col, (series_ax, artist) in chart["series"].items():
+                values = data[col].to_numpy()
+                if isinstance(artist, BarContainer):
+                    for rect, position, height in zip(artist.patches, x, values):
+                        rect.set_x(position - rect.get_width() / 2)
+                        rect.set_height(height)
+                else:
+                    artist.set_data(dates, values)
+                chart["values"][col] = values
+        chart["dates"] = dates
+        chart["x"] = mdates.date2num(dates)
+        apply_forecast_days()
+
+    def apply_forecast_days():
+        """
+        Shows the number of days chosen with the slider by moving the x limits, and fits the y limits of every
+        axis to the values in view.
+        """
+        if "x" not in chart:
+            return
+        count = min(int(forecast_slider.get()) * 24, len(chart["x"]))  # 24 hours in a day
+        chart["ax"].set_xlim(chart["x"][0], chart["x"][count - 1])
+        axis_values = {}
+        for col, (series_ax, artist) in chart["series"].items():
+            values = chart["values"][col][:count]
+            if isinstance(artist, BarContainer):
+                values = np.append(values, 0)  # Bars grow from zero
+            axis_values.setdefault(series_ax, []).append(values)
+        for series_ax, values in axis_values.items():
+            values = np.concatenate(values).astype(float)
+            values = values[np.isfinite(values)]
+            if values.size:
+                low, high = values.min(), values.max()
+                margin = (high - low) * 0.05 or 1
+                series_ax.set_ylim(low - margin, high + margin)
+        toolbar.update()  # The toolbar's Home button returns to the days chosen with the slider
+        canvas.draw_idle()
+
+    def on_forecast_days_changed(value):
+        # The scale fires on every pixel of movement, so redraws are coalesced to one per frame
+        if pending_redraw[0] is None:
+            pending_redraw[0] = frame.after(SLIDER_REDRAW_INTERVAL, redraw_forecast_days)
+
+    def redraw_forecast_days():
+        pending_redraw[0] = None
+        apply_forecast_days()
+
+    def clear_graph():
+        fig.clear()
+        chart.clear()
+        canvas.draw()
 
-        # Adjust data frequency if too many points
-        if len(data) > 100:
-            data = data.iloc[::len(data) // 100, :]
+    def build_graph(data, dates, selected_columns, temperature_unit, wind_speed_unit, precipitation_unit):
+        fig.clear()
+        chart.clear()
 
         # Create the main axis
         ax = fig.add_subplot(111)
         color_index = 0
         axis_map = {}
         legend_handles = []
+        series = {}
 
         def get_or_create_axis(key, position, side):
             """
@@ -380,60 +601,69 @@ def open_forecast_tab(master):
         show_primary_axis = False
         for col in selected_columns:
             if col == 'temperature_2m':
-                line, = ax.plot(data['date'], data['temperature_2m'], label=_("Temperature"),
+                line, = ax.plot(dates, data['temperature_2m'], label=_("Temperature"),
                                 color=color_cycle[color_index])
                 legend_handles.append(line)
+                series[col] = (ax, line)
                 show_primary_axis = True
                 ax.set_ylabel(_("Temperature (") + f"{temperature_unit})")
                 axis_position -= 60
             elif col == 'relative_humidity_2m':
                 rh_ax = get_or_create_axis('Relative Humidity', axis_position, 'left')
-                line, = rh_ax.plot(data['date'], data['relative_humidity_2m'], label=_("Relative Humidity"),
+                line, = rh_ax.plot(dates, data['relative_humidity_2m'], label=_("Relative Humidity"),
                                    color=color_cycle[color_index])
                 legend_handles.append(line)
+                series[col] = (rh_ax, line)
                 rh_ax.set_ylabel(_("Relative Humidity (%)"))
             elif col == 'apparent_temperature':
-                line, = ax.plot(data['date'], data['apparent_temperature'], label=_("Apparent Temperature"),
+                line, = ax.plot(dates, data['apparent_temperature'], label=_("Apparent Temperature"),
                                 color=color_cycle[color_index])
                 legend_handles.append(line)
+                series[col] = (ax, line)
                 show_primary_axis = True
                 ax.set_ylabel(_("Apparent Temperature (") + f"{temperature_unit})")
                 axis_position -= 60
             elif col == 'precipitation_probability':
                 pp_ax = get_or_create_axis('Precipitation Probability', axis_position, 'right')
-                line, = pp_ax.plot(data['date'], data['precipitation_probability'],
+                line, = pp_ax.plot(dates, data['precipitation_probability'],
                                    label=_("Precipitation Probability"),
                                    color=color_cycle[color_index])
                 legend_handles.append(line)
+                series[col] = (pp_ax, line)
                 pp_ax.set_ylabel(_("Precipitation Probability (%)"))
             elif col == 'precipitation':
                 precip_ax = get_or_create_axis('Precipitation', axis_position, 'right')
-                bar = precip_ax.bar(data['date'], data['precipitation'], label=_("Precipitation"),
+                bar = precip_ax.bar(dates, data['precipitation'], label=_("Precipitation"),
                                     color=color_cycle[color_index], alpha=0.5, width=0.13)
                 legend_handles.append(bar)
+                series[col] = (precip_ax, bar)
                 precip_ax.set_ylabel(_("Precipitation (") + f"{precipitation_unit})")
             elif col == 'surface_pressure':
                 sp_ax = get_or_create_axis('Surface Pressure', axis_position, 'right')
-                line, = sp_ax.plot(data['date'], data['surface_pressure'], label=_("Surface Pressure"),
+                line, = sp_ax.plot(dates, data['surface_pressure'], label=_("Surface Pressure"),
                                    color=color_cycle[color_index])
                 legend_handles.append(line)
+                series[col] = (sp_ax, line)
                 sp_ax.set_ylabel(_("Surface Pressure (hPa)"))
             elif col == 'visibility':
                 vis_ax = get_or_create_axis('Visibility', axis_position, 'right')
-                line, = vis_ax.plot(data['date'], data['visibility'], label=_("Visibility"),
+                line, = vis_ax.plot(dates, data['visibility'], label=_("Visibility"),
                                     color=color_cycle[color_index])
                 legend_handles.append(line)
+                series[col] = (vis_ax, line)
                 vis_ax.set_ylabel(_("Visibility (m)"))
             elif col == 'wind_speed_10m':
                 ws_ax = get_or_create_axis('Wind Speed', axis_position, 'right')
-                line, = ws_ax.plot(data['date'], data['wind_speed_10m'], label=_("Wind Speed"),
+                line, = ws_ax.plot(dates, data['wind_speed_10m'], label=_("Wind Speed"),
                                    color=color_cycle[color_index])
                 legend_handles.append(line)
+                series[col] = (ws_ax, line)
                 ws_ax.set_ylabel(_("Wind Speed (") + f"{wind_speed_unit})")
             elif col == 'uv_index':
                 uv_ax = get_or_create_axis('UV Index', axis_position, 'right')
-                line, = uv_ax.plot(data['date'], data['uv_index'], label=_("UV Index"), color=color_cycle[color_index])
+                line, = uv_ax.plot(dates, data['uv_index'], label=_("UV Index"), color=color_cycle[color_index])
                 legend_handles.append(line)
+                series[col] = (uv_ax, line)
                 uv_ax.set_ylabel(_("UV Index"))
             color_index += 1
             axis_position += 60
@@ -441,7 +671,7 @@ def open_forecast_tab(master):
         # Always set up the x-axis
         ax.set_xlabel(_("Date"))
         ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
-        ax.xaxis.set_major_locator(plt.MaxNLocator(len(data['date']) // (len(data['date']) // 8)))
+        ax.xaxis.set_major_locator(plt.MaxNLocator(8))
 
         # Set legends
         ax.legend(handles=legend_handles, loc='upper right')
@@ -449,14 +679,22 @@ def open_forecast_tab(master):
             ax.yaxis.set_visible(False)
 
         fig.tight_layout()
-        canvas.draw()
+        chart.update(ax=ax, series=series, values={col: data[col].to_numpy() for col in series}, dates=dates)
 
     # Clear all previous widgets
+    executor.cancel("forecast")
     for widget in master.winfo_children():
         widget.destroy()
     frame = ttk.Frame(master, padding="10")
     frame.pack(fill='both', expand=True)
 
+    # Whether a forecast was shown yet
+    forecast_loaded = tk.BooleanVar(value=False)
+
+    # Artists of the drawn chart, and the slider redraw waiting for the next frame
+    chart = {}
+    pending_redraw = [None]
+
     # Location selection combobox
     ttk.Label(frame, text=_("Location")).grid(column=0, row=0, padx=5, pady=5)
     location_var = tk.StringVar()
@@ -466,44 +704,47 @@ def open_forecast_tab(master):
                                      values=[f"{loc['name']}, {loc['country']}" for loc in
                                              stored_locations_listbox.locations])
     location_combobox.grid(column=1, row=0, padx=5, pady=5)
+    location_combobox.bind("<<ComboboxSelected>>", lambda event: executor.cancel("forecast"))
 
     if stored_locations_listbox.locations:
         location_combobox.current(0)  # Select the first location by default
 
     # Checkboxes for data selection
     temperature_2m_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("Temperature"), variable=temperature_2m_var).grid(column=2, row=0, padx=5, pady=5)
+    ttk.Checkbutton(frame, text=_("Temperature"), variable=temperature_2m_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=2, row=0, padx=5, pady=5)
 
     relative_humidity_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("Relative Humidity"), variable=relative_humidity_var).grid(column=2, row=1, padx=5,
-                                                                                             pady=5)
+    ttk.Checkbutton(frame, text=_("Relative Humidity"), variable=relative_humidity_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=2, row=1, padx=5, pady=5)
 
     apparent_temperature_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("Apparent Temperature"), variable=apparent_temperature_var).grid(column=2, row=2,
-                                                                                                   padx=5,
-                                                                                                   pady=5)
+    ttk.Checkbutton(frame, text=_("Apparent Temperature"), variable=apparent_temperature_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=2, row=2, padx=5, pady=5)
 
     precipitation_probability_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("Precipitation Probability"), variable=precipitation_probability_var).grid(column=3,
-                                                                                                             row=0,
-                                                                                                             padx=5,
-                                                                                                             pady=5)
+    ttk.Checkbutton(frame, text=_("Precipitation Probability"), variable=precipitation_probability_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=3, row=0, padx=5, pady=5)
 
     precipitation_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("Precipitation"), variable=precipitation_var).grid(column=3, row=1, padx=5, pady=5)
+    ttk.Checkbutton(frame, text=_("Precipitation"), variable=precipitation_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=3, row=1, padx=5, pady=5)
 
     surface_pressure_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("Surface Pressure"), variable=surface_pressure_var).grid(column=3, row=2, padx=5,
-                                                                                           pady=5)
+    ttk.Checkbutton(frame, text=_("Surface Pressure"), variable=surface_pressure_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=3, row=2, padx=5, pady=5)
 
     visibility_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("Visibility"), variable=visibility_var).grid(column=4, row=0, padx=5, pady=5)
+    ttk.Checkbutton(frame, text=_("Visibility"), variable=visibility_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=4, row=0, padx=5, pady=5)
 
     wind_speed_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("Wind Speed"), variable=wind_speed_var).grid(column=4, row=1, padx=5, pady=5)
+    ttk.Checkbutton(frame, text=_("Wind Speed"), variable=wind_speed_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=4, row=1, padx=5, pady=5)
 
     uv_index_var = tk.BooleanVar()
-    ttk.Checkbutton(frame, text=_("UV Index"), variable=uv_index_var).grid(column=4, row=2, padx=5, pady=5)
+    ttk.Checkbutton(frame, text=_("UV Index"), variable=uv_index_var,
+                    command=lambda: on_refresh(fetch_new_data=False)).grid(column=4, row=2, padx=5, pady=5)
 
     # Refresh button
     refresh_button = ttk.Button(frame, text=_("Refresh"), command=lambda: on_refresh(fetch_new_data=True))
@@ -516,25 +757,47 @@ def open_forecast_tab(master):
     canvas.get_tk_widget().grid(column=0, row=3, columnspan=6, pady=5)
     canvas.draw()
 
+    # Toolbar for zooming and panning the graph
+    toolbar = NavigationToolbar2Tk(canvas, frame, pack_toolbar=False)
+    toolbar.grid(column=0, row=4, columnspan=6, padx=5, sticky='w')
+
     # Slider for adjusting forecast days
-    ttk.Label(frame, text=_("Forecast Days")).grid(column=0, row=4, padx=5, pady=5)
+    ttk.Label(frame, text=_("Forecast Days")).grid(column=0, row=5, padx=5, pady=5)
     forecast_slider = ttk.Scale(frame, from_=1, to=14, value=14, orient='horizontal', length=400,
-                                command=lambda a: on_refresh(fetch_new_data=False))
-    forecast_slider.grid(column=1, row=4, columnspan=5, pady=5)
+                                command=on_forecast_days_changed)
+    forecast_slider.grid(column=1, row=5, columnspan=5, pady=5)
+
+    # Label showing the age of cached data
+    data_age_label = ttk.Label(frame, text="")
+    data_age_label.grid(column=0, row=6, columnspan=6, padx=5, pady=5)
 
 
-def loading_animation(flag, loading_label):
+def show_data_age(data_age_label, data_age):
     """
-    Runs a loading animation within the given label
+    Shows the age of the displayed data in a label. Cached data is shown right away, even offline, so the user is
+    told when it is not fresh.
     """
-    flag.clear()
+    if data_age is not None and data_age >= 60:
+        data_age_label.config(text=_("Data updated {} min ago").format(int(data_age // 60)))
+    else:
+        data_age_label.config(text="")
+
+
+def loading_animation(flag, loading_label, i=0):
+    """
+    Runs a loading animation within the given label until the flag is set. Steps are scheduled on the Tk thread
+    with `after`, so the label is never touched from another thread.
+    """
+    if not loading_label.winfo_exists():
+        return  # The tab was rebuilt
+    if i == 0 and getattr(loading_label, "animation", None):
+        loading_label.after_cancel(loading_label.animation)  # Restart an animation that is still running
+    if flag.is_set():
+        loading_label.config(text="")  # Clear the loading text once done
+        return
     animation_symbols = ['|', '/', '–', '\\']
-    i = 0
-    while not flag.is_set():
-        loading_label.config(text=_("Loading") + f"{animation_symbols[i % len(animation_symbols)]}")
-        i += 1
-        time.sleep(0.1)
-    loading_label.config(text="")  # Clear the loading text once done
+    loading_label.config(text=_("Loading") + f"{animation_symbols[i % len(animation_symbols)]}")
+    loading_label.animation = loading_label.after(100, loading_animation, flag, loading_label, i + 1)
 
 
 def open_clothing_recommendations_tab(frame, load_default = False):
@@ -542,6 +805,7 @@ def open_clothing_recommendations_tab(frame, load_default = False):
     Opens the Clothing Recommendations tab in the main application.
     """
     # Clear the parent frame
+    executor.cancel("clothing_recommendations")
     for widget in frame.winfo_children():
         widget.destroy()
 
@@ -573,23 +837,30 @@ def open_clothing_recommendations_tab(frame, load_default = False):
         # Extract units from settings
         temperature_unit, wind_speed_unit, precipitation_unit = extract_units()
 
-        # Start the loading animation in a separate thread
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_loading, loading_label), daemon=True)
-        loading_thread.start()
+        # Start the loading animation
+        stop_loading.clear()
+        loading_animation(stop_loading, loading_label)
 
-        # Get clothing recommendations in a separate thread
-        recommendations_thread = threading.Thread(target=get_recommendations, args=(
-            latitude, longitude, temperature_unit, wind_speed_unit, precipitation_unit), daemon=True)
-        recommendations_thread.start()
+        # Get clothing recommendations on a worker thread
+        executor.submit("clothing_recommendations", get_clothing_recommendations, latitude, longitude,
+                        temperature_unit, wind_speed_unit, precipitation_unit, on_done=show_recommendations,
+                        on_error=show_error)
 
-    def get_recommendations(latitude, longitude, temperature_unit, wind_speed_unit, precipitation_unit):
-        recommendations = get_clothing_recommendations(latitude, longitude, temperature_unit, wind_speed_unit,
-                                                       precipitation_unit)
+    def show_recommendations(recommendations):
         recommendation_label.config(text=recommendations, font=("Helvetica", 12))
+        show_data_age(data_age_label, getattr(recommendations, "data_age", None))
         stop_loading.set()  # Signal to stop the loading animation
 
+    def show_error(error):
+        stop_loading.set()
+        custom_tkinter_exception_handler(type(error), error, error.__traceback__)
+
     stop_loading = threading.Event()
 
+    def cancel_refresh():
+        executor.cancel("clothing_recommendations")
+        stop_loading.set()
+
     # Location selection combobox
     ttk.Label(frame, text=_("Location")).grid(column=0, row=1, padx=5, pady=5, sticky='e')
     location_var = tk.StringVar()
@@ -599,6 +870,7 @@ def open_clothing_recommendations_tab(frame, load_default = False):
                                      values=[f"{loc['name']}, {loc['country']}" for loc in
                                              stored_locations_listbox.locations])
     location_combobox.grid(column=1, row=1, padx=5, pady=5, sticky='ew')
+    location_combobox.bind("<<ComboboxSelected>>", lambda event: cancel_refresh())
 
     if stored_locations_listbox.locations:
         location_combobox.current(0)  # Select the first location by default
@@ -614,6 +886,10 @@ def open_clothing_recommendations_tab(frame, load_default = False):
     # Label to display the clothing recommendations
     recommendation_label = ttk.Label(frame, text="", wraplength=400, justify="center")
     recommendation_label.grid(column=0, row=3, columnspan=3, padx=5, pady=20, sticky='n')
+
+    # Label showing the age of the cached weather the recommendations are based on
+    data_age_label = ttk.Label(frame, text="")
+    data_age_label.grid(column=0, row=4, columnspan=3, padx=5, pady=5)
     if load_default and location_var.get():
         on_refresh()
 
@@ -685,6 +961,7 @@ def open_day_in_history_tab(frame, load_default = False):
     Generates the "This Day in History" tab in the main application.
     """
     # Clear the parent frame
+    executor.cancel("day_in_history")
     for widget in frame.winfo_children():
         widget.destroy()
 
@@ -714,27 +991,30 @@ def open_day_in_history_tab(frame, load_default = False):
         latitude = selected_location['latitude']
         longitude = selected_location['longitude']
 
-        # Extract units from settings
-        temperature_unit, wind_speed_unit, precipitation_unit = extract_units()
+        # Start the loading animation
+        stop_loading.clear()
+        loading_animation(stop_loading, loading_label)
 
-        # Start the loading animation in a separate thread
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_loading, loading_label), daemon=True)
-        loading_thread.start()
+        # Compare the selected date with previous years on a worker thread
+        selected_date = date_entry.get_date()
+        executor.submit("day_in_history", get_date_comparison, latitude, longitude, selected_date,
+                        on_done=show_comparison, on_error=show_error)
 
-        # Get clothing recommendations in a separate thread
-        recommendations_thread = threading.Thread(target=load_data, args=(
-            latitude, longitude, temperature_unit, wind_speed_unit, precipitation_unit), daemon=True)
-        recommendations_thread.start()
-
-    def load_data(latitude, longitude, temperature_unit, wind_speed_unit, precipitation_unit):
-        data_today, data_before = get_history_of_date(latitude, longitude, temperature_unit, wind_speed_unit,
-                                                      precipitation_unit)
-        text_analisys = compare_todays_data(data_today, data_before)
+    def show_comparison(text_analisys):
         recommendation_label.config(text=text_analisys, font=("Helvetica", 12))
+        show_data_age(data_age_label, getattr(text_analisys, "data_age", None))
         stop_loading.set()  # Signal to stop the loading animation
 
+    def show_error(error):
+        stop_loading.set()
+        custom_tkinter_exception_handler(type(error), error, error.__traceback__)
+
     stop_loading = threading.Event()
 
+    def cancel_refresh():
+        executor.cancel("day_in_history")
+        stop_loading.set()
+
     # Location selection combobox
     ttk.Label(frame, text=_("Location")).grid(column=0, row=1, padx=5, pady=5, sticky='e')
     location_var = tk.StringVar()
@@ -744,6 +1024,7 @@ def open_day_in_history_tab(frame, load_default = False):
                                      values=[f"{loc['name']}, {loc['country']}" for loc in
                                              stored_locations_listbox.locations])
     location_combobox.grid(column=1, row=1, padx=5, pady=5, sticky='ew')
+    location_combobox.bind("<<ComboboxSelected>>", lambda event: cancel_refresh())
 
     if stored_locations_listbox.locations:
         location_combobox.current(0)  # Select the first location by default
@@ -752,6 +1033,12 @@ def open_day_in_history_tab(frame, load_default = False):
     refresh_button = ttk.Button(frame, text=_("Refresh"), command=on_refresh)
     refresh_button.grid(column=2, row=1, padx=5, pady=5, sticky='w')
 
+    # Date selector, today by default and no later than the last forecast day
+    ttk.Label(frame, text=_("Date")).grid(column=0, row=2, padx=5, pady=5, sticky='e')
+    date_entry = DateEntry(frame, date_pattern='yyyy-mm-dd',
+                           maxdate=date.today() + timedelta(days=FORECAST_DAYS - 1))
+    date_entry.grid(column=1, row=2, padx=5, pady=5, sticky='ew')
+
     # Label to display the loading animation
     loading_label = ttk.Label(frame, text="", font=("Helvetica", 12))
     loading_label.grid(column=0, row=10, columnspan=3, padx=5, pady=5, sticky='s')
@@ -760,6 +1047,10 @@ def open_day_in_history_tab(frame, load_default = False):
     recommendation_label = ttk.Label(frame, text="", wraplength=400, justify="center")
     recommendation_label.grid(column=0, row=3, columnspan=3, padx=5, pady=20, sticky='n')
 
+    # Label showing the age of the compared date's forecast
+    data_age_label = ttk.Label(frame, text="")
+    data_age_label.grid(column=0, row=4, columnspan=3, padx=5, pady=5)
+
     if load_default and location_var.get():
         on_refresh()
 
@@ -796,9 +1087,43 @@ def mainwindow_loading_animation(flag):
 
     window.mainloop()
 
+def build_tab(frame):
+    """
+    Builds the contents of a tab unless they were built already, and logs how long it took.
+    """
+    if str(frame) in built_tabs:
+        return
+    built_tabs.add(str(frame))
+    name, builder = tab_builders[str(frame)]
+    started = time.perf_counter()
+    builder()
+    startup_logger.info("Built the %s tab in %.0f ms", name, (time.perf_counter() - started) * 1000)
+
+
+def rebuild_tab(function, frame):
+    """
+    Rebuilds a tab that was built before, after the settings it depends on changed.
+    """
+    if str(frame) in built_tabs:
+        function(frame)
+
+
+def prefetch_tabs(root):
+    """
+    Builds the next tab that was not shown yet, then schedules the one after it, so the remaining tabs and
+    their data load while the app is idle instead of delaying startup.
+    """
+    for path in tab_builders:
+        if path not in built_tabs:
+            build_tab(root.nametowidget(path))
+            root.after(TAB_PREFETCH_DELAY, root.after_idle, prefetch_tabs, root)
+            return
+
+
 def create_tabs(root):
     """
-    Creates tabs and their contents
+    Creates tabs. Their contents are built on the first visit, so startup only builds the Forecast tab, and the
+    AI recommendations and the comparison with previous years are not requested before their tabs are opened.
     """
     global history_frame, forecast_frame, forecast_ai_frame, this_day_history_frame
     notebook = ttk.Notebook(root)
@@ -806,40 +1131,36 @@ def create_tabs(root):
 
     # Forecast Tab
     forecast_frame = ttk.Frame(notebook, padding="10")
-    open_forecast_tab(forecast_frame)
     notebook.add(forecast_frame, text=_("Forecast"))
+    tab_builders[str(forecast_frame)] = ("Forecast", lambda: open_forecast_tab(forecast_frame))
 
     # Clothing recommendations Tab
     forecast_ai_frame = ttk.Frame(notebook, padding="10")
-    open_clothing_recommendations_tab(forecast_ai_frame, True)
     notebook.add(forecast_ai_frame, text=_("AI Recommendations"))
+    tab_builders[str(forecast_ai_frame)] = ("AI Recommendations",
+                                            lambda: open_clothing_recommendations_tab(forecast_ai_frame, True))
 
     # History Tab
     history_frame = ttk.Frame(notebook, padding="10")
-    open_history_tab(history_frame)
     notebook.add(history_frame, text=_("History"))
+    tab_builders[str(history_frame)] = ("History", lambda: open_history_tab(history_frame))
 
     # This day in history Tab
     this_day_history_frame = ttk.Frame(notebook, padding="10")
-    open_day_in_history_tab(this_day_history_frame, True)
     notebook.add(this_day_history_frame, text=_("This day in history"))
+    tab_builders[str(this_day_history_frame)] = ("This day in history",
+                                                 lambda: open_day_in_history_tab(this_day_history_frame, True))
 
     # Fun fact Tab
     fun_fact_frame = ttk.Frame(notebook, padding="10")
-    display_weather_facts(fun_fact_frame)
     notebook.add(fun_fact_frame, text=_("Fun fact"))
+    tab_builders[str(fun_fact_frame)] = ("Fun fact", lambda: display_weather_facts(fun_fact_frame))
 
-def test_connection():
-    """
-    Checks if the internet connection is working.
-    """
-    try:
-        request.urlopen('https://api.open-meteo.com/v1/forecast?latitude=1&longitude=1&daily=weather_code'
-                        '&forecast_days=1', timeout=1)
-        return True
-    except:
-        return False
+    notebook.bind("<<NotebookTabChanged>>", lambda event: build_tab(notebook.nametowidget(notebook.select())))
+    build_tab(forecast_frame)
 
+    if load_settings().get("prefetch_tabs", False):
+        root.after(TAB_PREFETCH_DELAY, root.after_idle, prefetch_tabs, root)
 
 def custom_tkinter_exception_handler(exc_type, exc_value, exc_traceback):
     """
@@ -856,19 +1177,20 @@ def initialize_main_window():
     root = tk.Tk()
     root.title(_("NeboKrug"))
     root.report_callback_exception = custom_tkinter_exception_handler
+    executor.start(root)
     main_loading_flag = threading.Event()
     main_loading_animation_thread = threading.Thread(target=mainwindow_loading_animation, args=(main_loading_flag,), daemon=True)
     main_loading_animation_thread.start()
-    if not test_connection() and False:
-        main_loading_flag.clear()
-        messagebox.showerror(_("Error"), _("Check your internet connection."))
-        root.destroy()
-        sys.exit(1)
+    # No connection check here: cached data is shown offline and refreshed once the network is back
     create_tabs(root)
     create_menu_bar(root)
     main_loading_flag.clear()
     root.focus_force()
+    root.after_idle(lambda: startup_logger.info("Forecast tab interactive %.0f ms after launch",
+                                                (time.perf_counter() - launch_time) * 1000))
     root.mainloop()
+    executor.shutdown()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
     initialize_main_window()
\ No newline at end of file
@@ -0,0 +1,239 @@
+import sqlite3
+import threading
+import time
+import requests
+
+# Sustained rate and burst of requests to Open-Meteo. The free API allows 600 calls per minute and 5000 per
+# hour, so the sustained rate follows the hourly limit and bursts stay well below the minute limit.
+RATE_LIMIT_PER_SECOND = 5000 / 3600
+RATE_LIMIT_BURST = 120
+
+# Bounds of the number of requests in flight, and the factor it is cut by when the upstream is overloaded
+MIN_CONCURRENCY = 1
+INITIAL_CONCURRENCY = 4
+CONCURRENCY_DECREASE_FACTOR = 0.5
+
+# Seconds after a cut of the concurrency limit during which further overload responses do not cut it again,
+# as they answer requests sent before the cut
+CONCURRENCY_DECREASE_COOLDOWN = 2.0
+
+# Consecutive failures that open the circuit, and seconds until an open circuit lets a probe request through
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30.0
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the rate of requests across threads, and across processes when given a path.
+
+    With a path, the bucket's state lives in an SQLite database, so every process using the same cache dir
+    draws from one bucket. Without one, it is kept in memory.
+    """
+
+    def __init__(self, rate=RATE_LIMIT_PER_SECOND, capacity=RATE_LIMIT_BURST, path=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.tokens = float(capacity)
+        self.updated_at = time.time()
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY CHECK (id = 0),"
+                                    " tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+            self.connection.execute("INSERT OR IGNORE INTO bucket VALUES (0, ?, ?)", (self.tokens, self.updated_at))
+
+    def take(self, tokens, state):
+        """
+        Refills the bucket state and takes tokens from it if there are enough.
+
+        Args:
+            tokens (float): Number of tokens to take.
+            state (tuple): Tokens in the bucket and the Unix time they were counted at.
+
+        Returns:
+            tuple: New tokens, new Unix time, and the seconds to wait before the tokens are available (0 if
+                they were taken).
+        """
+        now = time.time()
+        available, updated_at = state
+        available = min(self.capacity, available + max(now - updated_at, 0) * self.rate)
+        if available >= tokens:
+            return available - tokens, now, 0.0
+        return available, now, (tokens - available) / self.rate
+
+    def try_acquire(self, tokens=1):
+        """
+        Takes tokens if they are available.
+
+        Args:
+            tokens (float, optional): Number of tokens to take. Defaults to 1.
+
+        Returns:
+            float: 0 if the tokens were taken, else the seconds until they are expected to be available.
+        """
+        with self.lock:
+            if self.connection is None:
+                self.tokens, self.updated_at, wait = self.take(tokens, (self.tokens, self.updated_at))
+                return wait
+            # An immediate transaction keeps other processes out between reading and writing the bucket
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                state = self.connection.execute("SELECT tokens, updated_at FROM bucket WHERE id = 0").fetchone()
+                available, updated_at, wait = self.take(tokens, state)
+                self.connection.execute("UPDATE bucket SET tokens = ?, updated_at = ? WHERE id = 0",
+                                        (available, updated_at))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            return wait
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Waits until tokens are available and takes them.
+
+        Args:
+            tokens (float, optional): Number of tokens to take. Defaults to 1.
+            timeout (float, optional): Maximum seconds to wait. Defaults to waiting as long as needed.
+
+        Returns:
+            bool: Whether the tokens were taken.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    Limit of requests in flight that adapts to the upstream with additive increase, multiplicative decrease.
+
+    Every successful request raises the limit by 1 / limit, about one per round of requests, and an overload
+    response cuts it by CONCURRENCY_DECREASE_FACTOR at most once per cooldown. The limit so settles just
+    below the point where the upstream starts refusing requests instead of oscillating around it.
+    """
+
+    def __init__(self, maximum, minimum=MIN_CONCURRENCY, initial=INITIAL_CONCURRENCY,
+                 decrease_factor=CONCURRENCY_DECREASE_FACTOR, cooldown=CONCURRENCY_DECREASE_COOLDOWN):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.last_decrease = float("-inf")
+        self.decreases = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Waits until fewer requests than the limit are in flight and counts a new one."""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, overloaded=False):
+        """
+        Counts a finished request and adapts the limit to its outcome.
+
+        Args:
+            overloaded (bool, optional): Whether the upstream refused or failed the request because of load.
+                Defaults to False.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if not overloaded:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            elif now - self.last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                self.last_decrease = now
+                self.decreases += 1
+            self.condition.notify_all()
+
+    def stats(self):
+        """
+        Returns a snapshot of the limiter.
+
+        Returns:
+            dict: Current limit, requests in flight and number of decreases.
+        """
+        with self.condition:
+            return {"limit": self.limit, "in_flight": self.in_flight, "decreases": self.decreases}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised instead of sending a request while the circuit breaker considers the upstream unhealthy.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast after repeated upstream failures, so callers fall back to cached data.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failures the circuit opens and every request is rejected.
+    Once CIRCUIT_RESET_TIMEOUT has passed, a single probe request is let through; its success closes the
+    circuit and its failure opens it again. A probe that has not reported back after another
+    CIRCUIT_RESET_TIMEOUT is given up on and a new one is let through.
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.counters = {"opened": 0, "rejected": 0}
+
+    def before_request(self):
+        """
+        Lets a request through or rejects it.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half open with a probe request already in flight.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.state != "closed" and now - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self.opened_at = now
+                return
+            if self.state != "closed":
+                self.counters["rejected"] += 1
+                raise CircuitOpenError("Open-Meteo is temporarily unavailable, try again later")
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.counters["opened"] += 1
+
+    def is_open(self):
+        """Returns whether requests are currently being rejected."""
+        with self.lock:
+            return self.state == "open" and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def stats(self):
+        """
+        Returns a snapshot of the circuit breaker.
+
+        Returns:
+            dict: State, consecutive failures, number of times it opened and of rejected requests.
+        """
+        with self.lock:
+            return dict(self.counters, state=self.state, failures=self.failures)
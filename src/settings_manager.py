@@ -26,6 +26,8 @@ settings_schema = {
             }
         },
         "locale": {"type": "string", "enum": ["en", "ua"]},
+        "snap_coordinates": {"type": "boolean"},
+        "prefetch_tabs": {"type": "boolean"},
     },
     "required": ["temperature_unit", "wind_speed_unit", "precipitation_unit"]
 }
@@ -18,6 +18,8 @@ def settings_misc_window(root):
 
     def on_save_and_close():
         settings["locale"] = "en" if language_selected_option.get() == "English" else "ua"
+        settings["snap_coordinates"] = snap_coordinates_var.get()
+        settings["prefetch_tabs"] = prefetch_tabs_var.get()
         save_settings(settings)  # Save the settings to a JSON file
         settings_window.destroy()
         os.execl(sys.executable, sys.executable, *sys.argv) # Restart the app
@@ -40,9 +42,21 @@ def settings_misc_window(root):
                                      values=language_options, state="readonly")
     language_dropdown.grid(column=1, row=0, padx=5, pady=5)
 
+    # Nearby locations in the same model grid cell share downloaded data
+    snap_coordinates_var = tk.BooleanVar(value=settings.get("snap_coordinates", False))
+    snap_coordinates_check = ttk.Checkbutton(frame, text=_("Share data between nearby locations"),
+                                             variable=snap_coordinates_var)
+    snap_coordinates_check.grid(column=0, row=1, columnspan=2, padx=5, pady=5, sticky='w')
+
+    # Tabs other than Forecast are built on their first visit, or in the background after startup
+    prefetch_tabs_var = tk.BooleanVar(value=settings.get("prefetch_tabs", False))
+    prefetch_tabs_check = ttk.Checkbutton(frame, text=_("Load other tabs in the background"),
+                                          variable=prefetch_tabs_var)
+    prefetch_tabs_check.grid(column=0, row=2, columnspan=2, padx=5, pady=5, sticky='w')
+
     # Save and Close Button
     save_and_close_btn = ttk.Button(frame, text=_("Save & Restart"), command=on_save_and_close)
-    save_and_close_btn.grid(column=0, row=1, columnspan=2, pady=10)
+    save_and_close_btn.grid(column=0, row=3, columnspan=2, pady=10)
 
     settings_window.transient(root)
     settings_window.grab_set()
@@ -0,0 +1,213 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of worker threads, so refreshes of different tabs run in parallel
+TASK_WORKERS = 4
+
+# Milliseconds between drains of the result queue on the Tk thread, one frame at 60 fps
+TASK_POLL_INTERVAL = 16
+
+# Seconds of Tk thread time one drain may spend on callbacks before yielding to the event loop
+TASK_DRAIN_BUDGET = 0.008
+
+
+class TaskExecutor:
+    """
+    Runs fetch and compute work off the Tk thread and hands the results back to it.
+
+    Workers never touch widgets: results are put on a queue that the Tk thread drains with `root.after`, and
+    callbacks run there. Every task belongs to a channel, usually a tab, and submitting a task makes the
+    channel's earlier tasks stale, so results of a refresh the user has already replaced are dropped
+    instead of overwriting newer ones.
+    """
+
+    def __init__(self, max_workers=TASK_WORKERS, poll_interval=TASK_POLL_INTERVAL, drain_budget=TASK_DRAIN_BUDGET):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self.poll_interval = poll_interval
+        self.drain_budget = drain_budget
+        self.results = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.generations = {}
+        self.futures = {}
+        self.root = None
+        self.counters = {"submitted": 0, "delivered": 0, "dropped": 0, "failed": 0}
+
+    def start(self, root):
+        """
+        Starts draining results on the Tk thread of the given root window.
+
+        Args:
+            root (tk.Tk): Main window whose event loop runs the callbacks.
+        """
+        self.root = root
+        self.root.after(self.poll_interval, self.drain)
+
+    def cancel(self, channel):
+        """
+        Makes all tasks of a channel stale. Tasks that have not started yet are not run at all.
+
+        Args:
+            channel (str): Channel to cancel.
+
+        Returns:
+            int: The channel's new generation.
+        """
+        with self.lock:
+            generation = self.generations.get(channel, 0) + 1
+            self.generations[channel] = generation
+            future = self.futures.pop(channel, None)
+        if future is not None:
+            future.cancel()
+        return generation
+
+    def is_current(self, channel, generation):
+        """
+        Returns whether a generation is still the latest of its channel. Long-running tasks check this to stop
+        early.
+        """
+        with self.lock:
+            return self.generations.get(channel, 0) == generation
+
+    def submit(self, channel, function, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Runs a function on a worker thread, cancelling the channel's earlier tasks.
+
+        Args:
+            channel (str): Channel the task belongs to.
+            function (callable): Function to run on the worker.
+            *args: Positional arguments of the function.
+            on_done (callable, optional): Called on the Tk thread with the function's result.
+            on_error (callable, optional): Called on the Tk thread with the exception if the function raised.
+                Defaults to the root window's `report_callback_exception`.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            int: Generation of the task, to pass to `post` and `is_current`.
+        """
+        generation = self.cancel(channel)
+
+        def run():
+            if not self.is_current(channel, generation):
+                return
+            try:
+                result = function(*args, **kwargs)
+            except Exception as error:
+                self.post(channel, generation, self.report_error, error, on_error)
+            else:
+                if on_done is not None:
+                    self.post(channel, generation, on_done, result)
+
+        return self.schedule(channel, generation, run)
+
+    def stream(self, channel, items, on_item, on_done=None, on_error=None):
+        """
+        Consumes an iterator on a worker thread and hands every item to the Tk thread as it arrives, cancelling
+        the channel's earlier tasks. Once the task is stale, the iterator is closed without being exhausted.
+
+        Args:
+            channel (str): Channel the task belongs to.
+            items (iterator): Iterator to consume, such as a generator fetching data in chunks.
+            on_item (callable): Called on the Tk thread with every item.
+            on_done (callable, optional): Called on the Tk thread without arguments after the last item.
+            on_error (callable, optional): Called on the Tk thread with the exception if the iterator raised.
+                Defaults to the root window's `report_callback_exception`.
+
+        Returns:
+            int: Generation of the task.
+        """
+        generation = self.cancel(channel)
+
+        def run():
+            try:
+                for item in items:
+                    if not self.is_current(channel, generation):
+                        return
+                    self.post(channel, generation, on_item, item)
+            except Exception as error:
+                self.post(channel, generation, self.report_error, error, on_error)
+            else:
+                if on_done is not None:
+                    self.post(channel, generation, on_done)
+            finally:
+                close = getattr(items, "close", None)
+                if close is not None:
+                    close()
+
+        return self.schedule(channel, generation, run)
+
+    def schedule(self, channel, generation, run):
+        future = self.pool.submit(run)
+        with self.lock:
+            self.counters["submitted"] += 1
+            if self.generations.get(channel) == generation:
+                self.futures[channel] = future
+        return generation
+
+    def post(self, channel, generation, callback, *args):
+        """
+        Queues a callback for the Tk thread. It is dropped if the generation is stale by the time it would run.
+        Safe to call from any thread.
+
+        Args:
+            channel (str): Channel the callback belongs to.
+            generation (int): Generation of the task posting it.
+            callback (callable): Function to call on the Tk thread.
+            *args: Arguments of the callback.
+        """
+        self.results.put((channel, generation, callback, args))
+
+    def report_error(self, error, on_error=None):
+        with self.lock:
+            self.counters["failed"] += 1
+        if on_error is not None:
+            on_error(error)
+        elif self.root is not None:
+            self.root.report_callback_exception(type(error), error, error.__traceback__)
+        else:
+            raise error
+
+    def drain(self):
+        """
+        Runs queued callbacks on the Tk thread for up to the drain budget, then reschedules itself, so a burst
+        of results never blocks the event loop for more than about a frame.
+        """
+        deadline = time.perf_counter() + self.drain_budget
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    channel, generation, callback, args = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if not self.is_current(channel, generation):
+                    with self.lock:
+                        self.counters["dropped"] += 1
+                    continue
+                with self.lock:
+                    self.counters["delivered"] += 1
+                try:
+                    callback(*args)
+                except Exception as error:
+                    self.report_error(error)
+        finally:
+            if self.root is not None:
+                self.root.after(self.poll_interval, self.drain)
+
+    def stats(self):
+        """
+        Returns a snapshot of the executor's counters.
+
+        Returns:
+            dict: Numbers of submitted tasks, delivered and dropped callbacks, and failed tasks.
+        """
+        with self.lock:
+            return dict(self.counters)
+
+    def shutdown(self):
+        """Stops the workers, cancelling tasks that have not started."""
+        self.root = None
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+executor = TaskExecutor()
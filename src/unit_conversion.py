@@ -0,0 +1,136 @@
+import numpy as np
+from decoding import DecodedBlock
+
+# Units every request is made in, so cached and stored data never depends on the selected units
+CANONICAL_UNITS = ("celsius", "ms", "mm")
+CANONICAL_UNIT_PARAMS = dict(zip(("temperature_unit", "wind_speed_unit", "precipitation_unit"), CANONICAL_UNITS))
+
+# Physical quantity of every variable whose values depend on the selected units
+VARIABLE_QUANTITIES = {
+    "temperature_2m": "temperature",
+    "temperature_2m_max": "temperature",
+    "temperature_2m_min": "temperature",
+    "temperature_2m_mean": "temperature",
+    "apparent_temperature": "temperature",
+    "wind_speed_10m": "wind_speed",
+    "wind_speed_10m_max": "wind_speed",
+    "wind_gusts_10m": "wind_speed",
+    "precipitation": "precipitation",
+    "precipitation_sum": "precipitation",
+    "rain": "precipitation",
+    "showers": "precipitation",
+    "snowfall": "snowfall",
+}
+
+# Scale and offset converting a canonical value to another Open-Meteo unit
+CONVERSIONS = {
+    ("temperature", "fahrenheit"): (9 / 5, 32.0),
+    ("wind_speed", "kmh"): (3.6, 0.0),
+    ("wind_speed", "kn"): (3600 / 1852, 0.0),
+    ("wind_speed", "mph"): (3600 / 1609.344, 0.0),
+    ("precipitation", "inch"): (1 / 25.4, 0.0),
+    # Snowfall comes in centimeters for metric and in inches for imperial precipitation units
+    ("snowfall", "inch"): (1 / 2.54, 0.0),
+}
+
+
+def get_conversion(variable, units):
+    """
+    Returns the linear conversion of a variable from canonical to the given units.
+
+    Args:
+        variable (str): Open-Meteo variable name.
+        units (tuple): Open-Meteo temperature, wind speed and precipitation units.
+
+    Returns:
+        tuple: Scale and offset, or None if the values need no conversion.
+    """
+    quantity = VARIABLE_QUANTITIES.get(variable)
+    if quantity is None:
+        return None
+    temperature_unit, wind_speed_unit, precipitation_unit = units
+    unit = {"temperature": temperature_unit, "wind_speed": wind_speed_unit}.get(quantity, precipitation_unit)
+    return CONVERSIONS.get((quantity, unit))
+
+
+def convert_array(values, variable, units):
+    """
+    Converts an array of canonical values of a variable to the given units.
+
+    Args:
+        values (np.ndarray): Values in canonical units.
+        variable (str): Open-Meteo variable name.
+        units (tuple): Open-Meteo temperature, wind speed and precipitation units.
+
+    Returns:
+        np.ndarray: Converted values, or the given array itself if no conversion is needed.
+    """
+    conversion = get_conversion(variable, units)
+    if conversion is None:
+        return values
+    scale, offset = conversion
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.floating):
+        values = values.astype(np.float64)
+    # Scalars of the array's own type keep float32 columns in float32
+    return values * values.dtype.type(scale) + values.dtype.type(offset)
+
+
+def convert_dataframe(dataframe, units):
+    """
+    Converts the columns of a DataFrame holding canonical values to the given units.
+
+    Args:
+        dataframe (pd.DataFrame): DataFrame with Open-Meteo variables as columns.
+        units (tuple): Open-Meteo temperature, wind speed and precipitation units.
+
+    Returns:
+        pd.DataFrame: New DataFrame with converted columns. Columns needing no conversion are shared.
+    """
+    converted = {column: convert_array(dataframe[column].to_numpy(), column, units)
+                 for column in dataframe.columns if get_conversion(column, units) is not None}
+    result = dataframe.copy(deep=False)
+    for column, values in converted.items():
+        result[column] = values
+    result.attrs = dict(dataframe.attrs)
+    return result
+
+
+def convert_block(block, units):
+    """
+    Converts the columns of a DecodedBlock holding canonical values to the given units.
+
+    Args:
+        block (DecodedBlock): Block with Open-Meteo variables as columns.
+        units (tuple): Open-Meteo temperature, wind speed and precipitation units.
+
+    Returns:
+        DecodedBlock: New block with converted values, or the given block itself if no column needs conversion.
+    """
+    conversions = [get_conversion(name, units) for name in block.names]
+    if all(conversion is None for conversion in conversions):
+        return block
+    values = block.values.copy()
+    for i, conversion in enumerate(conversions):
+        if conversion is not None:
+            scale, offset = conversion
+            values[:, i] = values[:, i] * values.dtype.type(scale) + values.dtype.type(offset)
+    return DecodedBlock(block.start, block.interval, block.names, values)
+
+
+def convert_values(values, units):
+    """
+    Converts single canonical values to the given units.
+
+    Args:
+        values (dict): Open-Meteo variable names mapped to values in canonical units.
+        units (tuple): Open-Meteo temperature, wind speed and precipitation units.
+
+    Returns:
+        dict: Variable names mapped to converted values.
+    """
+    converted = {}
+    for variable, value in values.items():
+        conversion = get_conversion(variable, units)
+        converted[variable] = value if conversion is None else value * conversion[0] + conversion[1]
+    return converted
@@ -1,21 +1,246 @@
 import unittest
+from unittest import mock
 from src.api import (
     get_historical_weather_data,
     get_forecast_data,
+    get_forecast_data_batch,
     get_current_weather,
     search_location,
-    convert_units
+    convert_units,
+    compare_todays_data,
+    format_comparison_report,
+    get_weather_of_date,
+    CURRENT_VARIABLES,
+    CLIMATOLOGY_VARIABLES,
+    same_calendar_day,
+    same_calendar_day_mask,
+    gather_with_concurrency,
+    ModelRunScheduler,
+    MODEL_RUN_MIN_EXPIRY,
+    split_date_range,
+    get_forecast_columns,
+    get_historical_hourly_data,
+    HISTORICAL_HOURLY_VARIABLES,
+    get_forecast_expires_at,
+    get_forecast_expiry,
+    model_runs
 )
+from src import api
+from src.cache_manager import ColumnCache, FORECAST_TAIL_EXPIRY
+from src.decoding import DecodedBlock
+from src.archive_store import ArchiveStore
+from datetime import datetime, date
+import sys
+import time
+import tempfile
+import asyncio
+import numpy as np
 import pandas as pd
 
 class TestAPI(unittest.TestCase):
 
+    def setUp(self):
+        # Keep the response cache, rate limiter and archive store of the live tests out of the user cache dir
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        client_manager = sys.modules[api.get_openmeteo_client.__module__]
+        cache_manager = sys.modules[client_manager.get_response_cache.__module__]
+        for patcher in (mock.patch("platformdirs.user_cache_dir", return_value=self.directory.name),
+                        mock.patch.object(cache_manager, "response_cache", None),
+                        mock.patch.object(client_manager, "rate_limiter", None),
+                        mock.patch.dict(client_manager.clients, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def test_convert_units(self):
         temp_unit, wind_unit, precip_unit = convert_units("Fahrenheit °F", "Km/h", "Inch")
         self.assertEqual(temp_unit, "fahrenheit")
         self.assertEqual(wind_unit, "kmh")
         self.assertEqual(precip_unit, "inch")
 
+    def test_model_run_scheduler(self):
+        scheduler = ModelRunScheduler({"icon": "https://example.com/meta.json"}, recheck=600)
+        scheduler.checked_at["icon"] = time.time()
+        self.assertIsNone(scheduler.expires_at("icon", time.time()))
+
+        now = time.time()
+        scheduler.update("icon", {"last_run_availability_time": now - 3600, "update_interval_seconds": 3 * 3600})
+        self.assertAlmostEqual(scheduler.expires_at("icon", now), now + 2 * 3600)
+        # Data downloaded before the last run expired when it was published
+        self.assertAlmostEqual(scheduler.expires_at("icon", now - 7200), now - 3600)
+        self.assertAlmostEqual(scheduler.expires_at("icon", now - 3630), now - 3630 + MODEL_RUN_MIN_EXPIRY)
+
+        # An overdue run is looked for again after the recheck interval
+        scheduler.update("icon", {"last_run_availability_time": now - 4 * 3600, "update_interval_seconds": 3 * 3600})
+        self.assertAlmostEqual(scheduler.expires_at("icon", now), now + 600, delta=1)
+
+    def test_get_forecast_columns_skips_window_off_the_axis(self):
+        # Offline, stale cached responses give a day-old full block and a window starting before its time axis
+        now = time.time()
+        start = int(now // 3600 * 3600)
+        full = DecodedBlock(start, 3600, ["temperature_2m"], np.zeros((336, 1), dtype=np.float32))
+        window = DecodedBlock(start - 3600, 3600, ["temperature_2m"], np.ones((48, 1), dtype=np.float32))
+        column_cache = ColumnCache()
+        calls = []
+
+        def fetch(latitude, longitude, variables, near_term=False):
+            calls.append(near_term)
+            return (window if near_term else full), now - 86400
+
+        with mock.patch("src.api.fetch_forecast_columns", fetch), \
+                mock.patch("src.api.get_column_cache", lambda: column_cache), \
+                mock.patch("src.api.get_forecast_location_key", lambda latitude, longitude: "kyiv"), \
+                mock.patch("src.api.get_forecast_expires_at", lambda lat, lon, fetched_at, near_term=False: fetched_at + 3600):
+            block, fetched_at = get_forecast_columns(50.45, 30.52, ["temperature_2m"])
+
+        # The location is fetched again once, then the full block is kept without the window
+        self.assertEqual(calls, [False, True, False, True])
+        np.testing.assert_array_equal(block["temperature_2m"], full["temperature_2m"])
+        self.assertEqual(fetched_at, now - 86400)
+
+    def test_forecast_expiry_outside_model_area(self):
+        now = time.time()
+        with mock.patch.object(model_runs, "expires_at", lambda name, fetched_at: fetched_at + 60):
+            self.assertEqual(get_forecast_expires_at(50.45, 30.52, now), now + 60)
+            # Outside Europe best_match serves other models, so the fixed expiry applies
+            self.assertEqual(get_forecast_expires_at(37.7749, -122.4194, now), now + FORECAST_TAIL_EXPIRY)
+            self.assertAlmostEqual(get_forecast_expiry({"latitude": 50.45, "longitude": 30.52}), 60, delta=1)
+            self.assertIsNone(get_forecast_expiry({"latitude": "50.45,37.77", "longitude": "30.52,-122.42"}))
+
+    def test_get_historical_hourly_data_fills_store_gaps(self):
+        class Block:
+            def __init__(self, params):
+                self.start = int(pd.Timestamp(params["start_date"]).timestamp())
+                self.end = int(pd.Timestamp(params["end_date"]).timestamp()) + 86400
+
+            def Time(self):
+                return self.start
+
+            def TimeEnd(self):
+                return self.end
+
+            def Interval(self):
+                return 3600
+
+            def Variables(self, i):
+                # Every variable is its position in the request plus one
+                values = np.full((self.end - self.start) // 3600, i + 1, dtype=np.float32)
+                return mock.Mock(ValuesAsNumpy=lambda: values)
+
+        class Client:
+            def __init__(self):
+                self.requests = []
+
+            def weather_api(self, url, params, method="GET"):
+                self.requests.append(params)
+                return [mock.Mock(Hourly=lambda: Block(params), UtcOffsetSeconds=lambda: 0)]
+
+        client = Client()
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch("src.api.setup_openmeteo_client", lambda: client), \
+                mock.patch("src.api.get_location_archive_store",
+                           lambda latitude, longitude, resolution: ArchiveStore(directory, 3600)):
+            block = get_historical_hourly_data(50.45, 30.52, "2000-01-01", "2000-01-02",
+                                               ["precipitation", "temperature_2m"])
+            self.assertEqual(len(block), 48)
+            np.testing.assert_array_equal(block["precipitation"], 2)
+            np.testing.assert_array_equal(block["temperature_2m"], 1)
+            self.assertEqual(client.requests[0]["hourly"], HISTORICAL_HOURLY_VARIABLES)
+
+            # The span is held now, so reading it again makes no request
+            block = get_historical_hourly_data(50.45, 30.52, "2000-01-02", "2000-01-02", ["temperature_2m"])
+            self.assertEqual(len(block), 24)
+            self.assertEqual(len(client.requests), 1)
+
+            self.assertRaises(ValueError, get_historical_hourly_data, 50.45, 30.52, "2000-01-01", "2000-01-02",
+                              ["snowfall"])
+
+    def test_split_date_range(self):
+        self.assertEqual(split_date_range("2022-06-15", "2024-02-01"), [
+            ("2022-06-15", "2022-12-31"), ("2023-01-01", "2023-12-31"), ("2024-01-01", "2024-02-01")
+        ])
+        self.assertEqual(split_date_range("2020-01-01", "2024-12-31", chunk_years=2), [
+            ("2020-01-01", "2021-12-31"), ("2022-01-01", "2023-12-31"), ("2024-01-01", "2024-12-31")
+        ])
+        self.assertEqual(split_date_range("2024-01-05", "2024-01-05"), [("2024-01-05", "2024-01-05")])
+
+    def test_same_calendar_day(self):
+        self.assertEqual(same_calendar_day(datetime(2024, 2, 29), 2023), datetime(2023, 2, 28))
+        self.assertEqual(same_calendar_day(datetime(2024, 2, 29), 2020), datetime(2020, 2, 29))
+        self.assertEqual(same_calendar_day(datetime(2024, 6, 15), 1950), datetime(1950, 6, 15))
+
+    def test_same_calendar_day_mask(self):
+        dates = pd.date_range("1999-01-01", "2004-12-31", freq="D")
+        mask = same_calendar_day_mask(dates, 6, 15)
+        self.assertEqual(list(dates[mask].year), list(range(1999, 2005)))
+        self.assertTrue(((dates[mask].month == 6) & (dates[mask].day == 15)).all())
+
+        leap_mask = same_calendar_day_mask(dates, 2, 29)
+        selected = dates[leap_mask]
+        self.assertEqual(list(selected.year), list(range(1999, 2005)))
+        self.assertEqual(list(selected.day), [28, 29, 28, 28, 28, 29])
+
+    def test_gather_with_concurrency(self):
+        running = []
+        peak = []
+
+        async def task(value):
+            running.append(value)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(value)
+            return value * 2
+
+        results = asyncio.run(gather_with_concurrency((task(i) for i in range(10)), limit=3))
+        self.assertEqual(results, [i * 2 for i in range(10)])
+        self.assertLessEqual(max(peak), 3)
+
+    def test_compare_todays_data(self):
+        historical_df = pd.DataFrame({
+            "date": pd.to_datetime(["1950-06-15", "1960-06-15", "1970-06-15", "1980-06-15"], utc=True),
+            "temperature_2m_max": [20.0, 31.5, 25.0, 31.5],
+            "temperature_2m_min": [5.0, 12.0, -2.5, 10.0],
+            "precipitation_sum": [0.0, 3.0, 0.0, 0.0],
+            "wind_speed_10m_max": [4.0, 9.5, 1.5, 6.0]
+        })
+        today_df = pd.DataFrame({
+            "date": pd.to_datetime(["2024-06-15"], utc=True),
+            "temperature_2m_max": [26.0],
+            "temperature_2m_min": [11.0],
+            "precipitation_sum": [0.0],
+            "wind_speed_10m_max": [5.0]
+        })
+        report = compare_todays_data(today_df, historical_df)
+        paragraphs = report.split("\n\n")
+        self.assertEqual(len(paragraphs), 3)
+        self.assertIn("1960", paragraphs[0])
+        self.assertIn("31.5", paragraphs[0])
+        self.assertIn("1970", paragraphs[0])
+        self.assertIn("-2.5", paragraphs[0])
+        self.assertIn("1960", paragraphs[1])
+        self.assertIn("3.0", paragraphs[1])
+        self.assertIn("1960", paragraphs[2])
+        self.assertIn("1970", paragraphs[2])
+
+    def test_comparison_report_names_other_dates(self):
+        records = dict(hottest=(1960, 31.5), coldest=(1970, -2.5), today_precipitation=1.0, last_rain=None,
+                       wettest=(1960, 3.0), wind_speed_rank=2, windiest=(1960, 9.5), calmest=(1970, 1.5))
+        report = format_comparison_report(2, 3, day=date(2020, 6, 15), **records)
+        self.assertEqual(report.count("2020-06-15"), 3)
+        self.assertEqual(format_comparison_report(2, 3, **records),
+                         format_comparison_report(2, 3, day=date.today(), **records))
+        self.assertNotIn(date.today().isoformat(), format_comparison_report(2, 3, **records))
+
+    def test_forecast_backed_text_carries_data_age(self):
+        now = time.time()
+        today = int(pd.Timestamp(date.today()).timestamp())
+        bundle = {"current": {name: 1.0 for name in CURRENT_VARIABLES}, "fetched_at": now - 600,
+                  "daily": DecodedBlock(today, 86400, CLIMATOLOGY_VARIABLES,
+                                        np.ones((14, len(CLIMATOLOGY_VARIABLES)), dtype=np.float32))}
+        with mock.patch("src.api.get_forecast_bundle", lambda latitude, longitude: bundle):
+            self.assertAlmostEqual(get_current_weather(50.45, 30.52).data_age, 600, delta=5)
+            self.assertAlmostEqual(get_weather_of_date(50.45, 30.52, date.today()).attrs["data_age"], 600, delta=5)
+
     def test_get_historical_weather_data(self):
         latitude, longitude = 37.7749, -122.4194
         start_date, end_date = "2023-01-01", "2023-01-02"
@@ -29,6 +254,18 @@ class TestAPI(unittest.TestCase):
         self.assertIsInstance(df, pd.DataFrame)
         self.assertIn("temperature_2m", df.columns)
 
+    def test_get_forecast_data_batch(self):
+        locations = [
+            {"latitude": 37.7749, "longitude": -122.4194},
+            {"latitude": 50.4501, "longitude": 30.5234},
+            {"latitude": 48.8566, "longitude": 2.3522}
+        ]
+        dataframes = get_forecast_data_batch(locations, batch_size=2)
+        self.assertEqual(len(dataframes), 3)
+        for df in dataframes:
+            self.assertIsInstance(df, pd.DataFrame)
+            self.assertIn("temperature_2m", df.columns)
+
     def test_get_current_weather(self):
         latitude, longitude = 37.7749, -122.4194
         weather_data = get_current_weather(latitude, longitude)
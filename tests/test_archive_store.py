@@ -0,0 +1,96 @@
+import unittest
+import tempfile
+import threading
+import numpy as np
+from src.archive_store import (
+    ArchiveStore,
+    GROWTH_SLACK_SECONDS,
+    merge_spans,
+    subtract_spans
+)
+
+
+class TestArchiveStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.store = ArchiveStore(self.temporary_dir.name)
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_merge_spans(self):
+        self.assertEqual(merge_spans([[5, 10], [0, 3], [3, 4], [8, 12]]), [[0, 4], [5, 12]])
+
+    def test_subtract_spans(self):
+        spans = [[10, 20], [30, 40]]
+        self.assertEqual(subtract_spans(0, 50, spans), [(0, 10), (20, 30), (40, 50)])
+        self.assertEqual(subtract_spans(12, 18, spans), [])
+        self.assertEqual(subtract_spans(15, 35, spans), [(20, 30)])
+
+    def test_index_of(self):
+        self.assertEqual(self.store.index_of("1940-01-01"), 0)
+        self.assertEqual(self.store.index_of("1940-02-01"), 31)
+        self.assertEqual(self.store.date_of(31).isoformat(), "1940-02-01")
+
+    def test_write_and_read(self):
+        start = self.store.index_of("2020-01-01")
+        values = np.arange(10, dtype=np.float32)
+        self.store.write(start, {"temperature_2m_max": values}, 7200)
+
+        self.assertEqual(self.store.missing_ranges(start, start + 10), [])
+        self.assertEqual(self.store.missing_ranges(start - 5, start + 12),
+                         [(start - 5, start), (start + 10, start + 12)])
+
+        columns = self.store.read(start + 2, start + 12, ["temperature_2m_max", "precipitation_sum"])
+        np.testing.assert_array_equal(columns["temperature_2m_max"][:8], values[2:])
+        self.assertTrue(np.isnan(columns["temperature_2m_max"][8:]).all())
+        self.assertTrue(np.isnan(columns["precipitation_sum"]).all())
+
+    def test_unsettled_values_are_not_held(self):
+        start = self.store.index_of("2020-01-01")
+        self.store.write(start, {"temperature_2m_max": np.ones(10, dtype=np.float32)}, 0,
+                         settled_until_index=start + 6)
+        self.assertEqual(self.store.missing_ranges(start, start + 10), [(start + 6, start + 10)])
+
+    def test_metadata_is_persisted(self):
+        start = self.store.index_of("2000-01-01")
+        self.store.write(start, {"temperature_2m_max": np.ones(3, dtype=np.float32)}, 3600)
+        reopened = ArchiveStore(self.temporary_dir.name)
+        self.assertEqual(reopened.missing_ranges(start, start + 3), [])
+        self.assertEqual(reopened.timestamps(start, start + 1)[0] % 86400, 86400 - 3600)
+
+
+    def test_concurrent_writers_keep_each_others_spans(self):
+        # Every chunk of a History load opens its own store of the location
+        stores = [ArchiveStore(self.temporary_dir.name) for _ in range(10)]
+        starts = [self.store.index_of(f"{2000 + i}-01-01") for i in range(10)]
+        threads = [threading.Thread(target=store.write,
+                                    args=(start, {"temperature_2m_max": np.ones(366, dtype=np.float32)}, 0))
+                   for store, start in zip(stores, starts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reopened = ArchiveStore(self.temporary_dir.name)
+        self.assertEqual(reopened.missing_ranges(starts[0], self.store.index_of("2010-01-01")), [])
+
+    def test_hourly_store(self):
+        store = ArchiveStore(self.temporary_dir.name + "/hourly", step_seconds=3600)
+        start = store.index_of("2020-01-02")
+        self.assertEqual(start - store.index_of("2020-01-01"), 24)
+        self.assertEqual(store.date_of(start + 23).isoformat(), "2020-01-02")
+
+        store.write(start, {"temperature_2m": np.arange(48, dtype=np.float32),
+                            "precipitation": np.ones(48, dtype=np.float32)}, 0)
+        self.assertEqual(len(np.load(store.variable_path("temperature_2m"), mmap_mode="r")),
+                         start + 48 + GROWTH_SLACK_SECONDS // 3600)
+        values = store.read_array(start + 24, start + 50, ["precipitation", "temperature_2m"])
+        self.assertEqual(values.shape, (26, 2))
+        np.testing.assert_array_equal(values[:24, 1], np.arange(24, 48))
+        self.assertTrue(np.isnan(values[24:]).all())
+        self.assertEqual(store.timestamps(start, start + 2)[1] - store.timestamps(start, start + 1)[0], 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
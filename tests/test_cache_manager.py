@@ -0,0 +1,173 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest import mock
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from src.cache_manager import (
+    CacheEntry,
+    MemoryCache,
+    DiskCache,
+    TieredCache,
+    ResultCache,
+    ColumnCache,
+    estimate_size,
+    get_expiry,
+    CURRENT_WEATHER_EXPIRY,
+    NEAR_TERM_EXPIRY,
+    RECENT_ARCHIVE_EXPIRY
+)
+from src import client_manager
+from src.client_manager import SharedOpenMeteoClient, make_request_key
+from src.decoding import DecodedBlock
+
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+class TestCacheManager(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "responses.sqlite")
+        # Keep the shared response cache and rate limiter databases out of the user cache dir
+        cache_manager = sys.modules[client_manager.get_response_cache.__module__]
+        for patcher in (mock.patch("platformdirs.user_cache_dir", return_value=self.directory.name),
+                        mock.patch.object(cache_manager, "response_cache", None),
+                        mock.patch.object(client_manager, "rate_limiter", None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_expiry(self):
+        self.assertIsNone(get_expiry(ARCHIVE_URL, {"end_date": "2000-12-31"}))
+        recent = (date.today() - timedelta(days=1)).isoformat()
+        self.assertEqual(get_expiry(ARCHIVE_URL, {"end_date": recent}), RECENT_ARCHIVE_EXPIRY)
+        self.assertEqual(get_expiry(FORECAST_URL, {"hourly": ["temperature_2m"]}), 3600)
+        self.assertEqual(get_expiry(FORECAST_URL, {"current": ["rain"]}), CURRENT_WEATHER_EXPIRY)
+        self.assertEqual(get_expiry(FORECAST_URL, {"forecast_hours": 48}), NEAR_TERM_EXPIRY)
+        self.assertEqual(get_expiry("https://example.com", {}, default_expiry=60), 60)
+
+    def test_memory_cache_evicts_least_recently_used(self):
+        cache = MemoryCache(max_bytes=10)
+        cache.set("a", CacheEntry(b"1234", 0, None))
+        cache.set("b", CacheEntry(b"1234", 0, None))
+        cache.get("a")
+        cache.set("c", CacheEntry(b"1234", 0, None))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.size, 8)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_disk_cache_persists_and_evicts(self):
+        cache = DiskCache(self.path, max_bytes=10)
+        cache.set("a", CacheEntry(b"1234", 1.0, 2.0))
+        time.sleep(0.01)
+        cache.set("b", CacheEntry(b"1234", 1.0, None))
+        time.sleep(0.01)
+        cache.get("a")
+        cache.set("c", CacheEntry(b"1234", 1.0, None))
+        self.assertEqual(cache.evictions, 1)
+        cache.connection.close()
+
+        reopened = DiskCache(self.path, max_bytes=10)
+        self.assertEqual(reopened.size, 8)
+        self.assertIsNone(reopened.get("b"))
+        entry = reopened.get("a")
+        self.assertEqual((entry.data, entry.fetched_at, entry.expires_at), (b"1234", 1.0, 2.0))
+        reopened.connection.close()
+
+    def test_tiered_cache_promotes_disk_hits(self):
+        cache = TieredCache(self.path)
+        cache.set(("GET", FORECAST_URL, ()), b"data", time.time(), 60)
+        cache.memory.clear()
+        self.assertEqual(cache.get(("GET", FORECAST_URL, ())).data, b"data")
+        self.assertEqual(cache.get(("GET", FORECAST_URL, ())).data, b"data")
+        self.assertIsNone(cache.get(("GET", ARCHIVE_URL, ())))
+        stats = cache.stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"], stats["misses"]), (1, 1, 1))
+
+    def test_result_cache_expiry_and_eviction(self):
+        cache = ResultCache(max_bytes=2000)
+        cache.set("expired", np.zeros(10), time.time() - 1)
+        self.assertIsNone(cache.get("expired"))
+        cache.set("short", np.zeros(10), time.time() + 0.05)
+        cache.set("a", np.zeros(100), None)
+        cache.set("b", np.zeros(100), None)
+        self.assertIsNotNone(cache.get("short"))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("short"))
+        cache.get("a")
+        cache.set("c", np.zeros(100), None)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        stats = cache.stats()
+        self.assertEqual((stats["expirations"], stats["evictions"], stats["entries"]), (1, 1, 2))
+
+    def test_column_cache_merges_columns(self):
+        cache = ColumnCache()
+        start = 1729202400
+        cache.add("kyiv", DecodedBlock(start, 3600, ["a", "b"], np.ones((24, 2), dtype=np.float32)), 10.0)
+        self.assertEqual(cache.missing("kyiv", ["b", "c"]), ["c"])
+        cache.add("kyiv", DecodedBlock(start, 3600, ["c"], np.full((24, 1), 2, dtype=np.float32)), 5.0,
+                  time.time() - 1)
+        block, fetched_at = cache.get("kyiv", ["c", "a"])
+        self.assertEqual(block.names, ["c", "a"])
+        np.testing.assert_array_equal(block["c"], np.full(24, 2))
+        self.assertEqual(fetched_at, 5.0)
+        self.assertEqual(cache.missing("kyiv", ["a", "c"]), ["c"])
+
+        # Columns on another time axis replace the old ones
+        cache.add("kyiv", DecodedBlock(start + 86400, 3600, ["c"], np.zeros((24, 1), dtype=np.float32)), 20.0)
+        self.assertIsNone(cache.get("kyiv", ["a"]))
+        self.assertEqual(cache.stats()["bytes"], 24 * 4)
+
+    def test_column_cache_patches_near_term_rows(self):
+        cache = ColumnCache()
+        start = 1729202400
+        cache.add("kyiv", DecodedBlock(start, 3600, ["a", "b"], np.zeros((48, 2), dtype=np.float32)), 10.0,
+                  time.time() + 60, time.time() - 1)
+        self.assertEqual(cache.missing("kyiv", ["a", "b"]), [])
+        self.assertEqual(cache.stale_near_term("kyiv", ["a", "b"]), ["a", "b"])
+
+        window = DecodedBlock(start + 6 * 3600, 3600, ["b"], np.ones((6, 1), dtype=np.float32))
+        self.assertTrue(cache.patch("kyiv", window, time.time() + 60))
+        self.assertEqual(cache.stale_near_term("kyiv", ["a", "b"]), ["a"])
+        block, _ = cache.get("kyiv", ["b"])
+        np.testing.assert_array_equal(block["b"][4:14], [0, 0, 1, 1, 1, 1, 1, 1, 0, 0])
+
+        # Windows off the location's time axis are rejected
+        self.assertFalse(cache.patch("kyiv", DecodedBlock(start + 1800, 3600, ["b"], np.ones((6, 1))), None))
+        self.assertFalse(cache.patch("kyiv", DecodedBlock(start, 3600, ["c"], np.ones((6, 1))), None))
+
+    def test_estimate_size(self):
+        dataframe = pd.DataFrame({"a": np.zeros(100, dtype=np.float32)})
+        self.assertGreaterEqual(estimate_size({"frame": dataframe, "array": np.zeros(10)}), 480)
+
+    def test_stale_response_is_served_and_refreshed(self):
+        client = SharedOpenMeteoClient()
+        client.cache = TieredCache(self.path)
+        params = {"latitude": 1, "format": "flatbuffers"}
+        key = make_request_key("GET", FORECAST_URL, params)
+        client.cache.set(key, b"", time.time() - 7200, 3600)
+
+        refreshed = threading.Event()
+
+        def download(download_key, url, download_params, method):
+            refreshed.set()
+            return client.cache.set(download_key, b"", time.time(), 3600)
+
+        client.download = download
+        self.assertEqual(client.weather_api(FORECAST_URL, {"latitude": 1}), [])
+        self.assertGreater(client.data_age(FORECAST_URL, {"latitude": 1}), 3600)
+        self.assertTrue(refreshed.wait(5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from unittest import mock
+from src import client_manager
+from src.client_manager import (
+    SingleFlight,
+    SharedOpenMeteoClient,
+    make_request_key,
+    snap_coordinates,
+    snap_params,
+    get_openmeteo_client,
+    get_client_stats,
+    reset_client_stats
+)
+from src.rate_limiter import TokenBucket, AdaptiveConcurrency, CircuitBreaker, CircuitOpenError
+
+
+class TestClientManager(unittest.TestCase):
+
+    def setUp(self):
+        # Keep the shared response cache and rate limiter databases out of the user cache dir
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        cache_manager = sys.modules[client_manager.get_response_cache.__module__]
+        for patcher in (mock.patch("platformdirs.user_cache_dir", return_value=self.directory.name),
+                        mock.patch.object(cache_manager, "response_cache", None),
+                        mock.patch.object(client_manager, "rate_limiter", None),
+                        mock.patch.dict(client_manager.clients, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_make_request_key(self):
+        key1 = make_request_key("get", "https://api.open-meteo.com/v1/forecast",
+                                {"latitude": 1, "hourly": ["a", "b"]})
+        key2 = make_request_key("GET", "https://api.open-meteo.com/v1/forecast",
+                                {"hourly": ["a", "b"], "latitude": 1})
+        self.assertEqual(key1, key2)
+        hash(key1)
+
+    def test_shared_client_is_reused(self):
+        reset_client_stats()
+        client1 = get_openmeteo_client()
+        client2 = get_openmeteo_client()
+        self.assertIs(client1, client2)
+        self.assertEqual(get_client_stats()["client_reuses"], 1)
+        session = client1.get_session("https://api.open-meteo.com/v1/forecast")
+        self.assertIs(session, client1.get_session("https://api.open-meteo.com/v1/forecast?x=1"))
+
+    def test_single_flight_coalesces_concurrent_calls(self):
+        reset_client_stats()
+        single_flight = SingleFlight()
+        calls = []
+        results = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result"
+
+        threads = [threading.Thread(target=lambda: results.append(single_flight.do("key", work)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(get_client_stats()["coalesced_requests"], 4)
+
+    def test_single_flight_shares_errors(self):
+        single_flight = SingleFlight()
+
+        def failing():
+            raise ValueError("failed")
+
+        self.assertRaises(ValueError, single_flight.do, "key", failing)
+        self.assertEqual(single_flight.do("key", lambda: 1), 1)
+
+    def test_snap_coordinates(self):
+        self.assertEqual(snap_coordinates(50.4501, 0.1), 50.5)
+        self.assertEqual(snap_coordinates(-122.4194, 0.05), -122.4)
+        self.assertEqual(snap_coordinates("50.4501,37.7749", 0.1), "50.5,37.8")
+        params = {"latitude": 50.4501, "longitude": 30.5234}
+        self.assertIs(snap_params("https://example.com", params), params)
+        self.assertEqual(snap_params("https://archive-api.open-meteo.com/v1/archive", params),
+                         {"latitude": 50.5, "longitude": 30.5})
+
+    def test_nearby_locations_share_cache_key(self):
+        url = "https://api.open-meteo.com/v1/forecast"
+        first = {"latitude": 50.4501, "longitude": 30.5234}
+        second = {"latitude": 50.4466, "longitude": 30.5198}
+        snapping_client = SharedOpenMeteoClient(snap_coordinates=True)
+        self.assertEqual(snapping_client.normalize_params(url, first), snapping_client.normalize_params(url, second))
+        client = SharedOpenMeteoClient()
+        self.assertNotEqual(client.normalize_params(url, first), client.normalize_params(url, second))
+
+
+    def test_refused_requests_are_retried_and_trip_the_circuit(self):
+        class Response:
+            def __init__(self, status_code):
+                self.status_code = status_code
+                self.headers = {"Retry-After": "0"}
+                self.content = b""
+
+            def raise_for_status(self):
+                pass
+
+        class Session:
+            def __init__(self, status_codes):
+                self.status_codes = list(status_codes)
+
+            def request(self, method, url, params=None, data=None):
+                return Response(self.status_codes.pop(0))
+
+        client = SharedOpenMeteoClient()
+        client.rate_limiter = TokenBucket(rate=1000, capacity=10)
+        client.concurrency = AdaptiveConcurrency(maximum=4)
+        client.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client.cache.set = lambda key, data, fetched_at, expiry: data
+
+        session = Session([429, 200])
+        client.get_session = lambda url: session
+        self.assertEqual(client.download(("key",), "https://example.com", {}, "GET"), b"")
+        self.assertEqual(session.status_codes, [])
+        self.assertEqual(client.concurrency.decreases, 1)
+
+        # Once the circuit opens, the last attempt fails without waiting for the retry delay
+        client.get_session = lambda url: Session([503, 503, 503])
+        started = time.monotonic()
+        self.assertRaises(CircuitOpenError, client.download, ("key",), "https://example.com", {}, "GET")
+        self.assertLess(time.monotonic() - started, 1)
+
+        # A probe failing before it is sent, e.g. on a locked rate limit database, opens the circuit again
+        client.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        client.circuit_breaker.record_failure()
+        client.rate_limiter = mock.Mock(acquire=mock.Mock(side_effect=sqlite3.OperationalError("database is locked")))
+        self.assertRaises(sqlite3.OperationalError, client.download, ("key",), "https://example.com", {}, "GET")
+        self.assertEqual(client.circuit_breaker.stats()["state"], "open")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import tempfile
+import os
+import numpy as np
+import pandas as pd
+from src.climatology import (
+    ClimatologyIndex,
+    CLIMATOLOGY_VARIABLES,
+    calendar_slot,
+    calendar_slots
+)
+
+
+def make_series(start_date, end_date, seed=0):
+    dates = pd.date_range(start_date, end_date, freq="D")
+    rng = np.random.default_rng(seed)
+    columns = {variable: rng.integers(0, 20, len(dates)).astype(np.float32) for variable in CLIMATOLOGY_VARIABLES}
+    return dates, columns
+
+
+class TestClimatology(unittest.TestCase):
+
+    def test_calendar_slot(self):
+        self.assertEqual(calendar_slot(1, 1), 0)
+        self.assertEqual(calendar_slot(2, 29), 59)
+        self.assertEqual(calendar_slot(3, 1), 60)
+        self.assertEqual(calendar_slot(12, 31), 365)
+        dates = pd.DatetimeIndex(["2023-03-01", "2024-03-01", "2023-02-28"])
+        self.assertEqual(list(calendar_slots(dates)), [60, 60, 58])
+
+    def test_ranks_match_brute_force(self):
+        dates, columns = make_series("1990-01-01", "2009-12-31")
+        index = ClimatologyIndex.from_daily_series("1990-01-01", columns, 1990, 2009)
+        mask = (dates.month == 7) & (dates.day == 14)
+        slot = calendar_slot(7, 14)
+        for variable in CLIMATOLOGY_VARIABLES:
+            values = columns[variable][mask]
+            for value in (-1, 0, 5, 10.5, 19, 25):
+                self.assertEqual(index.count_at_least(variable, slot, value), (values >= value).sum())
+                self.assertEqual(index.count_at_most(variable, slot, value), (values <= value).sum())
+            year, record = index.record(variable, slot, highest=True)
+            self.assertEqual(record, values.max())
+            self.assertEqual(year, 1990 + int(np.argmax(values)))
+
+    def test_exclude_year(self):
+        dates, columns = make_series("1990-01-01", "1999-12-31", seed=1)
+        index = ClimatologyIndex.from_daily_series("1990-01-01", columns, 1990, 1999)
+        mask = (dates.month == 1) & (dates.day == 5) & (dates.year != 1995)
+        values = columns["temperature_2m_max"][mask]
+        slot = calendar_slot(1, 5)
+        self.assertEqual(index.count_at_least("temperature_2m_max", slot, 10, exclude_year=1995),
+                         (values >= 10).sum())
+        self.assertEqual(index.record("temperature_2m_max", slot, exclude_year=1995)[1], values.max())
+
+    def test_february_29_uses_february_28_in_non_leap_years(self):
+        dates, columns = make_series("2019-01-01", "2020-12-31")
+        index = ClimatologyIndex.from_daily_series("2019-01-01", columns, 2019, 2020)
+        february_28_2019 = columns["temperature_2m_max"][(dates.year == 2019) & (dates.month == 2) & (dates.day == 28)]
+        self.assertEqual(index.values["temperature_2m_max"][calendar_slot(2, 29), 0], february_28_2019[0])
+
+    def test_last_rain(self):
+        columns = {variable: np.zeros(3 * 365, dtype=np.float32) for variable in CLIMATOLOGY_VARIABLES}
+        columns["precipitation_sum"][0] = 2.5
+        index = ClimatologyIndex.from_daily_series("2001-01-01", columns, 2001, 2003)
+        self.assertEqual(index.last_rain(0), (2001, 2.5))
+        self.assertIsNone(index.last_rain(1))
+
+    def test_save_load_and_extend(self):
+        _, columns = make_series("2000-01-01", "2001-12-31")
+        index = ClimatologyIndex.from_daily_series("2000-01-01", columns, 2000, 2000)
+        index.extend(ClimatologyIndex.from_daily_series("2000-01-01", columns, 2000, 2001))
+        self.assertEqual(list(index.years), [2000, 2001])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "climatology.npz")
+            index.save(path)
+            loaded = ClimatologyIndex.load(path)
+        np.testing.assert_array_equal(loaded.values["wind_speed_10m_max"], index.values["wind_speed_10m_max"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.decoding import DecodedBlock
+
+
+class Variable:
+    def __init__(self, values):
+        self.values = values
+
+    def ValuesAsNumpy(self):
+        return self.values
+
+
+class Block:
+    """Stand-in for a response block with the accessors DecodedBlock uses."""
+
+    def __init__(self, start, interval, columns):
+        self.start = start
+        self.interval = interval
+        self.columns = columns
+
+    def Time(self):
+        return self.start
+
+    def TimeEnd(self):
+        return self.start + len(self.columns[0]) * self.interval
+
+    def Interval(self):
+        return self.interval
+
+    def Variables(self, i):
+        return Variable(self.columns[i])
+
+
+class TestDecoding(unittest.TestCase):
+
+    def setUp(self):
+        self.start = 1729202400
+        self.columns = [np.arange(48, dtype=np.float32), np.arange(48, dtype=np.float32) * 2]
+        self.block = DecodedBlock.from_response_block(Block(self.start, 3600, self.columns), ["a", "b"])
+
+    def test_from_response_block(self):
+        self.assertEqual(self.block.values.shape, (48, 2))
+        self.assertEqual(self.block.values.dtype, np.float32)
+        np.testing.assert_array_equal(self.block["b"], self.columns[1])
+        self.assertTrue(np.shares_memory(self.block.column("a"), self.block.values))
+        self.assertEqual(self.block.timestamps[-1], self.start + 47 * 3600)
+
+    def test_to_dataframe(self):
+        dataframe = self.block.to_dataframe()
+        expected_dates = pd.date_range(start=pd.to_datetime(self.start, unit="s", utc=True),
+                                       end=pd.to_datetime(self.start + 48 * 3600, unit="s", utc=True),
+                                       freq=pd.Timedelta(seconds=3600), inclusive="left")
+        self.assertEqual(list(dataframe.columns), ["date", "a", "b"])
+        self.assertTrue((dataframe["date"] == expected_dates).all())
+        np.testing.assert_array_equal(dataframe["a"].to_numpy(), self.columns[0])
+
+    def test_slice(self):
+        part = self.block.slice(24, 25)
+        self.assertEqual(len(part), 1)
+        self.assertEqual(part.start, self.start + 24 * 3600)
+        self.assertEqual(part["b"][0], 48)
+        self.assertTrue(np.shares_memory(part.values, self.block.values))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from src.downsampling import downsample, downsample_series, downsample_cache, lttb_indices, SeriesPyramid, \
+    PYRAMID_MIN_POINTS
+
+
+class TestDownsampling(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.arange(10000, dtype=np.float64)
+        self.y = rng.normal(0, 1, 10000)
+        self.y[1234] = 50
+        self.y[8765] = -50
+        self.y[10:20] = np.nan
+
+    def test_short_series_are_kept(self):
+        np.testing.assert_array_equal(downsample(self.x[:5], self.y[:5], 10), np.arange(5))
+
+    def test_min_max_keeps_extremes(self):
+        indices = downsample(self.x, self.y, 200, method="minmax")
+        self.assertLessEqual(len(indices), 200)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(1234, indices)
+        self.assertIn(8765, indices)
+
+    def test_max_keeps_peaks(self):
+        indices = downsample(self.x, self.y, 100, method="max")
+        self.assertLessEqual(len(indices), 100)
+        self.assertIn(1234, indices)
+        self.assertNotIn(8765, indices)
+
+    def test_lttb(self):
+        indices = downsample(self.x, self.y, 100, method="lttb")
+        self.assertEqual(len(indices), 100)
+        self.assertEqual((indices[0], indices[-1]), (0, 9999))
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(1234, indices)
+        self.assertIn(8765, indices)
+
+        # A single spike is the point forming the largest triangle in its bucket
+        y = np.zeros(10)
+        y[3] = 9
+        np.testing.assert_array_equal(lttb_indices(np.arange(10.0), y, 5), [0, 2, 3, 6, 9])
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            downsample(self.x, self.y, 100, method="stride")
+
+    def test_downsample_series_range_and_cache(self):
+        indices = downsample_series("test", self.x, self.y, 50, start=1000, end=1999)
+        self.assertTrue(np.all((indices >= 1000) & (indices <= 1999)))
+        self.assertIn(1234, indices)
+        self.assertIs(downsample_series("test", self.x, self.y, 50, start=1000, end=1999), indices)
+
+        # Other values under the same key are not served from the cache
+        y = self.y.copy()
+        y[1234] = 0
+        self.assertNotIn(1234, downsample_series("test", self.x, y, 50, start=1000, end=1999))
+        self.assertGreaterEqual(downsample_cache.stats()["entries"], 2)
+
+    def test_series_pyramid(self):
+        pyramid = SeriesPyramid(self.x, self.y, key="pyramid")
+        sizes = [len(level) for level in pyramid.levels]
+        self.assertEqual(sizes[0], 10000)
+        for finer, coarser in zip(sizes, sizes[1:]):
+            self.assertAlmostEqual(coarser / finer, 0.5, delta=0.01)
+        self.assertLessEqual(sizes[-1], PYRAMID_MIN_POINTS)
+        self.assertIs(SeriesPyramid(self.x, self.y, key="pyramid").levels, pyramid.levels)
+
+        # Zoomed out, a coarse level that still has the peaks
+        indices = pyramid.query(1000)
+        self.assertEqual(len(indices), 626)
+        self.assertIn(1234, indices)
+        self.assertIn(8765, indices)
+
+        # Zoomed in, every point of the window and one on each side
+        np.testing.assert_array_equal(pyramid.query(1000, 1200.5, 1300), np.arange(1200, 1302))
+
+
+if __name__ == "__main__":
+    unittest.main()
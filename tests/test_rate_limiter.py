@@ -0,0 +1,84 @@
+import unittest
+import os
+import tempfile
+import time
+from src.rate_limiter import (
+    TokenBucket,
+    AdaptiveConcurrency,
+    CircuitBreaker,
+    CircuitOpenError
+)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=100, capacity=2)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertGreater(bucket.try_acquire(), 0)
+        self.assertTrue(bucket.acquire(timeout=1))
+        self.assertFalse(TokenBucket(rate=0.01, capacity=0).acquire(timeout=0.1))
+
+    def test_token_bucket_is_shared_through_its_database(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rate_limit.sqlite")
+            first = TokenBucket(rate=0.01, capacity=3, path=path)
+            second = TokenBucket(rate=0.01, capacity=3, path=path)
+            self.assertEqual(first.try_acquire(2), 0)
+            self.assertEqual(second.try_acquire(), 0)
+            self.assertGreater(first.try_acquire(), 0)
+            first.connection.close()
+            second.connection.close()
+
+    def test_adaptive_concurrency(self):
+        concurrency = AdaptiveConcurrency(maximum=8, initial=4, cooldown=60)
+        for _ in range(4):
+            concurrency.acquire()
+        for _ in range(4):
+            concurrency.release()
+        self.assertAlmostEqual(concurrency.limit, 5, delta=0.1)
+
+        concurrency.acquire()
+        concurrency.release(overloaded=True)
+        limit = concurrency.limit
+        self.assertAlmostEqual(limit, 2.5, delta=0.1)
+        # Overload responses within the cooldown answer requests sent before the cut
+        concurrency.acquire()
+        concurrency.release(overloaded=True)
+        self.assertEqual(concurrency.limit, limit)
+        self.assertEqual(concurrency.stats()["decreases"], 1)
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open())
+        self.assertRaises(CircuitOpenError, breaker.before_request)
+
+        time.sleep(0.15)
+        breaker.before_request()
+        # Only one probe request is let through while half open
+        self.assertRaises(CircuitOpenError, breaker.before_request)
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open())
+
+        time.sleep(0.15)
+        breaker.before_request()
+        breaker.record_success()
+        breaker.before_request()
+        self.assertEqual(breaker.stats()["opened"], 2)
+
+        # A probe that never reports back is replaced after another reset timeout
+        breaker.record_failure()
+        breaker.record_failure()
+        time.sleep(0.15)
+        breaker.before_request()
+        self.assertRaises(CircuitOpenError, breaker.before_request)
+        time.sleep(0.15)
+        breaker.before_request()
+
+
+if __name__ == '__main__':
+    unittest.main()
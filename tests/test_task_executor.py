@@ -0,0 +1,83 @@
+import unittest
+import threading
+import time
+from src.task_executor import TaskExecutor
+
+
+def drain_until(executor, condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        executor.drain()
+        time.sleep(0.01)
+
+
+class TestTaskExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = TaskExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_results_are_delivered_on_the_draining_thread(self):
+        threads = []
+        self.executor.submit("forecast", lambda x: x * 2, 21,
+                             on_done=lambda result: threads.append((result, threading.current_thread())))
+        drain_until(self.executor, lambda: threads)
+        self.assertEqual(threads, [(42, threading.current_thread())])
+
+    def test_stale_results_are_dropped(self):
+        release = threading.Event()
+        results = []
+
+        def slow(value):
+            release.wait(5)
+            return value
+
+        self.executor.submit("forecast", slow, "kyiv", on_done=results.append)
+        self.executor.submit("forecast", slow, "lviv", on_done=results.append)
+        release.set()
+        drain_until(self.executor, lambda: results)
+        time.sleep(0.1)
+        self.executor.drain()
+        self.assertEqual(results, ["lviv"])
+
+        # Channels do not cancel each other, so tabs refresh in parallel
+        self.executor.submit("history", slow, "history", on_done=results.append)
+        self.executor.submit("forecast", slow, "forecast", on_done=results.append)
+        drain_until(self.executor, lambda: len(results) == 3)
+        self.assertEqual(sorted(results[1:]), ["forecast", "history"])
+
+    def test_stream_stops_when_cancelled(self):
+        produced = []
+        items = []
+
+        def chunks():
+            for i in range(100):
+                produced.append(i)
+                time.sleep(0.01)
+                yield i
+
+        self.executor.stream("history", chunks(), items.append)
+        drain_until(self.executor, lambda: items)
+        self.executor.cancel("history")
+        time.sleep(0.1)
+        count = len(produced)
+        time.sleep(0.1)
+        self.assertEqual(len(produced), count)
+        self.assertLess(count, 100)
+
+    def test_errors_are_reported(self):
+        errors = []
+
+        def fail():
+            raise ValueError("boom")
+
+        self.executor.submit("forecast", fail, on_error=errors.append)
+        drain_until(self.executor, lambda: errors)
+        self.assertIsInstance(errors[0], ValueError)
+        self.assertEqual(self.executor.stats()["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
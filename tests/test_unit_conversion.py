@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.unit_conversion import (
+    CANONICAL_UNITS,
+    convert_array,
+    convert_dataframe,
+    convert_values,
+    convert_block
+)
+from src.decoding import DecodedBlock
+
+
+class TestUnitConversion(unittest.TestCase):
+
+    def test_convert_array(self):
+        imperial = ("fahrenheit", "mph", "inch")
+        values = np.array([0, 100, -40], dtype=np.float32)
+        converted = convert_array(values, "temperature_2m_max", imperial)
+        np.testing.assert_allclose(converted, [32, 212, -40], rtol=1e-6)
+        self.assertEqual(converted.dtype, np.float32)
+        np.testing.assert_allclose(convert_array(np.array([0.44704]), "wind_speed_10m", imperial), [1])
+        np.testing.assert_allclose(convert_array(np.array([10.0]), "wind_gusts_10m", ("celsius", "kmh", "mm")), [36])
+        np.testing.assert_allclose(convert_array(np.array([1852 / 3600]), "wind_speed_10m", ("celsius", "kn", "mm")),
+                                   [1])
+        np.testing.assert_allclose(convert_array(np.array([25.4]), "precipitation_sum", imperial), [1])
+        np.testing.assert_allclose(convert_array(np.array([2.54]), "snowfall", imperial), [1])
+
+    def test_no_conversion(self):
+        values = np.array([1.0, 2.0])
+        self.assertIs(convert_array(values, "temperature_2m", CANONICAL_UNITS), values)
+        self.assertIs(convert_array(values, "surface_pressure", ("fahrenheit", "mph", "inch")), values)
+
+    def test_convert_block(self):
+        block = DecodedBlock(0, 3600, ["temperature_2m", "surface_pressure"],
+                             np.array([[100, 1000], [0, 990]], dtype=np.float32))
+        self.assertIs(convert_block(block, CANONICAL_UNITS), block)
+        converted = convert_block(block, ("fahrenheit", "ms", "mm"))
+        np.testing.assert_allclose(converted["temperature_2m"], [212, 32])
+        np.testing.assert_array_equal(converted["surface_pressure"], block["surface_pressure"])
+        self.assertEqual(block["temperature_2m"][0], 100)
+
+    def test_convert_dataframe(self):
+        dataframe = pd.DataFrame({"temperature_2m": np.float32([0, 10]), "uv_index": np.float32([1, 2])})
+        dataframe.attrs["data_age"] = 5
+        converted = convert_dataframe(dataframe, ("fahrenheit", "ms", "mm"))
+        self.assertEqual(list(converted["temperature_2m"]), [32, 50])
+        self.assertEqual(list(converted["uv_index"]), [1, 2])
+        self.assertEqual(converted.attrs["data_age"], 5)
+        self.assertEqual(list(dataframe["temperature_2m"]), [0, 10])
+
+    def test_convert_values(self):
+        converted = convert_values({"apparent_temperature": 10, "relative_humidity_2m": 50},
+                                   ("fahrenheit", "ms", "mm"))
+        self.assertEqual(converted, {"apparent_temperature": 50, "relative_humidity_2m": 50})
+
+
+if __name__ == '__main__':
+    unittest.main()